@@ -0,0 +1,198 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Cache lives in the portable temp folder next to the application
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'audio_cache')
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Per-entry metadata (word timings) is stored beside the audio under this extension
+SIDECAR_EXTENSION = '.json'
+
+
+def normalize_text(text):
+    """Collapse whitespace so re-flowed copies of the same text share a cache entry"""
+    return ' '.join(text.split())
+
+
+class AudioCache:
+    """On-disk, content-addressed store of synthesized audio with LRU eviction
+
+    An entry may carry a sidecar (such as the word timings of its audio) that is
+    counted in the entry's size and evicted together with it.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, extension='.mp3'):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from file modification times"""
+        found = []
+        sidecars = {}
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(SIDECAR_EXTENSION):
+                    extension = SIDECAR_EXTENSION
+                elif name.endswith(self.extension):
+                    extension = self.extension
+                else:
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                if extension == SIDECAR_EXTENSION:
+                    sidecars[name[:-len(extension)]] = stat.st_size
+                else:
+                    found.append((stat.st_mtime, name[:-len(extension)], stat.st_size))
+
+        for _, key, size in sorted(found):
+            size += sidecars.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size
+        # Sidecars whose audio is gone are left over from an interrupted write
+        for key in sidecars:
+            self._remove_files(key)
+        print(f"Audio cache: {len(self._entries)} entries, {self._total_bytes / 1048576:.1f} MB in {self.cache_dir}")
+
+    def make_key(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        """Hash of everything that changes the synthesized audio"""
+        material = '\x1f'.join([normalize_text(text), voice, rate, pitch, volume])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small on FAT-formatted USB sticks
+        return os.path.join(self.cache_dir, key[:2], key + self.extension)
+
+    def _sidecar_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + SIDECAR_EXTENSION)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)  # Atomic, so readers never see a partial file
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _remove_files(self, key):
+        for path in (self._path(key), self._sidecar_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __contains__(self, key):
+        """True if key is cached; does not count as a hit or miss"""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Return cached bytes for key, or None on a miss"""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Persist the LRU position across restarts
+        except OSError:
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def get_sidecar(self, key):
+        """Return the sidecar bytes stored with key, or None; does not count as a hit or miss"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+        try:
+            with open(self._sidecar_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, data, sidecar=None):
+        """Store bytes (and optional sidecar bytes) under key and evict the least recently used entries over the cap"""
+        if not data or len(data) + len(sidecar or b'') > self.max_bytes:
+            return
+        size = len(data) + len(sidecar or b'')
+        path = self._path(key)
+        sidecar_path = self._sidecar_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # The sidecar goes first, so audio is never visible with a stale one
+            if sidecar:
+                self._write_atomic(sidecar_path, sidecar)
+            elif os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+            self._write_atomic(path, data)
+        except OSError as e:
+            print(f"Could not write audio cache entry: {e}")
+            try:
+                os.remove(sidecar_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, _ = next(iter(self._entries.items()))
+                self._forget(old_key)
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            self._remove_files(old_key)
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def clear(self):
+        """Delete every cached entry"""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            self._remove_files(key)
+
+    def stats(self):
+        """Entry count, size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,531 @@
+import io
+import struct
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+import sounddevice as sd
+from pydub import AudioSegment
+
+# soundfile (libsndfile >= 1.1) can decode MP3 in-process; fall back to pydub if it is missing
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+# Edge TTS always returns "audio-24khz-48kbitrate-mono-mp3"
+EDGE_SAMPLE_RATE = 24000
+
+# MP3 frame header lookup tables (Layer III only, which is all Edge TTS produces)
+_MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],      # MPEG-2 / 2.5
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def _resample(pcm, source_rate, target_rate):
+    """Linearly resample a mono float32 buffer"""
+    if source_rate == target_rate or pcm.size == 0:
+        return pcm
+    target_length = int(round(pcm.size * target_rate / source_rate))
+    positions = np.linspace(0, pcm.size - 1, target_length)
+    return np.interp(positions, np.arange(pcm.size), pcm).astype(np.float32)
+
+
+def decode_mp3(data, sample_rate=EDGE_SAMPLE_RATE):
+    """Decode MP3 bytes to a mono float32 NumPy array without touching the disk"""
+    if not data:
+        return np.zeros(0, dtype=np.float32)
+
+    if sf is not None:
+        try:
+            pcm, rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+            pcm = pcm.mean(axis=1) if pcm.shape[1] > 1 else pcm[:, 0]
+            return _resample(np.ascontiguousarray(pcm, dtype=np.float32), rate, sample_rate)
+        except Exception as e:
+            print(f"soundfile could not decode MP3, falling back to pydub: {e}")
+
+    # Fallback: pydub pipes the bytes through ffmpeg
+    audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    audio = audio.set_channels(1).set_frame_rate(sample_rate).set_sample_width(2)
+    return np.frombuffer(audio.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def decode_wav(data, sample_rate=EDGE_SAMPLE_RATE):
+    """Decode 8/16/32-bit PCM WAV bytes (e.g. SAPI output) to mono float32 at sample_rate"""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        pcm = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        pcm = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 4:
+        pcm = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return _resample(np.ascontiguousarray(pcm, dtype=np.float32), rate, sample_rate)
+
+
+def time_stretch(pcm, speed, sample_rate=EDGE_SAMPLE_RATE):
+    """Change tempo by speed (2.0 = twice as fast) without changing pitch (WSOLA)"""
+    if pcm.size == 0 or abs(speed - 1.0) < 0.01:
+        return pcm
+
+    frame = int(0.03 * sample_rate)       # 30 ms analysis frames
+    hop_out = frame // 2                  # 50% overlap in the output
+    hop_in = hop_out * speed
+    tolerance = int(0.008 * sample_rate)  # How far a frame may shift to line up with the last one
+    window = np.hanning(frame).astype(np.float32)
+
+    padded = np.pad(pcm.astype(np.float32, copy=False), (tolerance, frame + tolerance))
+    frames = max(1, int((pcm.size - hop_out) / hop_in) + 1)
+    out = np.zeros(frames * hop_out + frame, dtype=np.float32)
+    weight = np.zeros_like(out)
+
+    previous = tolerance
+    for k in range(frames):
+        nominal = tolerance + int(k * hop_in)
+        if k == 0:
+            position = nominal
+        else:
+            # Pick the shift whose first half best continues the previous frame's second half
+            natural = padded[previous + hop_out:previous + frame]
+            region = padded[nominal - tolerance:nominal + tolerance + hop_out]
+            position = nominal - tolerance + int(np.argmax(np.correlate(region, natural, mode='valid')))
+        start = k * hop_out
+        out[start:start + frame] += padded[position:position + frame] * window
+        weight[start:start + frame] += window
+        previous = position
+
+    out /= np.maximum(weight, 1e-3)
+    return out[:int(round(pcm.size / speed))]
+
+
+def wav_header(frames, sample_rate, channels=1, sample_width=2):
+    """Canonical 44-byte PCM WAV header for a stream of known length"""
+    data_size = frames * channels * sample_width
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels,
+                       sample_rate, sample_rate * channels * sample_width, channels * sample_width,
+                       sample_width * 8, b'data', data_size)
+
+
+def decode_audio(data, sample_rate=EDGE_SAMPLE_RATE):
+    """Decode MP3 or WAV bytes, whichever the synthesis backend produced"""
+    if data[:4] == b'RIFF':
+        return decode_wav(data, sample_rate)
+    return decode_mp3(data, sample_rate)
+
+
+def parse_mp3_frame_header(data, pos):
+    """Return (frame_length, samples_per_frame, sample_rate) for the MP3 frame at pos, or None"""
+    if pos + 4 > len(data):
+        return None
+    b1, b2 = data[pos + 1], data[pos + 2]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = _MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+class StreamingMP3Decoder:
+    """Incrementally decode an MP3 byte stream that arrives in arbitrary chunks"""
+
+    # Bytes of already-played frames re-decoded in front of every batch; this covers the
+    # 511-byte bit reservoir plus a frame of MDCT overlap, so batch seams are inaudible
+    PRIMING_BYTES = 1024
+
+    def __init__(self, sample_rate=EDGE_SAMPLE_RATE, min_batch_frames=8):
+        self.sample_rate = sample_rate
+        self.min_batch_frames = min_batch_frames
+        self._buffer = bytearray()
+        self._pending = []   # complete frames not yet decoded
+        self._priming = deque()
+        self._priming_size = 0
+        self._samples_per_frame = 576
+        self._source_rate = EDGE_SAMPLE_RATE
+
+    def _split_frames(self):
+        """Move every complete frame from the byte buffer into the pending list"""
+        pos = 0
+        data = self._buffer
+        while pos + 4 <= len(data):
+            header = parse_mp3_frame_header(data, pos)
+            if header is None:
+                pos += 1  # Resync on the next candidate header
+                continue
+            length, samples, rate = header
+            if pos + length > len(data):
+                break
+            self._pending.append(bytes(data[pos:pos + length]))
+            self._samples_per_frame = samples
+            self._source_rate = rate
+            pos += length
+        del self._buffer[:pos]
+
+    def _decode_pending(self):
+        if not self._pending:
+            return np.zeros(0, dtype=np.float32)
+        new_frames = self._pending
+        self._pending = []
+        pcm = decode_mp3(b''.join(list(self._priming) + new_frames), self.sample_rate)
+        self._priming.extend(new_frames)
+        self._priming_size += sum(len(frame) for frame in new_frames)
+
+        # Keep just enough trailing frames to prime the next batch
+        while len(self._priming) > 2 and self._priming_size - len(self._priming[0]) >= self.PRIMING_BYTES:
+            self._priming_size -= len(self._priming.popleft())
+
+        # Keep only the tail that belongs to the new frames; the priming output is discarded
+        expected = int(len(new_frames) * self._samples_per_frame * self.sample_rate /
+                       self._source_rate)
+        return pcm[-expected:] if 0 < expected < pcm.size else pcm
+
+    def feed(self, chunk):
+        """Add MP3 bytes and return any PCM that could be decoded so far"""
+        self._buffer.extend(chunk)
+        self._split_frames()
+        if len(self._pending) < self.min_batch_frames:
+            return np.zeros(0, dtype=np.float32)
+        return self._decode_pending()
+
+    def flush(self):
+        """Decode everything that is left at the end of the stream"""
+        self._split_frames()
+        return self._decode_pending()
+
+
+class StreamingWAVDecoder:
+    """Incrementally decode a 16-bit PCM WAV stream; same interface as StreamingMP3Decoder"""
+
+    def __init__(self, sample_rate=EDGE_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._buffer = bytearray()
+        self._format = None  # (channels, source rate) once the header has been parsed
+
+    def _parse_header(self):
+        """Find the fmt and data chunks; returns False until enough bytes have arrived"""
+        data = self._buffer
+        pos = 12
+        channels = rate = None
+        while pos + 8 <= len(data):
+            chunk_id, size = struct.unpack_from('<4sI', data, pos)
+            if chunk_id == b'data':
+                if channels is None:
+                    raise ValueError("WAV stream has no fmt chunk")
+                self._format = (channels, rate)
+                del self._buffer[:pos + 8]
+                return True
+            if pos + 8 + size > len(data):
+                return False
+            if chunk_id == b'fmt ':
+                audio_format, channels, rate, _, _, bits = struct.unpack_from('<HHIIHH', data, pos + 8)
+                if audio_format != 1 or bits != 16:
+                    raise ValueError("Only 16-bit PCM WAV streams are supported")
+            pos += 8 + size + (size & 1)
+        return False
+
+    def feed(self, chunk):
+        """Add WAV bytes and return any PCM that could be decoded so far"""
+        self._buffer.extend(chunk)
+        if self._format is None and not self._parse_header():
+            return np.zeros(0, dtype=np.float32)
+
+        channels, rate = self._format
+        usable = len(self._buffer) - len(self._buffer) % (2 * channels)
+        pcm = np.frombuffer(bytes(self._buffer[:usable]), dtype='<i2').astype(np.float32) / 32768.0
+        del self._buffer[:usable]
+        if channels > 1:
+            pcm = pcm.reshape(-1, channels).mean(axis=1)
+        return _resample(pcm, rate, self.sample_rate)
+
+    def flush(self):
+        """Nothing is held back beyond a partial sample"""
+        return np.zeros(0, dtype=np.float32)
+
+
+class PlaybackQueue:
+    """One persistent output stream fed from a preallocated ring buffer
+
+    Producers hand whole PCM segments to enqueue(), which never blocks. A feeder
+    thread copies them into the ring as space frees up, and the audio callback only
+    copies out of the ring, so back-to-back segments play with no gap and nothing
+    is allocated or spawned per utterance. There is one speaker: audio from
+    different players queues up in order, and flush() silences all of it.
+    """
+
+    def __init__(self, sample_rate=EDGE_SAMPLE_RATE, blocksize=480, capacity_seconds=10):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize  # 20 ms at 24 kHz
+        self._ring = np.zeros(int(sample_rate * capacity_seconds), dtype=np.float32)
+        self._read = 0       # Absolute sample positions; the ring index is position % capacity
+        self._written = 0    # Copied into the ring
+        self._queued = 0     # Handed to enqueue(), including what still waits for ring space
+        self._generation = 0  # Bumped by flush() so an in-progress copy is discarded
+        self._segments = deque()  # [pcm, offset] waiting for ring space
+        self._cond = threading.Condition()
+        self._stream = None
+        self._feeder = None
+        self._running = False
+        self._paused = False
+
+    @property
+    def played_position(self):
+        """Absolute number of samples sent to the device so far"""
+        return self._read
+
+    @property
+    def generation(self):
+        """Bumped by every flush(); positions enqueued in an earlier generation never play"""
+        return self._generation
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def set_paused(self, paused):
+        """Hold (or continue) playback in place; buffered audio and position are kept"""
+        with self._cond:
+            self._paused = paused
+            self._cond.notify_all()
+
+    def start(self):
+        """Open the output stream and feeder thread if they are not running"""
+        with self._cond:
+            if not self._running:
+                self._running = True
+                self._feeder = threading.Thread(target=self._feed_loop, name="playback-feeder", daemon=True)
+                self._feeder.start()
+            stream = self._stream
+        if stream is not None and stream.active:
+            return
+
+        # (Re)open the device stream; it plays silence whenever the ring is empty
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                print(f"Error closing output stream: {e}")
+        stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='float32',
+            blocksize=self.blocksize,
+            latency='low',
+            callback=self._callback
+        )
+        stream.start()
+        with self._cond:
+            self._stream = stream
+
+    def enqueue(self, pcm):
+        """Queue mono float32 samples; returns the absolute position where they end"""
+        return self.enqueue_tracked(pcm)[1]
+
+    def enqueue_tracked(self, pcm):
+        """Queue mono float32 samples; returns (generation, end position), read together"""
+        pcm = np.asarray(pcm, dtype=np.float32)
+        with self._cond:
+            if pcm.size:
+                self._segments.append([pcm, 0])
+                self._queued += pcm.size
+                self._cond.notify_all()
+            return self._generation, self._queued
+
+    def flush(self):
+        """Drop everything queued or buffered; playback falls silent within one block"""
+        with self._cond:
+            self._segments.clear()
+            self._written = self._queued = self._read
+            self._generation += 1
+            self._cond.notify_all()
+
+    def _feed_loop(self):
+        capacity = self._ring.size
+        while True:
+            with self._cond:
+                while self._running and (not self._segments or self._written - self._read >= capacity):
+                    self._cond.wait(0.1)
+                if not self._running:
+                    return
+                segment = self._segments[0]
+                pcm, offset = segment
+                count = min(capacity - (self._written - self._read), pcm.size - offset)
+                position, generation = self._written, self._generation
+
+            # The region between written and read + capacity is never touched by the
+            # callback, so the copy can run without holding the lock
+            start = position % capacity
+            first = min(count, capacity - start)
+            self._ring[start:start + first] = pcm[offset:offset + first]
+            self._ring[:count - first] = pcm[offset + first:offset + count]
+
+            with self._cond:
+                if generation != self._generation:
+                    continue  # flush() ran during the copy
+                self._written += count
+                segment[1] += count
+                if segment[1] >= pcm.size:
+                    self._segments.popleft()
+
+    def _callback(self, outdata, frames, time_info, status):
+        capacity = self._ring.size
+        with self._cond:
+            # While paused the read position stays put and the device gets silence
+            count = 0 if self._paused else min(frames, self._written - self._read)
+            start = self._read % capacity
+            first = min(count, capacity - start)
+            outdata[:first, 0] = self._ring[start:start + first]
+            outdata[first:count, 0] = self._ring[:count - first]
+            self._read += count
+            if count:
+                self._cond.notify_all()
+        # Underrun while synthesis catches up, or simply idle
+        outdata[count:] = 0
+
+    def wait_for(self, position, timeout, generation=None):
+        """Block until playback reaches position or timeout passes; True if reached
+
+        With generation, also returns once a flush() has dropped that generation's
+        audio, since its position will then never be reached.
+        """
+        if generation is None:
+            generation = self._generation
+        with self._cond:
+            return self._cond.wait_for(lambda: self._read >= position or self._generation != generation, timeout)
+
+    def close(self):
+        """Stop the feeder thread and close the device stream"""
+        with self._cond:
+            self._running = False
+            self._segments.clear()
+            self._cond.notify_all()
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.abort()
+                stream.close()
+            except Exception as e:
+                print(f"Error closing output stream: {e}")
+
+
+# Shared playback queue, opened on first use
+_playback_queue = None
+_playback_lock = threading.Lock()
+
+
+def get_playback_queue():
+    """Return the shared playback queue"""
+    global _playback_queue
+    with _playback_lock:
+        if _playback_queue is None:
+            _playback_queue = PlaybackQueue()
+        return _playback_queue
+
+
+class StreamPlayer:
+    """One utterance played through the shared playback queue"""
+
+    def __init__(self, queue=None):
+        self.queue = queue or get_playback_queue()
+        self.sample_rate = self.queue.sample_rate
+        self._ends = deque()  # (queue generation, absolute end position) of each written block
+        self._finished = False
+        self._stopped = False
+
+    def start(self):
+        """Make sure the shared output stream is running"""
+        self.queue.start()
+
+    def write(self, pcm):
+        """Queue a block of mono float32 samples; never blocks. Returns where the block ends"""
+        if self._stopped or pcm is None or len(pcm) == 0:
+            return None
+        generation, end = self.queue.enqueue_tracked(pcm)
+        self._ends.append((generation, end))
+        return end
+
+    def clear(self):
+        """Drop this player's queued audio but keep the player usable (used for seeking)"""
+        self._ends.clear()
+        self.queue.flush()
+
+    def pause(self):
+        """Hold playback at the current position"""
+        self.queue.set_paused(True)
+
+    def resume(self):
+        """Continue from where pause() stopped"""
+        self.queue.set_paused(False)
+
+    def is_paused(self):
+        return self.queue.paused
+
+    def pending_blocks(self):
+        """Number of written blocks that have not finished playing
+
+        Blocks from before a flush() of the shared queue will never play, so they
+        no longer count.
+        """
+        played = self.queue.played_position
+        generation = self.queue.generation
+        while self._ends and (self._ends[0][0] != generation or self._ends[0][1] <= played):
+            self._ends.popleft()
+        return len(self._ends)
+
+    def finish(self):
+        """Signal that no more data will be written"""
+        self._finished = True
+
+    def is_done(self):
+        """True once playback has drained or been stopped"""
+        if self._stopped:
+            return True
+        return self._finished and self.pending_blocks() == 0
+
+    def wait(self, should_continue=lambda: True, poll_interval=0.05):
+        """Block until playback drains; returns False if should_continue() turned false"""
+        while not self.is_done():
+            if not should_continue():
+                return False
+            if self._finished and self._ends:
+                generation, end = self._ends[-1]
+                self.queue.wait_for(end, poll_interval, generation)
+            else:
+                time.sleep(poll_interval)
+        return not self._stopped
+
+    def stop(self):
+        """Stop playback immediately and drop any queued audio"""
+        if not self._stopped:
+            self._stopped = True
+            # A player that already drained leaves the queue alone
+            if self.pending_blocks():
+                self.queue.flush()
+            self._ends.clear()
+            self.queue.set_paused(False)  # The next utterance should not start paused
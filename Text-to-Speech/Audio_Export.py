@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+import wave
+
+from Audio_Engine import wav_header
+from Audio_Cache import normalize_text
+from Speech_Synthesis import (DEFAULT_VOICE, get_audio_cache, get_backend, get_tts_service, iter_sentence_spans,
+                              make_cache_key)
+
+# Edge TTS handles a few thousand characters per request comfortably; larger chunks
+# mean fewer round trips, smaller ones spread better across the workers
+DEFAULT_CHUNK_CHARS = 3000
+DEFAULT_CONCURRENCY = 4
+
+# Repeated sentences at least this long get a chunk of their own so their audio is
+# shared; shorter repeats ("Yes.") would only fragment the chunks into more requests
+MIN_SHARED_SENTENCE_CHARS = 20
+
+
+def split_export_chunks(text, max_chars=DEFAULT_CHUNK_CHARS, share_repeats=True):
+    """Group sentences into chunks of at most max_chars, preferring paragraph breaks
+
+    With share_repeats, a sentence that occurs more than once becomes a chunk of its
+    own, so every occurrence maps onto the same chunk text (and the same audio).
+    """
+    spans = list(iter_sentence_spans(text))
+    repeated = set()
+    if share_repeats:
+        seen = set()
+        for start, end in spans:
+            if end - start >= MIN_SHARED_SENTENCE_CHARS:
+                key = normalize_text(text[start:end])
+                if key in seen:
+                    repeated.add(key)
+                seen.add(key)
+
+    chunks = []
+    chunk_start = chunk_end = None
+    for start, end in spans:
+        if repeated and normalize_text(text[start:end]) in repeated:
+            if chunk_start is not None:
+                chunks.append(text[chunk_start:chunk_end])
+                chunk_start = chunk_end = None
+            chunks.append(text[start:end])
+            continue
+        if chunk_start is None:
+            chunk_start, chunk_end = start, end
+            continue
+        # Close the chunk if the sentence would overflow it, or at a paragraph
+        # break once the chunk is reasonably full
+        paragraph_break = '\n\n' in text[chunk_end:start]
+        if end - chunk_start > max_chars or (paragraph_break and chunk_end - chunk_start >= max_chars // 2):
+            chunks.append(text[chunk_start:chunk_end])
+            chunk_start = start
+        chunk_end = end
+    if chunk_start is not None:
+        chunks.append(text[chunk_start:chunk_end])
+    return chunks
+
+
+class MP3Exporter:
+    """Synthesize a long document in parallel chunks and stitch them into one MP3
+
+    Finished chunks are checkpointed in a sidecar work directory next to the output
+    file ("<file>.parts"), so an interrupted export picks up where it stopped instead
+    of starting over. A chunk file only appears once its audio is completely written,
+    so its presence is the checkpoint. Chunk files are named by content, so repeated
+    sentences are synthesized once and their file is reused at assembly.
+    """
+
+    def __init__(self, voice=DEFAULT_VOICE, concurrency=DEFAULT_CONCURRENCY, chunk_chars=DEFAULT_CHUNK_CHARS,
+                 rate="+0%", pitch="+0Hz", volume="+0%"):
+        self.voice = voice
+        self.concurrency = max(1, concurrency)
+        self.chunk_chars = chunk_chars
+        self.rate = rate
+        self.pitch = pitch
+        self.volume = volume
+        self.cancelled = False
+        self.backend = None
+
+    def cancel(self):
+        """Stop the export; finished chunks stay in the work directory for a later resume"""
+        self.cancelled = True
+
+    @staticmethod
+    def work_dir_for(file_path):
+        """Sidecar directory holding the checkpointed chunks of file_path"""
+        return file_path + '.parts'
+
+    def _chunk_name(self, chunk):
+        # The name covers everything that changes the audio, so edited text or a
+        # different voice never reuses a stale chunk, while identical chunks share one
+        material = '\x1f'.join([normalize_text(chunk), self.backend.cache_voice(self.voice),
+                                 self.rate, self.pitch, self.volume])
+        digest = hashlib.sha256(material.encode('utf-8')).hexdigest()[:24]
+        return f"{digest}.mp3"
+
+    def pending_chunks(self, text, file_path):
+        """Return (done, total) unique chunks for an export of text to file_path that was interrupted"""
+        chunks = split_export_chunks(text, self.chunk_chars)
+        work_dir = self.work_dir_for(file_path)
+        self.backend = get_backend()
+        names = {self._chunk_name(chunk) for chunk in chunks}
+        done = sum(1 for name in names if os.path.exists(os.path.join(work_dir, name)))
+        return done, len(names)
+
+    @staticmethod
+    def _write_chunk(chunk_path, data):
+        # Atomic write: a crash mid-chunk never leaves a truncated checkpoint
+        temp_path = chunk_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, chunk_path)
+
+    async def _synthesize_chunk(self, semaphore, chunk, chunk_path):
+        async with semaphore:
+            if self.cancelled:
+                return False
+            # A chunk exported (or read aloud) before comes from the audio cache
+            cache = get_audio_cache()
+            key = make_cache_key(chunk, self.voice, self.rate, self.pitch, self.volume, self.backend)
+            data = await asyncio.to_thread(cache.get, key)
+            if data is None:
+                data = await self.backend.synthesize(chunk, self.voice, self.rate, self.pitch, self.volume)
+                await asyncio.to_thread(cache.put, key, data)
+            # File I/O stays off the TTS loop, which other readers share
+            await asyncio.to_thread(self._write_chunk, chunk_path, data)
+            return True
+
+    async def export_async(self, text, file_path, on_progress=None, semaphore=None):
+        """Write text to file_path as MP3 and return the path, or None if cancelled
+
+        on_progress(done, total) is called on the TTS loop thread. A shared semaphore
+        bounds the requests of several exports together instead of per export.
+        """
+        chunks = split_export_chunks(text, self.chunk_chars)
+        work_dir = self.work_dir_for(file_path)
+        self.backend = get_backend()
+        os.makedirs(work_dir, exist_ok=True)
+        names = [self._chunk_name(chunk) for chunk in chunks]
+        # Repeated chunks share a name, so each unique one is synthesized once
+        unique = {}
+        for name, chunk in zip(names, chunks):
+            unique.setdefault(name, chunk)
+        total = len(unique)
+        if total < len(chunks):
+            print(f"Export: {len(chunks)} chunks, {len(chunks) - total} repeats reuse earlier audio")
+        completed = {name for name in unique if os.path.exists(os.path.join(work_dir, name))}
+        if completed:
+            print(f"Resuming export: {len(completed)} of {total} chunks already done in {work_dir}")
+
+        semaphore = semaphore or asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        synthesized_chars = 0
+        if on_progress:
+            on_progress(len(completed), total)
+
+        async def run_chunk(name):
+            finished = await self._synthesize_chunk(semaphore, unique[name], os.path.join(work_dir, name))
+            return name, finished
+
+        # Chunks land on disk as they finish, so ordering only matters at assembly
+        tasks = [asyncio.ensure_future(run_chunk(name)) for name in unique if name not in completed]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                name, finished = await next_done
+                if not finished:
+                    continue
+                completed.add(name)
+                synthesized_chars += len(unique[name])
+                if on_progress:
+                    on_progress(len(completed), total)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        if self.cancelled or len(completed) < total:
+            print(f"MP3 export stopped with {len(completed)} of {total} chunks saved in {work_dir}")
+            return None
+
+        elapsed = time.perf_counter() - started
+        print(f"Synthesized {synthesized_chars} chars in {elapsed:.1f}s with concurrency "
+              f"{self.concurrency} ({synthesized_chars / max(elapsed, 1e-6):.0f} chars/s)")
+
+        await asyncio.to_thread(self._assemble, work_dir, names, file_path, self.backend.audio_format)
+        await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+        return file_path
+
+    @staticmethod
+    def _assemble(work_dir, names, file_path, audio_format='mp3'):
+        """Concatenate the chunk files in order
+
+        MP3 is a plain sequence of frames, so chunks are copied as-is. WAV chunks
+        (offline backends) are merged under a single header.
+        """
+        temp_path = file_path + '.part'
+        try:
+            with open(temp_path, 'wb') as out:
+                if audio_format == 'wav':
+                    MP3Exporter._assemble_wav(work_dir, names, out)
+                else:
+                    for name in names:
+                        with open(os.path.join(work_dir, name), 'rb') as f:
+                            shutil.copyfileobj(f, out)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _assemble_wav(work_dir, names, out):
+        out.write(wav_header(0, 0))  # Placeholder, rewritten once the length is known
+        frames = 0
+        sample_rate = None
+        for name in names:
+            with wave.open(os.path.join(work_dir, name), 'rb') as wav:
+                if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                    raise ValueError("Only mono 16-bit WAV chunks can be assembled")
+                if sample_rate not in (None, wav.getframerate()):
+                    raise ValueError("WAV chunks have different sample rates")
+                sample_rate = wav.getframerate()
+                data = wav.readframes(wav.getnframes())
+            out.write(data)
+            frames += len(data) // 2
+        out.seek(0)
+        out.write(wav_header(frames, sample_rate or 0))
+
+    def export(self, text, file_path, on_progress=None):
+        """Blocking export that runs on the shared TTS service loop"""
+        return get_tts_service().run(self.export_async(text, file_path, on_progress))
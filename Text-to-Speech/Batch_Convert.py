@@ -0,0 +1,117 @@
+import asyncio
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Audio_Export import DEFAULT_CONCURRENCY, MP3Exporter
+from Document_Loader import LOADERS, load_document
+from Speech_Synthesis import DEFAULT_VOICE, get_backend, get_tts_service
+from Text_Normalizer import normalize_for_speech
+
+
+def collect_documents(sources, recursive=False):
+    """Expand directories and glob patterns into a sorted list of supported documents"""
+    found = set()
+    for source in sources:
+        if os.path.isdir(source):
+            pattern = os.path.join(source, '**', '*') if recursive else os.path.join(source, '*')
+            matches = glob.glob(pattern, recursive=recursive)
+        else:
+            matches = glob.glob(source, recursive=recursive)
+        for path in matches:
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in LOADERS:
+                found.add(os.path.abspath(path))
+    return sorted(found)
+
+
+def output_path_for(document, output_dir=None, extension='.mp3'):
+    """Audio file for document: same name, in output_dir or next to the document"""
+    base = os.path.splitext(os.path.basename(document))[0] + extension
+    return os.path.join(output_dir or os.path.dirname(document), base)
+
+
+class BatchConverter:
+    """Convert many documents to audio files without the GUI
+
+    Text extraction (PDF parsing in particular is CPU-bound) runs in a process
+    pool, while synthesis runs on the shared TTS loop. One semaphore bounds the
+    synthesis requests of all documents together, so many small files keep the
+    workers as busy as one large one.
+    """
+
+    def __init__(self, voice=DEFAULT_VOICE, workers=None, concurrency=DEFAULT_CONCURRENCY,
+                 rate="+0%", pitch="+0Hz", volume="+0%", output_dir=None, overwrite=False,
+                 strip_furniture=False):
+        self.voice = voice
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.pitch = pitch
+        self.volume = volume
+        self.output_dir = output_dir
+        self.overwrite = overwrite
+        self.strip_furniture = strip_furniture
+
+    def _is_up_to_date(self, document, output):
+        return (not self.overwrite and os.path.exists(output) and
+                os.path.getmtime(output) >= os.path.getmtime(document))
+
+    async def _convert_one(self, pool, semaphore, document, output, results):
+        loop = asyncio.get_running_loop()
+        try:
+            started = time.perf_counter()
+            text = normalize_for_speech(await loop.run_in_executor(pool, load_document, document,
+                                                                    self.strip_furniture))
+            extracted = time.perf_counter()
+            exporter = MP3Exporter(self.voice, concurrency=self.concurrency,
+                                   rate=self.rate, pitch=self.pitch, volume=self.volume)
+            await exporter.export_async(text, output, semaphore=semaphore)
+            finished = time.perf_counter()
+            results['converted'] += 1
+            results['chars'] += len(text)
+            print(f"[{results['converted'] + results['failed']}/{results['total']}] {os.path.basename(output)}: "
+                  f"{len(text)} chars, extracted in {extracted - started:.1f}s, "
+                  f"synthesized in {finished - extracted:.1f}s")
+        except Exception as e:
+            results['failed'] += 1
+            print(f"Error converting {document}: {e}")
+
+    async def convert_async(self, documents):
+        """Convert documents concurrently and return a summary dict"""
+        extension = '.wav' if get_backend().audio_format == 'wav' else '.mp3'
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        jobs = []
+        skipped = 0
+        for document in documents:
+            output = output_path_for(document, self.output_dir, extension)
+            if self._is_up_to_date(document, output):
+                skipped += 1
+            else:
+                jobs.append((document, output))
+        if skipped:
+            print(f"Skipping {skipped} documents whose audio is newer than the source")
+
+        results = {'total': len(jobs), 'converted': 0, 'failed': 0, 'skipped': skipped, 'chars': 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(self.workers, max(1, len(jobs)))) as pool:
+            await asyncio.gather(*(self._convert_one(pool, semaphore, document, output, results)
+                                   for document, output in jobs))
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def convert(self, documents):
+        """Blocking conversion that runs on the shared TTS service loop"""
+        return get_tts_service().run(self.convert_async(documents))
+
+
+def format_summary(results):
+    """Throughput summary of a batch run"""
+    elapsed = max(results['elapsed'], 1e-6)
+    return (f"Converted {results['converted']} of {results['total']} documents "
+            f"({results['failed']} failed, {results['skipped']} up to date) in {elapsed:.1f}s: "
+            f"{results['converted'] * 60 / elapsed:.1f} documents/min, "
+            f"{results['chars'] / elapsed:.0f} characters/sec")
@@ -0,0 +1,115 @@
+import os
+import re
+from collections import Counter
+
+import docx
+import PyPDF2
+
+# Tried in order for plain text files
+TEXT_ENCODINGS = ['utf-8', 'utf-16', 'ascii', 'latin-1']
+
+# Running headers and footers are looked for among the first and last few lines of each page
+FURNITURE_LINES = 3
+# A line counts as furniture when it recurs on at least this share of the pages
+FURNITURE_PAGE_SHARE = 0.5
+FURNITURE_MIN_PAGES = 3
+_DIGITS = re.compile(r'\d+')
+
+
+def _furniture_key(line):
+    # Page numbers change from page to page, so "Page 3 of 40" matches "Page 4 of 40"
+    return _DIGITS.sub('#', ' '.join(line.split()).casefold())
+
+
+def strip_page_furniture(pages):
+    """Remove running headers and footers that repeat across pages
+
+    Only the first and last FURNITURE_LINES non-empty lines of a page are
+    candidates, so repeated sentences in the body are never touched.
+    """
+    if len(pages) < FURNITURE_MIN_PAGES:
+        return pages
+
+    page_lines = [page.splitlines() for page in pages]
+    edges = []
+    for lines in page_lines:
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        # Short pages offer fewer candidates, so their body is never mistaken for furniture
+        depth = min(FURNITURE_LINES, len(filled) // 3)
+        edges.append(set(filled[:depth] + filled[len(filled) - depth:]))
+
+    counts = Counter()
+    for lines, edge in zip(page_lines, edges):
+        counts.update({_furniture_key(lines[i]) for i in edge})
+    threshold = max(2, len(pages) * FURNITURE_PAGE_SHARE)
+    furniture = {key for key, count in counts.items() if count >= threshold}
+    if not furniture:
+        return pages
+
+    stripped = []
+    for lines, edge in zip(page_lines, edges):
+        stripped.append('\n'.join(line for i, line in enumerate(lines)
+                                   if i not in edge or _furniture_key(line) not in furniture))
+    return stripped
+
+
+def read_text_file(file_path, strip_furniture=False):
+    """Return the text of a plain text file, trying the common encodings
+
+    Form feeds mark pages in text exported from PDFs; with strip_furniture their
+    running headers and footers are removed.
+    """
+    for encoding in TEXT_ENCODINGS:
+        try:
+            with open(file_path, 'r', encoding=encoding) as file:
+                text = file.read()
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise Exception("Could not read file with any supported encoding")
+    if strip_furniture and '\f' in text:
+        text = '\f'.join(strip_page_furniture(text.split('\f')))
+    return text
+
+
+def read_pdf_file(file_path, strip_furniture=False):
+    """Return the text of every page of a PDF, pages separated by blank lines
+
+    strip_furniture removes running headers and footers repeated across pages.
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        pages = [page.extract_text() for page in pdf_reader.pages]
+    if strip_furniture:
+        pages = strip_page_furniture(pages)
+    text = "".join(page + "\n\n" for page in pages)
+    if not text.strip():
+        raise Exception("No text could be extracted from the PDF")
+    return text
+
+
+def read_word_file(file_path, strip_furniture=False):
+    """Return the paragraph text of a Word document (headers and footers are never included)"""
+    doc = docx.Document(file_path)
+    text = ""
+    for para in doc.paragraphs:
+        text += para.text + "\n"
+    if not text.strip():
+        raise Exception("No text could be extracted from the Word document")
+    return text
+
+
+LOADERS = {
+    '.txt': read_text_file,
+    '.pdf': read_pdf_file,
+    '.docx': read_word_file,
+}
+
+
+def load_document(file_path, strip_furniture=False):
+    """Return the text of a .txt, .pdf or .docx file"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in LOADERS:
+        raise ValueError(f"Unsupported document type: {extension}")
+    return LOADERS[extension](file_path, strip_furniture)
@@ -2,26 +2,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import keyboard
 import pytesseract
-from PIL import Image
-import mss
-import mss.tools
-import pyttsx3
 import threading
-import edge_tts
 import asyncio
-import pyautogui
-import numpy as np
-from PIL import ImageFilter
 import os
-import tempfile
-import winsound
-from pydub import AudioSegment
 import cv2
-import easyocr
-
-# Initialize EasyOCR reader
-# This needs to be done once
-reader = easyocr.Reader(['en'])
+from Audio_Engine import StreamPlayer, decode_audio
+from Speech_Synthesis import CancelToken, synthesize_mp3_async, get_tts_service
+from Voice_Catalog import get_voice_catalog
+from Text_Normalizer import clean_ocr_text
+from OCR_Engine import get_easyocr_reader, get_ocr_engine
+from Screen_Capture import grab_region, virtual_screen
+from Image_Preprocessing import GAMING_BINARIZE_PIPELINE, GAMING_SCALE_PIPELINE
+from OCR_Cache import DEFAULT_TOLERANCE, fingerprint, get_ocr_cache
+from Region_Watcher import RegionWatcher
 
 # Set Tesseract path (still needed for Tesseract checks, but OCR will use EasyOCR)
 TESSERACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Tesseract-OCR", "tesseract.exe")
@@ -39,6 +32,9 @@ else:
 
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 
+# Tesseract configuration for small game text
+TESSERACT_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?@#$%^&*()[]{}<>-_=+;:\'\" "'
+
 # Verify Tesseract language data exists
 tessdata_path = os.path.join(os.path.dirname(TESSERACT_PATH), "tessdata")
 eng_traineddata_path = os.path.join(tessdata_path, "eng.traineddata")
@@ -53,8 +49,10 @@ else:
     print("Tesseract tessdata and eng.traineddata found.")
 
 class GamingSpeechWindow:
-    def __init__(self, parent):
+    def __init__(self, parent, app=None):
         self.parent = parent
+        # The main application whose Tk root is parent, for copying text back to it
+        self.app = app
         # Store reference to main window
         self.main_window = parent
         
@@ -77,13 +75,23 @@ class GamingSpeechWindow:
             'text_size': tk.IntVar(value=12),
             'show_box': tk.BooleanVar(value=True),
             'hotkey': tk.StringVar(value="F1"),
-            'voice': tk.StringVar(value="en-US-GuyNeural")
+            'voice': tk.StringVar(value="en-US-GuyNeural"),
+            'ocr_tolerance': tk.IntVar(value=DEFAULT_TOLERANCE),
+            'watch_box': tk.BooleanVar(value=False),
+            'debug_images': tk.BooleanVar(value=True)
         }
+
+        # Text already recognized in recent captures, so re-reading a box skips OCR
+        self.ocr_cache = get_ocr_cache()
+        self.ocr_cache.tolerance = self.settings['ocr_tolerance'].get()
         
         # Add stop flag and thread tracking
         self.stop_flag = False
         self.tts_thread = None
         self.is_reading = False
+        self.player = None
+        self.read_token = None  # CancelToken of the read in progress
+        self.box_watcher = None  # RegionWatcher while Watch Box is on
         
         # Selection box variables
         self.selection_mode = False
@@ -129,6 +137,21 @@ class GamingSpeechWindow:
         # Minimize main window after a short delay
         self.window.after(100, self.minimize_main_window)
 
+        # Load the Tesseract model now, so the first capture only pays for recognition
+        threading.Thread(target=self._warm_up_ocr, daemon=True).start()
+
+    def _warm_up_ocr(self):
+        try:
+            get_ocr_engine().warm_up(TESSERACT_CONFIG)
+        except Exception as e:
+            print(f"Error warming up Tesseract: {e}")
+        # The EasyOCR fallback is loaded here rather than at import, so headless
+        # and batch processes that import this module never load its model
+        try:
+            get_easyocr_reader()
+        except Exception as e:
+            print(f"Error loading EasyOCR: {e}")
+
     def minimize_main_window(self):
         """Minimize the main window"""
         try:
@@ -187,6 +210,8 @@ class GamingSpeechWindow:
         tk.Checkbutton(left_frame, text="Compact Mode", variable=self.settings['compact_mode'], command=self.apply_settings).pack(anchor=tk.W)
         tk.Checkbutton(left_frame, text="High Contrast", variable=self.settings['high_contrast'], command=self.apply_settings).pack(anchor=tk.W)
         tk.Checkbutton(left_frame, text="Show Box", variable=self.settings['show_box'], command=self.toggle_box_visibility).pack(anchor=tk.W)
+        tk.Checkbutton(left_frame, text="Watch Box", variable=self.settings['watch_box'], command=self.toggle_watch_mode).pack(anchor=tk.W)
+        tk.Checkbutton(left_frame, text="Save Debug Images", variable=self.settings['debug_images']).pack(anchor=tk.W)
 
         # Right checkboxes and controls
         tk.Checkbutton(right_frame, text="Hide Box", variable=self.settings['auto_hide'], command=self.toggle_box_visibility).pack(anchor=tk.W)
@@ -196,12 +221,8 @@ class GamingSpeechWindow:
         voice_frame.pack(fill=tk.X, pady=2)
         tk.Label(voice_frame, text="Voice:").pack(side=tk.LEFT)
         self.voice_combo = ttk.Combobox(voice_frame, textvariable=self.settings['voice'], state="readonly", width=15)
-        self.voice_combo['values'] = [
-            "en-US-GuyNeural",
-            "en-US-AriaNeural",
-            "en-GB-RyanNeural",
-            "en-GB-SoniaNeural"
-        ]
+        # English Edge voices from the shared voice catalog
+        self.voice_combo['values'] = sorted(voice.id for voice in get_voice_catalog().voices('edge', 'en'))
         self.voice_combo.pack(side=tk.LEFT, padx=5)
 
         # Box opacity slider
@@ -219,6 +240,13 @@ class GamingSpeechWindow:
         panel_slider = tk.Scale(panel_opacity_frame, from_=0.1, to=1.0, resolution=0.05, orient=tk.HORIZONTAL, variable=self.panel_opacity, command=self.update_panel_opacity, length=100)
         panel_slider.pack(side=tk.LEFT, padx=5)
 
+        # How different a capture may look and still reuse the text read from it before
+        tolerance_frame = tk.Frame(right_frame)
+        tolerance_frame.pack(fill=tk.X, pady=2)
+        tk.Label(tolerance_frame, text="OCR Reuse Tolerance:").pack(side=tk.LEFT)
+        tolerance_slider = tk.Scale(tolerance_frame, from_=0, to=64, orient=tk.HORIZONTAL, variable=self.settings['ocr_tolerance'], command=self.update_ocr_tolerance, length=100)
+        tolerance_slider.pack(side=tk.LEFT, padx=5)
+
         # Control buttons section
         control_frame = tk.LabelFrame(main_frame, text="Controls")
         control_frame.pack(fill=tk.X, pady=5)
@@ -287,6 +315,10 @@ class GamingSpeechWindow:
         """Update panel opacity"""
         self.window.attributes('-alpha', self.panel_opacity.get())
 
+    def update_ocr_tolerance(self, value):
+        """Update how closely a capture must match a cached one to reuse its text (0 = exact only)"""
+        self.ocr_cache.tolerance = self.settings['ocr_tolerance'].get()
+
     def start_selection(self):
         """Start screen selection mode"""
         if self.selection_mode:
@@ -303,21 +335,15 @@ class GamingSpeechWindow:
         self.window.after(150, self._initiate_capture_overlay)
 
     def _initiate_capture_overlay(self):
-        """Takes screenshot of ALL monitors and creates overlay window covering them"""
-        try:
-            # Use MSS to get virtual screen geometry and capture it
-            with mss.mss() as sct:
-                # Monitor 0 provides the bounding box for the entire virtual screen
-                self.virtual_screen_geo = sct.monitors[0]
-                print(f"Virtual screen geometry: {self.virtual_screen_geo}")
-
-                # Grab the entire virtual screen
-                sct_img = sct.grab(self.virtual_screen_geo)
+        """Creates an overlay window covering ALL monitors
 
-                # Convert the MSS BGRA image to a PIL Image (RGB)
-                self.screenshot = Image.frombytes("RGB", sct_img.size, sct_img.rgb)
-
-            print(f"Virtual screenshot taken: {self.screenshot.size}")
+        Only the box's geometry is chosen here; read_box_text grabs just the box
+        each time it reads, so nothing is captured up front.
+        """
+        try:
+            # Monitor 0 provides the bounding box for the entire virtual screen
+            self.virtual_screen_geo = virtual_screen()
+            print(f"Virtual screen geometry: {self.virtual_screen_geo}")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture screen using MSS: {str(e)}")
@@ -714,42 +740,50 @@ class GamingSpeechWindow:
                 self.copy_to_main
             )
             
+            # Register hotkey for watching the box
+            keyboard.add_hotkey(
+                'ctrl+shift+w',
+                self.toggle_watch_hotkey
+            )
+            
         except Exception as e:
             print(f"Error registering hotkeys: {e}")
 
-    async def read_text_with_edge_tts(self, text):
-        """Read text using Edge TTS"""
+    async def read_text_with_edge_tts(self, text, token):
+        """Read text using Edge TTS; cancelling token stops it"""
+        player = None
         try:
-            if self.stop_flag:
+            if self.stop_flag or token.cancelled:
                 return
                 
-            # Create new Communicate instance with text
-            communicate = edge_tts.Communicate(text, self.settings['voice'].get())
+            # Synthesize, or reuse a cached recording of a repeated dialogue line
+            mp3_data = await synthesize_mp3_async(text, self.settings['voice'].get())
+            # Decode off the service loop so other syntheses keep going meanwhile
+            pcm = await asyncio.to_thread(decode_audio, mp3_data)
+            if self.stop_flag or token.cancelled:
+                return
             
-            # Create temporary directory for audio files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_mp3 = os.path.join(temp_dir, "temp_audio.mp3")
-                
-                # Save audio
-                await communicate.save(temp_mp3)
-                
-                # Play the audio file using subprocess
-                import subprocess
-                process = subprocess.Popen(['ffplay', '-autoexit', '-nodisp', temp_mp3])
-                
-                # Wait for the process to finish or stop flag
-                while process.poll() is None and not self.stop_flag:
-                    await asyncio.sleep(0.1)
-                
-                # Kill the process if stop flag is set
-                if self.stop_flag:
-                    process.terminate()
-                    process.wait()
+            # Play through the in-process output stream; the token silences it on stop
+            player = token.bind_player(StreamPlayer())
+            self.player = player
+            player.start()
+            player.write(pcm)
+            player.finish()
+            
+            # Wait for playback to finish or stop flag
+            while not player.is_done() and not self.stop_flag and token.active():
+                await asyncio.sleep(0.05)
                 
         except Exception as e:
             print(f"Error in Edge TTS: {e}")
-            if not self.stop_flag:  # Only show error if not stopped
+            if not self.stop_flag and not token.cancelled:  # Only show error if not stopped
                 messagebox.showerror("Error", f"Failed to read text: {str(e)}")
+        finally:
+            # Whatever ended the read, its audio must not keep playing
+            if player is not None:
+                player.stop()
+                if self.player is player:
+                    self.player = None
 
     def start_reading(self):
         """Start reading the text"""
@@ -765,17 +799,24 @@ class GamingSpeechWindow:
             self.is_reading = False
             return
             
-        # Use Edge TTS
+        # Use Edge TTS; the token lets stop_reading cancel synthesis and playback at once
+        token = CancelToken()
+        self.read_token = token
+        
         def run_edge_tts():
             try:
-                asyncio.run(self.read_text_with_edge_tts(text))
+                token.track(get_tts_service().submit(self.read_text_with_edge_tts(text, token))).result()
             except Exception as e:
-                print(f"Error in Edge TTS thread: {e}")
+                if not token.cancelled:
+                    print(f"Error in Edge TTS thread: {e}")
             finally:
-                self.is_reading = False
-                self.stop_flag = False
-                # Force update UI
-                self.window.after(0, self.window.update_idletasks)
+                # A newer read may already own the window state
+                if self.read_token is token:
+                    self.read_token = None
+                    self.is_reading = False
+                    self.stop_flag = False
+                    # Force update UI
+                    self.window.after(0, self.window.update_idletasks)
         
         # Store the thread for cleanup
         self.tts_thread = threading.Thread(target=run_edge_tts, daemon=True)
@@ -787,9 +828,12 @@ class GamingSpeechWindow:
         self.stop_flag = True
         
         try:
-            # Kill any running ffplay processes
-            import subprocess
-            subprocess.run(['taskkill', '/F', '/IM', 'ffplay.exe'], capture_output=True)
+            # Cancel our own synthesis and flush our own audio; nothing else is touched
+            if self.read_token:
+                self.read_token.cancel()
+                self.read_token = None
+            if self.player:
+                self.player.stop()
             
             # Reset states immediately
             self.is_reading = False
@@ -814,9 +858,12 @@ class GamingSpeechWindow:
     def copy_to_main(self):
         """Copy text to main window"""
         text = self.text_area.get(1.0, tk.END).strip()
-        if text:
-            self.parent.text_area.delete(1.0, tk.END)
-            self.parent.text_area.insert(1.0, text)
+        if text and self.app:
+            self.app.text_area.delete(1.0, tk.END)
+            self.app.text_area.insert(1.0, text)
+            # The main window usually reads this next; warm its first sentences (if enabled)
+            # with its own voice, speed and normalization
+            self.app.prefetch_speech(text)
 
     def on_close(self):
         """Handle window close"""
@@ -824,10 +871,12 @@ class GamingSpeechWindow:
         try:
             # Set stop flag
             self.stop_flag = True
-            
-            # Kill any running ffplay processes
-            import subprocess
-            subprocess.run(['taskkill', '/F', '/IM', 'ffplay.exe'], capture_output=True)
+            self.stop_watching()
+            if self.read_token:
+                self.read_token.cancel()
+                self.read_token = None
+            if self.player:
+                self.player.stop()
             
             # Clean up selection box
             if self.selection_box:
@@ -851,6 +900,118 @@ class GamingSpeechWindow:
             import sys
             sys.exit(1)
 
+    def recognize_box_image(self, img, save_debug_images=False):
+        """Preprocess a captured box and OCR it: Tesseract, then EasyOCR if Tesseract finds nothing"""
+        # Save the original image for debugging
+        if save_debug_images:
+            original_image_path = os.path.join(os.getcwd(), "debug_original.png")
+            img.save(original_image_path)
+            print(f"Original image saved to {original_image_path}")
+
+        # Grayscale, then scale up 2x for better small text detection
+        scaled_image = GAMING_SCALE_PIPELINE.run(img)
+
+        # Adaptive threshold for better text/background separation, then a slight
+        # blur to reduce noise while preserving text
+        try:
+            blurred_image = GAMING_BINARIZE_PIPELINE.run(scaled_image)
+        except Exception as e:
+            print(f"Thresholding failed: {e}")
+            blurred_image = scaled_image
+
+        # Save the processed image for debugging
+        if save_debug_images:
+            processed_image_path = os.path.join(os.getcwd(), "debug_processed.png")
+            cv2.imwrite(processed_image_path, blurred_image)
+            print(f"Processed image saved to {processed_image_path}")
+
+        # Try Tesseract with optimized configuration for small text
+        print("Starting OCR with Tesseract...")
+        try:
+            # The shared engine keeps the model loaded between captures
+            text = get_ocr_engine().image_to_string(blurred_image, config=TESSERACT_CONFIG)
+            print(f"OCR completed with Tesseract. Text: {text}")
+
+        except Exception as e:
+            print(f"Error during Tesseract OCR: {str(e)}")
+            text = ""
+
+        # If Tesseract fails or returns no text, try EasyOCR
+        if not text.strip():
+            print("Tesseract returned no text, trying EasyOCR...")
+            try:
+                # Try with the scaled image for better small text detection
+                results = get_easyocr_reader().readtext(scaled_image)
+                text = " ".join([result[1] for result in results])
+                print(f"OCR completed with EasyOCR. Text: {text}")
+            except Exception as e:
+                print(f"Error during EasyOCR: {str(e)}")
+                text = ""
+
+        return text
+
+    def ocr_capture(self, img, capture=None, save_debug_images=False):
+        """Cleaned text of a captured box; a box showing the same text as a recent capture reuses its result"""
+        if capture is None:
+            capture = fingerprint(img)
+        text = self.ocr_cache.get(capture, TESSERACT_CONFIG)
+        if text is not None:
+            print(f"Reusing cached OCR text: {text}")
+            return text
+        text = clean_ocr_text(self.recognize_box_image(img, save_debug_images))
+        if text:
+            self.ocr_cache.put(capture, text, TESSERACT_CONFIG)
+        return text
+
+    def toggle_watch_mode(self):
+        """Start or stop watching the box, per the Watch Box checkbox"""
+        if self.settings['watch_box'].get():
+            self.start_watching()
+        else:
+            self.stop_watching()
+
+    def toggle_watch_hotkey(self):
+        """Flip Watch Box from the hotkey"""
+        self.settings['watch_box'].set(not self.settings['watch_box'].get())
+        self.toggle_watch_mode()
+
+    def start_watching(self):
+        """Read new text in the box automatically as it appears"""
+        if self.box_watcher:
+            return
+        # Polled on the watcher's thread; OCR runs only once a change has settled
+        self.box_watcher = RegionWatcher(lambda: self.selection_box_geometry, self._on_box_settled)
+        self.box_watcher.start()
+        self.status_var.set("Watching box for new text")
+        print("Watching box for new text")
+
+    def stop_watching(self):
+        """Stop reading new text in the box automatically"""
+        if self.box_watcher:
+            self.box_watcher.stop()
+            self.box_watcher = None
+            self.status_var.set("Stopped watching box")
+            print("Stopped watching box")
+
+    def _on_box_settled(self, img, capture):
+        # Watcher thread: OCR here, then hand the text to the window. No debug
+        # images: watching would rewrite them every time the box changes.
+        text = self.ocr_capture(img, capture)
+        self.window.after(0, self._read_watched_text, text)
+
+    def _read_watched_text(self, text):
+        # Only text that differs from what the window already holds is read
+        if not text or not self.box_watcher:
+            return
+        if text == self.text_area.get(1.0, tk.END).strip():
+            return
+        # Newly appeared text replaces a line still being read
+        if self.is_reading:
+            self.stop_reading()
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(tk.END, text)
+        self.start_reading()
+
     def read_box_text(self):
         """Read text from the current selection box"""
         if not self.selection_box_geometry:
@@ -864,78 +1025,15 @@ class GamingSpeechWindow:
             # Take screenshot
             print("Taking screenshot...")
             try:
-                img = pyautogui.screenshot(region=(x, y, w, h))
+                # Only the box is captured, on whichever monitor it is
+                img = grab_region(x, y, w, h)
                 print(f"Screenshot taken, size: {img.size}")
             except Exception as e:
                 print(f"Error taking screenshot: {e}")
                 raise Exception("Failed to capture screen region")
             
-            # Convert the PIL image to a format compatible with OpenCV
-            cv_image = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-
-            # Save the original image for debugging
-            original_image_path = os.path.join(os.getcwd(), "debug_original.png")
-            cv2.imwrite(original_image_path, cv_image)
-            print(f"Original image saved to {original_image_path}")
-
-            # Scale up the image for better small text detection
-            scale_factor = 2.0
-            scaled_image = cv2.resize(cv_image, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_CUBIC)
-
-            # Convert to grayscale
-            gray_image = cv2.cvtColor(scaled_image, cv2.COLOR_BGR2GRAY)
-
-            # Apply adaptive thresholding for better text/background separation
-            try:
-                thresh_image = cv2.adaptiveThreshold(
-                    gray_image,
-                    255,
-                    cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY,
-                    11,  # Block size
-                    2    # C constant
-                )
-            except Exception as e:
-                print(f"Adaptive thresholding failed: {e}")
-                thresh_image = gray_image
-
-            # Apply slight blur to reduce noise while preserving text
-            try:
-                blurred_image = cv2.GaussianBlur(thresh_image, (3, 3), 0)
-            except Exception as e:
-                print(f"Blurring failed: {e}")
-                blurred_image = thresh_image
-
-            # Save the processed image for debugging
-            processed_image_path = os.path.join(os.getcwd(), "debug_processed.png")
-            cv2.imwrite(processed_image_path, blurred_image)
-            print(f"Processed image saved to {processed_image_path}")
-
-            # Try Tesseract with optimized configuration for small text
-            print("Starting OCR with Tesseract...")
-            try:
-                # Configure Tesseract for small text
-                custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?@#$%^&*()[]{}<>-_=+;:\'\" "'
-                text = pytesseract.image_to_string(blurred_image, config=custom_config)
-                print(f"OCR completed with Tesseract. Text: {text}")
-
-            except Exception as e:
-                print(f"Error during Tesseract OCR: {str(e)}")
-                text = ""
-
-            # If Tesseract fails or returns no text, try EasyOCR
-            if not text.strip():
-                print("Tesseract returned no text, trying EasyOCR...")
-                try:
-                    # Try with the scaled image for better small text detection
-                    results = reader.readtext(scaled_image)
-                    text = " ".join([result[1] for result in results])
-                    print(f"OCR completed with EasyOCR. Text: {text}")
-                except Exception as e:
-                    print(f"Error during EasyOCR: {str(e)}")
-                    text = ""
-
-            if text.strip():
+            text = self.ocr_capture(img, save_debug_images=self.settings['debug_images'].get())
+            if text:
                 # Update text area
                 self.text_area.delete(1.0, tk.END)
                 self.text_area.insert(tk.END, text)
@@ -991,6 +1089,7 @@ Ctrl+Shift+R: Read selected text
 Ctrl+Shift+S: Stop reading
 Ctrl+Shift+H: Toggle box visibility
 Ctrl+Shift+G: Copy text to main window
+Ctrl+Shift+W: Toggle watching the box
 
 Selection Box Controls:
 ---------------------
@@ -1013,6 +1112,8 @@ Settings:
 • Compact Mode: Reduce window size
 • High Contrast: Change text colors for better visibility
 • Show Box: Toggle selection box visibility
+• Watch Box: Read new text in the box as soon as it appears
+• Save Debug Images: Keep each manual read's capture as debug_original.png and debug_processed.png
 • Hide Box: Temporarily hide the box
 • Box Opacity: Adjust selection box transparency
 • Panel Opacity: Adjust window transparency
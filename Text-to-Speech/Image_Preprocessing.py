@@ -0,0 +1,235 @@
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+# PIL's ImageFilter.SHARPEN kernel
+_SHARPEN_KERNEL = np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32) / 16
+
+
+def _writable(array):
+    # Arrays viewing a PIL image's bytes are read-only; copy only when a stage must write
+    return array if array.flags.writeable else array.copy()
+
+
+class Stage:
+    """One preprocessing step: a function from a uint8 array to a uint8 array
+
+    Stages modify the array in place and return it where the operation allows;
+    only stages that change the shape (grayscale, scale) return a new array.
+    """
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+    def __call__(self, array):
+        return self.function(array)
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def grayscale():
+    """RGB or RGBA to 8-bit gray; gray input passes through"""
+    def apply(array):
+        if array.ndim == 2:
+            return array
+        code = cv2.COLOR_RGBA2GRAY if array.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        return cv2.cvtColor(array, code)
+    return Stage('grayscale', apply)
+
+
+def contrast(factor):
+    """Stretch around the mean gray level, like PIL's ImageEnhance.Contrast"""
+    def apply(array):
+        array = _writable(array)
+        mean = int(cv2.mean(array)[0] + 0.5)
+        # Saturates to 0..255 like PIL, written straight back into the array
+        return cv2.addWeighted(array, factor, array, 0, (1 - factor) * mean, dst=array)
+    return Stage(f'contrast {factor}', apply)
+
+
+def threshold(level=128):
+    """Black below level, white from level up"""
+    def apply(array):
+        array = _writable(array)
+        cv2.threshold(array, level - 1, 255, cv2.THRESH_BINARY, dst=array)
+        return array
+    return Stage(f'threshold {level}', apply)
+
+
+def otsu_threshold():
+    """Black and white at the level that best separates the gray histogram's two peaks"""
+    def apply(array):
+        array = _writable(array)
+        cv2.threshold(array, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=array)
+        return array
+    return Stage('otsu threshold', apply)
+
+
+def adaptive_threshold(block_size=11, offset=2):
+    """Black and white against each pixel's Gaussian-weighted neighbourhood, for uneven backgrounds"""
+    def apply(array):
+        array = _writable(array)
+        return cv2.adaptiveThreshold(array, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                     block_size, offset, dst=array)
+    return Stage(f'adaptive threshold {block_size}', apply)
+
+
+def gaussian_blur(sigma=0.5, size=0):
+    """Soften edges and speckle; size 0 derives the kernel from sigma"""
+    def apply(array):
+        array = _writable(array)
+        return cv2.GaussianBlur(array, (size, size), sigma, dst=array)
+    return Stage(f'gaussian blur {size or sigma}', apply)
+
+
+def median_denoise(size=3):
+    """Remove salt-and-pepper noise while keeping edges"""
+    def apply(array):
+        array = _writable(array)
+        return cv2.medianBlur(array, size, dst=array)
+    return Stage(f'median {size}', apply)
+
+
+def sharpen():
+    """PIL's SHARPEN filter"""
+    def apply(array):
+        array = _writable(array)
+        return cv2.filter2D(array, -1, _SHARPEN_KERNEL, dst=array)
+    return Stage('sharpen', apply)
+
+
+def scale(factor, interpolation=cv2.INTER_CUBIC):
+    """Resize by factor; small text recognizes better enlarged"""
+    def apply(array):
+        return cv2.resize(array, None, fx=factor, fy=factor, interpolation=interpolation)
+    return Stage(f'scale {factor}', apply)
+
+
+def to_array(image):
+    """A contiguous uint8 array of a PIL image or array, never sharing memory with an input array
+
+    PIL images become a read-only array over one copy of their pixels; the first
+    stage that writes in place copies it only if no earlier stage already made a
+    new array.
+    """
+    if isinstance(image, Image.Image):
+        if image.mode not in ('L', 'RGB', 'RGBA'):
+            image = image.convert('L' if image.mode in ('1', 'I', 'I;16', 'F') else 'RGB')
+        return np.asarray(image)
+    return np.array(image, dtype=np.uint8, order='C')
+
+
+class Pipeline:
+    """Stages applied in order to one array, most of them in place"""
+
+    def __init__(self, *stages):
+        self.stages = list(stages)
+
+    def run(self, image, profile=None):
+        """Return image (PIL image or array, left unmodified) preprocessed as a uint8 array
+
+        profile, if given, is a list that receives (stage name, seconds, bytes
+        allocated) for each stage.
+        """
+        if profile is None:
+            array = to_array(image)
+            for stage in self.stages:
+                array = stage(array)
+            return array
+
+        array = image
+        for stage in [Stage('to array', to_array)] + self.stages:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            array = stage(array)
+            elapsed = time.perf_counter() - started
+            profile.append((stage.name, elapsed, max(0, tracemalloc.get_traced_memory()[1] - before)))
+        return array
+
+
+# Screen selections: the previous PIL chain's steps, minus its intermediate images
+SELECTION_PIPELINE = Pipeline(grayscale(), contrast(1.5), threshold(128), gaussian_blur(0.5))
+# Tools > Enhanced OCR
+ENHANCED_PIPELINE = Pipeline(grayscale(), contrast(2.0), sharpen(), median_denoise(3))
+# Gaming mode's small game text: enlarged in gray (a third of the pixels of color), then
+# binarized. Two pipelines, so the enlarged gray image is still there for EasyOCR.
+GAMING_SCALE_PIPELINE = Pipeline(grayscale(), scale(2.0))
+GAMING_BINARIZE_PIPELINE = Pipeline(adaptive_threshold(11, 2), gaussian_blur(0, size=3))
+
+
+def _legacy_selection(image):
+    """The PIL chain previously in preprocess_image, kept for the benchmark"""
+    image = image.convert('RGB').convert('L')
+    image = ImageEnhance.Contrast(image).enhance(1.5)
+    image = image.point(lambda x: 0 if x < 128 else 255, '1')
+    return image.convert('L').filter(ImageFilter.GaussianBlur(radius=0.5))
+
+
+def _legacy_gaming(image):
+    """The OpenCV chain previously in read_box_text, kept for the benchmark"""
+    bgr = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    scaled = cv2.resize(bgr, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
+    gray = cv2.cvtColor(scaled, cv2.COLOR_BGR2GRAY)
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    return cv2.GaussianBlur(binary, (3, 3), 0)
+
+
+def _synthetic_capture(width, height):
+    """A screen-like RGB image: a gradient background with rows of dark text-sized strokes"""
+    rng = np.random.default_rng(0)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[...] = np.linspace(180, 240, width, dtype=np.uint8)[None, :, None]
+    for top in range(8, height - 16, 24):
+        for left in range(8, width - 8, 12):
+            if rng.random() < 0.8:
+                image[top:top + 14, left:left + 2 + int(rng.integers(0, 8))] = 30
+    return Image.fromarray(image)
+
+
+def benchmark(width=3840, height=2160, repeats=3):
+    """Time each pipeline's stages (and the code they replaced) on a width x height capture"""
+    image = _synthetic_capture(width, height)
+    tracemalloc.start()
+    cases = [
+        ("selection", [SELECTION_PIPELINE], _legacy_selection),
+        ("enhanced OCR", [ENHANCED_PIPELINE], None),
+        ("gaming", [GAMING_SCALE_PIPELINE, GAMING_BINARIZE_PIPELINE], _legacy_gaming),
+    ]
+    print(f"{width}x{height} capture, best of {repeats}")
+    for name, pipelines, legacy in cases:
+        best = None
+        for _ in range(repeats):
+            profile = []
+            started = time.perf_counter()
+            array = image
+            for pipeline in pipelines:
+                array = pipeline.run(array, profile)
+            total = time.perf_counter() - started
+            if best is None or total < best[0]:
+                best = (total, profile)
+        print(f"{name}: {best[0] * 1000:.1f} ms")
+        for stage, seconds, allocated in best[1]:
+            print(f"    {stage:24s} {seconds * 1000:8.1f} ms  {allocated / 1048576:7.1f} MB allocated")
+        if legacy is not None:
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                legacy(image)
+                timings.append(time.perf_counter() - started)
+            print(f"    previous code            {min(timings) * 1000:8.1f} ms")
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    # python Image_Preprocessing.py [width height]
+    if len(sys.argv) > 2:
+        benchmark(int(sys.argv[1]), int(sys.argv[2]))
+    else:
+        benchmark()
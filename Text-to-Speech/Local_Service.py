@@ -0,0 +1,222 @@
+import io
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from Speech_Synthesis import DEFAULT_VOICE, get_audio_cache, get_backend, get_tts_service, make_cache_key
+from OCR_Engine import DEFAULT_CONFIG as TESSERACT_CONFIG, get_easyocr_reader, get_ocr_engine
+from Text_Normalizer import clean_ocr_text
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUE = 32  # Requests admitted at once (waiting + running); the rest get 503
+DEFAULT_WORKERS = 4
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+# Recent latencies kept per endpoint for the /stats percentiles
+LATENCY_SAMPLES = 1000
+
+
+class ServiceBusy(Exception):
+    """The request queue is full"""
+
+
+class LocalService:
+    """Synthesis and OCR for other tools on this machine, over HTTP on localhost
+
+    The synthesis backend, audio cache and OCR engines stay warm in this process,
+    so a client pays for the work itself rather than for startup. At most
+    max_queue requests are admitted at a time and run on a fixed worker pool;
+    anything beyond that is turned away with 503 instead of piling up. Each
+    response reports how long the request waited and how long it ran.
+
+        POST /tts    JSON {"text", "voice", "rate", "pitch", "volume"} -> audio bytes
+        POST /ocr    image bytes (PNG, JPEG, ...), ?engine=tesseract|easyocr -> JSON
+        GET  /stats  request counts and latency percentiles
+        GET  /health liveness check
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, max_queue=DEFAULT_MAX_QUEUE,
+                 workers=DEFAULT_WORKERS, voice=DEFAULT_VOICE):
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.voice = voice
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._started = time.time()
+        self._server = None
+
+    def _record(self, endpoint, outcome, total_ms=None):
+        with self._stats_lock:
+            entry = self._stats.setdefault(endpoint, {
+                'ok': 0, 'rejected': 0, 'errors': 0, 'latencies': deque(maxlen=LATENCY_SAMPLES)})
+            entry[outcome] += 1
+            if total_ms is not None:
+                entry['latencies'].append(total_ms)
+
+    def run(self, endpoint, work, *args):
+        """Run work(*args) on the worker pool; returns (result, timing dict)
+
+        Raises ServiceBusy when max_queue requests are already admitted.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._record(endpoint, 'rejected')
+            raise ServiceBusy()
+        try:
+            submitted = time.perf_counter()
+            times = {}
+
+            def timed():
+                times['start'] = time.perf_counter()
+                return work(*args)
+
+            try:
+                result = self._executor.submit(timed).result()
+            except Exception:
+                self._record(endpoint, 'errors')
+                raise
+            finished = time.perf_counter()
+            timing = {
+                'queue_ms': round((times['start'] - submitted) * 1000, 1),
+                'process_ms': round((finished - times['start']) * 1000, 1),
+            }
+            self._record(endpoint, 'ok', (finished - submitted) * 1000)
+            return result, timing
+        finally:
+            self._slots.release()
+
+    def synthesize(self, request):
+        """Return (audio bytes, content type, cache hit) for a /tts request"""
+        text = request.get('text', '')
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("No text to synthesize")
+        voice = request.get('voice') or self.voice
+        prosody = (request.get('rate', "+0%"), request.get('pitch', "+0Hz"), request.get('volume', "+0%"))
+        cached = make_cache_key(text, voice, *prosody) in get_audio_cache()
+        audio = get_tts_service().synthesize(text, voice, *prosody).result()
+        content_type = 'audio/wav' if get_backend().audio_format == 'wav' else 'audio/mpeg'
+        return audio, content_type, cached
+
+    def recognize(self, image_bytes, engine='tesseract'):
+        """Return the text in an encoded image"""
+        image = Image.open(io.BytesIO(image_bytes))
+        image.load()
+        if engine == 'easyocr':
+            # Heavy; only loaded when a client asks for it
+            results = get_easyocr_reader().readtext(np.array(image.convert('RGB')))
+            return clean_ocr_text(" ".join(result[1] for result in results))
+        if engine != 'tesseract':
+            raise ValueError(f"Unknown OCR engine: {engine}")
+        return clean_ocr_text(get_ocr_engine().image_to_string(image.convert('L'), config=TESSERACT_CONFIG))
+
+    def stats(self):
+        """Request counts and latency percentiles per endpoint"""
+        with self._stats_lock:
+            endpoints = {}
+            for endpoint, entry in self._stats.items():
+                latencies = sorted(entry['latencies'])
+                summary = {key: entry[key] for key in ('ok', 'rejected', 'errors')}
+                if latencies:
+                    summary.update({
+                        'p50_ms': round(latencies[len(latencies) // 2], 1),
+                        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                        'max_ms': round(latencies[-1], 1),
+                    })
+                endpoints[endpoint] = summary
+        return {
+            'uptime_s': round(time.time() - self._started),
+            'max_queue': self.max_queue,
+            'backend': get_backend().name,
+            'endpoints': endpoints,
+        }
+
+    def serve_forever(self):
+        """Serve until shutdown() or Ctrl+C"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _ServiceHandler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        print(f"Service listening on http://{self.host}:{self.port} (max queue {self.max_queue})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop serve_forever() from another thread"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the LocalService on self.server.service"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so load tests measure the service, not TCP setup
+
+    def log_message(self, format, *args):
+        pass  # Per-request console lines would dominate under load
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif path == '/stats':
+            self._send(200, service.stats())
+        else:
+            self._send(404, {'error': f"Unknown endpoint: {path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        try:
+            body = self._read_body()
+            if url.path == '/tts':
+                request = json.loads(body)
+                if not isinstance(request, dict):
+                    raise ValueError("Request body must be a JSON object")
+                (audio, content_type, cached), timing = service.run('tts', service.synthesize, request)
+                self._send(200, audio, content_type, {
+                    'X-Queue-Ms': timing['queue_ms'],
+                    'X-Process-Ms': timing['process_ms'],
+                    'X-Cache': 'hit' if cached else 'miss',
+                })
+            elif url.path == '/ocr':
+                engine = parse_qs(url.query).get('engine', ['tesseract'])[0]
+                text, timing = service.run('ocr', service.recognize, body, engine)
+                self._send(200, {'text': text, 'engine': engine, **timing})
+            else:
+                self._send(404, {'error': f"Unknown endpoint: {url.path}"})
+        except ServiceBusy:
+            self._send(503, {'error': "Request queue is full, retry later"}, headers={'Retry-After': '1'})
+        except (ValueError, KeyError, UnidentifiedImageError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            print(f"Error handling {url.path}: {e}")
+            self._send(500, {'error': str(e)})
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import cv2
+import numpy as np
+
+from Image_Preprocessing import to_array
+
+DEFAULT_MAX_ENTRIES = 128
+# Largest gray-level difference (0-255) any thumbnail pixel may show for two captures
+# to count as the same text. Capture noise and anti-aliasing stay well below it;
+# a changed character moves some thumbnail pixel far beyond it.
+DEFAULT_TOLERANCE = 16
+# Thumbnails are this wide; the height keeps the region's aspect ratio. Narrower ones
+# average a changed digit of small dialogue text down to within the tolerance.
+THUMBNAIL_WIDTH = 320
+# Gray levels per exact-match bucket, so identical captures hit without a scan
+_KEY_QUANTUM = 32
+
+Fingerprint = namedtuple('Fingerprint', ['key', 'size', 'thumbnail'])
+
+
+def fingerprint(image):
+    """Perceptual fingerprint of a captured region (PIL image or array)
+
+    The region is reduced to a small gray thumbnail by area averaging. Exact
+    lookups use a digest of the coarsely quantized thumbnail; near matches
+    compare thumbnails pixel by pixel.
+    """
+    array = to_array(image) if not isinstance(image, np.ndarray) else image
+    if array.ndim == 3:
+        array = cv2.cvtColor(array, cv2.COLOR_RGBA2GRAY if array.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    height, width = array.shape[:2]
+    thumb_width = min(THUMBNAIL_WIDTH, width)
+    thumb_height = max(1, round(height * thumb_width / width))
+    thumbnail = cv2.resize(array, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+    digest = hashlib.blake2b((thumbnail // _KEY_QUANTUM).tobytes(), digest_size=16).digest()
+    return Fingerprint((width, height, digest), (width, height), thumbnail)
+
+
+class OCRCache:
+    """Recognized text of recent captures, looked up by perceptual fingerprint
+
+    A capture is looked up by key in O(1) and, failing that, by comparing
+    against the entries of the same size; either way it only matches an entry
+    whose every thumbnail pixel is within tolerance gray levels of its own. Least recently used entries are evicted first.
+    namespace separates results of different OCR engines or configurations.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, tolerance=DEFAULT_TOLERANCE):
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self._entries = OrderedDict()  # (namespace, key) -> (fingerprint, text)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _similar(self, a, b):
+        if a.size != b.size or a.thumbnail.shape != b.thumbnail.shape:
+            return False
+        return int(cv2.absdiff(a.thumbnail, b.thumbnail).max()) <= self.tolerance
+
+    def get(self, capture, namespace=''):
+        """Cached text for a fingerprint, or None"""
+        with self._lock:
+            entry_key = (namespace, capture.key)
+            entry = self._entries.get(entry_key)
+            # A shared key only means the thumbnails quantize alike; they can still
+            # be up to a quantum apart, so the key's entry has to pass the compare too
+            if entry is not None and not self._similar(capture, entry[0]):
+                entry = None
+            if entry is None and self.tolerance > 0:
+                for candidate_key, candidate in reversed(self._entries.items()):
+                    if (candidate_key[0] == namespace and candidate_key != entry_key
+                            and self._similar(capture, candidate[0])):
+                        entry_key, entry = candidate_key, candidate
+                        break
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, capture, text, namespace=''):
+        """Remember the text recognized for a fingerprint"""
+        with self._lock:
+            entry_key = (namespace, capture.key)
+            self._entries[entry_key] = (capture, text)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """The OCR cache shared by the windows of this process"""
+    global _ocr_cache
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = OCRCache()
+        return _ocr_cache
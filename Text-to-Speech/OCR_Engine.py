@@ -0,0 +1,375 @@
+import ctypes
+import ctypes.util
+import glob
+import io
+import os
+import shlex
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+DEFAULT_CONFIG = '--oem 3 --psm 6'
+DEFAULT_LANGUAGE = 'eng'
+# Warm API handles kept per engine; created on demand, each holds its own copy of the model
+MAX_INSTANCES = 4
+# The resolution tesseract.exe assumes for images without DPI information
+DEFAULT_DPI = 70
+
+# The Windows builds ship the C API next to tesseract.exe (libtesseract-5.dll and friends)
+_LIBRARY_PATTERNS = ['libtesseract*.dll', 'tesseract*.dll', 'libtesseract*.so*', 'libtesseract*.dylib']
+
+def split_config(config):
+    """Split a config string into arguments exactly as pytesseract does for tesseract.exe
+
+    Shell rules on POSIX; on Windows quotes and backslashes are kept, as the
+    command-line tool receives them there.
+    """
+    return shlex.split(config or '', posix=os.name != 'nt')
+
+
+@lru_cache(maxsize=32)
+def parse_config(config):
+    """(oem, psm, language, variables) from a tesseract command-line config string
+
+    "--oem N", "--psm N", "-l lang" and "-c name=value" arguments are read from
+    split_config(config), so the C API gets the same variables as the subprocess
+    fallback would; other arguments are ignored. variables is a sorted tuple of
+    (name, value) pairs, so it can key the handle pool.
+    """
+    oem, psm, language, variables = 3, 3, DEFAULT_LANGUAGE, {}
+    arguments = split_config(config)
+    i = 0
+    while i < len(arguments) - 1:
+        flag, value = arguments[i], arguments[i + 1]
+        if flag == '--oem':
+            oem = int(value)
+        elif flag == '--psm':
+            psm = int(value)
+        elif flag == '-l':
+            language = value
+        elif flag == '-c' and '=' in value:
+            name, _, setting = value.partition('=')
+            variables[name] = setting
+        else:
+            i += 1
+            continue
+        i += 2
+    return oem, psm, language, tuple(sorted(variables.items()))
+
+
+def find_library(tesseract_cmd=None):
+    """Path of the Tesseract C API library for tesseract_cmd, or None"""
+    if tesseract_cmd and os.path.isfile(tesseract_cmd):
+        folder = os.path.dirname(os.path.abspath(tesseract_cmd))
+        for pattern in _LIBRARY_PATTERNS:
+            matches = sorted(glob.glob(os.path.join(folder, pattern)))
+            if matches:
+                return matches[-1]  # Highest version when several are present
+    return ctypes.util.find_library('tesseract')
+
+
+def find_tessdata(tesseract_cmd=None):
+    """The tessdata folder next to tesseract_cmd, else TESSDATA_PREFIX, else None (library default)"""
+    if tesseract_cmd and os.path.isfile(tesseract_cmd):
+        tessdata = os.path.join(os.path.dirname(os.path.abspath(tesseract_cmd)), 'tessdata')
+        if os.path.isdir(tessdata):
+            return tessdata
+    return os.environ.get('TESSDATA_PREFIX')
+
+
+def _pixel_buffer(image):
+    """(pixels, width, height, channels, dpi) in a layout the C API accepts (8-bit gray, RGB or RGBA)
+
+    Contiguous uint8 arrays, as the preprocessing pipelines produce, are passed
+    without a copy.
+    """
+    if isinstance(image, np.ndarray):
+        if image.dtype == np.uint8 and (image.ndim == 2 or (image.ndim == 3 and image.shape[2] in (3, 4))):
+            pixels = np.ascontiguousarray(image)
+            height, width = pixels.shape[:2]
+            return pixels, width, height, 1 if pixels.ndim == 2 else pixels.shape[2], DEFAULT_DPI
+        image = Image.fromarray(image)
+    if image.mode == '1':
+        image = image.convert('L')
+    elif image.mode not in ('L', 'RGB', 'RGBA'):
+        image = image.convert('RGB')
+    width, height = image.size
+    dpi = int(image.info.get('dpi', (0, 0))[0]) or DEFAULT_DPI
+    return image.tobytes(), width, height, len(image.getbands()), dpi
+
+
+class OCREngine(ABC):
+    """Turns an image into text, with tesseract command-line style configs"""
+
+    name = None
+
+    def __init__(self, tesseract_cmd=None):
+        self.tesseract_cmd = tesseract_cmd
+
+    @abstractmethod
+    def image_to_string(self, image, config=DEFAULT_CONFIG):
+        """Return the text in a PIL image or NumPy array"""
+
+    @abstractmethod
+    def version(self):
+        """Tesseract version string"""
+
+    def warm_up(self, config=DEFAULT_CONFIG):
+        """Load the model for config ahead of the first image"""
+
+    def close(self):
+        """Release the engine's resources"""
+
+
+class SubprocessTesseract(OCREngine):
+    """One tesseract process per image, reloading the model every time
+
+    Only used when the C API library cannot be found or loaded. The engine runs
+    its own command (default: pytesseract's configured one) rather than setting
+    pytesseract's module-wide tesseract_cmd, so engines for different installs
+    never swap each other's executable.
+    """
+
+    name = 'subprocess'
+
+    @property
+    def command(self):
+        return self.tesseract_cmd or pytesseract.pytesseract.tesseract_cmd
+
+    def _run(self, arguments, data=None):
+        """Run tesseract with arguments, data on stdin, and return the completed process"""
+        kwargs = pytesseract.pytesseract.subprocess_args()  # No console window on Windows
+        if data is None:
+            kwargs['stdin'] = subprocess.DEVNULL
+        else:
+            del kwargs['stdin']
+        try:
+            result = subprocess.run([self.command, *arguments], input=data, **kwargs)
+        except FileNotFoundError:
+            raise pytesseract.TesseractNotFoundError()
+        if result.returncode:
+            raise pytesseract.TesseractError(result.returncode, pytesseract.pytesseract.get_errors(result.stderr))
+        return result
+
+    def image_to_string(self, image, config=DEFAULT_CONFIG):
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        # The image goes in on stdin and the text comes back on stdout, so no temp files;
+        # the arguments are the ones pytesseract would pass
+        result = self._run(['stdin', 'stdout', *split_config(config), 'txt'], buffer.getvalue())
+        return result.stdout.decode('utf-8', errors='replace')
+
+    def version(self):
+        result = self._run(['--version'])
+        # "tesseract 5.3.0" on stdout, or on stderr from older builds
+        first_line = (result.stdout or result.stderr).decode('utf-8', errors='replace').strip().splitlines()
+        return first_line[0].partition(' ')[2] if first_line else ''
+
+
+class PersistentTesseract(OCREngine):
+    """Tesseract's C API loaded into this process with ctypes
+
+    Each handle loads the language model once and is reused for every image, so
+    a call costs recognition only: no temp file, process spawn or model load. A
+    handle is not thread-safe, so callers borrow one from a small pool; handles
+    are keyed by their init settings (engine mode, language, variables such as
+    a character whitelist), which only take effect when they are created.
+    """
+
+    name = 'api'
+
+    def __init__(self, library_path, tesseract_cmd=None, datapath=None, max_instances=MAX_INSTANCES):
+        super().__init__(tesseract_cmd)
+        self.library_path = library_path
+        self.datapath = datapath
+        self.max_instances = max(1, max_instances)
+        self._api = self._load(library_path)
+        self._idle = []  # (key, handle), least recently used first
+        self._count = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _load(library_path):
+        if os.name == 'nt' and os.path.dirname(library_path):
+            # Leptonica and the other DLLs it needs sit in the same folder
+            os.add_dll_directory(os.path.dirname(os.path.abspath(library_path)))
+        api = ctypes.CDLL(library_path)
+        handle = ctypes.c_void_p
+        api.TessVersion.restype = ctypes.c_char_p
+        api.TessVersion.argtypes = []
+        api.TessBaseAPICreate.restype = handle
+        api.TessBaseAPICreate.argtypes = []
+        api.TessBaseAPIInit2.restype = ctypes.c_int
+        api.TessBaseAPIInit2.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        api.TessBaseAPISetVariable.restype = ctypes.c_int
+        api.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+        api.TessBaseAPISetPageSegMode.restype = None
+        api.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+        api.TessBaseAPISetImage.restype = None
+        api.TessBaseAPISetImage.argtypes = [handle, ctypes.c_char_p, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int]
+        api.TessBaseAPISetSourceResolution.restype = None
+        api.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+        # A char* the caller must free with TessDeleteText, so not c_char_p
+        api.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        api.TessBaseAPIGetUTF8Text.argtypes = [handle]
+        api.TessDeleteText.restype = None
+        api.TessDeleteText.argtypes = [ctypes.c_void_p]
+        for name in ('TessBaseAPIClear', 'TessBaseAPIEnd', 'TessBaseAPIDelete'):
+            getattr(api, name).restype = None
+            getattr(api, name).argtypes = [handle]
+        return api
+
+    def _create(self, key):
+        oem, language, variables = key
+        api = self._api
+        handle = api.TessBaseAPICreate()
+        datapath = self.datapath.encode('utf-8') if self.datapath else None
+        if api.TessBaseAPIInit2(handle, datapath, language.encode('utf-8'), oem) != 0:
+            api.TessBaseAPIDelete(handle)
+            raise RuntimeError(f"Tesseract could not load language '{language}' "
+                               f"from {self.datapath or 'its default tessdata'}")
+        for name, value in variables:
+            api.TessBaseAPISetVariable(handle, name.encode('utf-8'), value.encode('utf-8'))
+        return handle
+
+    def _destroy(self, handle):
+        self._api.TessBaseAPIEnd(handle)
+        self._api.TessBaseAPIDelete(handle)
+
+    def _acquire(self, key):
+        with self._condition:
+            while True:
+                for i, (idle_key, handle) in enumerate(self._idle):
+                    if idle_key == key:
+                        del self._idle[i]
+                        return handle
+                if self._count < self.max_instances:
+                    self._count += 1
+                    stale = None
+                    break
+                if self._idle:
+                    # Every handle exists already; retire the least recently used one
+                    stale = self._idle.pop(0)[1]
+                    break
+                self._condition.wait()
+        # Model loading takes a while, so other callers are not held up meanwhile
+        try:
+            if stale is not None:
+                self._destroy(stale)
+            return self._create(key)
+        except Exception:
+            with self._condition:
+                self._count -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, key, handle):
+        with self._condition:
+            self._condition.notify()
+            if not self._closed:
+                self._idle.append((key, handle))
+                return
+            self._count -= 1
+        # Checked out while the engine was closed
+        self._destroy(handle)
+
+    def image_to_string(self, image, config=DEFAULT_CONFIG):
+        oem, psm, language, variables = parse_config(config)
+        key = (oem, language, variables)
+        pixels, width, height, channels, dpi = _pixel_buffer(image)
+        data = pixels.ctypes.data_as(ctypes.c_char_p) if isinstance(pixels, np.ndarray) else pixels
+
+        api = self._api
+        handle = self._acquire(key)
+        try:
+            api.TessBaseAPISetPageSegMode(handle, psm)
+            api.TessBaseAPISetImage(handle, data, width, height, channels, width * channels)
+            api.TessBaseAPISetSourceResolution(handle, dpi)
+            text = api.TessBaseAPIGetUTF8Text(handle)
+            if not text:
+                raise RuntimeError("Tesseract failed to recognize the image")
+            try:
+                return ctypes.string_at(text).decode('utf-8', errors='replace')
+            finally:
+                api.TessDeleteText(text)
+        finally:
+            api.TessBaseAPIClear(handle)
+            self._release(key, handle)
+
+    def version(self):
+        return self._api.TessVersion().decode('utf-8')
+
+    def warm_up(self, config=DEFAULT_CONFIG):
+        oem, psm, language, variables = parse_config(config)
+        key = (oem, language, variables)
+        self._release(key, self._acquire(key))
+
+    def close(self):
+        """Destroy the idle handles now, and handles still checked out as they come back"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._condition.notify_all()
+        for key, handle in idle:
+            self._destroy(handle)
+
+
+_easyocr_reader = None
+_easyocr_lock = threading.Lock()
+
+
+def get_easyocr_reader():
+    """The shared English EasyOCR reader, loaded on first use
+
+    Importing easyocr and loading its model takes seconds and hundreds of MB, so
+    processes that never fall back to EasyOCR (batch workers, the service without
+    easyocr requests) never pay for it.
+    """
+    global _easyocr_reader
+    with _easyocr_lock:
+        if _easyocr_reader is None:
+            import easyocr
+            _easyocr_reader = easyocr.Reader(['en'])
+        return _easyocr_reader
+
+
+def create_engine(tesseract_cmd=None):
+    """The in-process engine when Tesseract's C API library is available, else the subprocess one"""
+    library_path = find_library(tesseract_cmd)
+    if library_path:
+        try:
+            return PersistentTesseract(library_path, tesseract_cmd, find_tessdata(tesseract_cmd))
+        except (OSError, AttributeError) as e:
+            print(f"Error loading Tesseract library {library_path}: {e}")
+    return SubprocessTesseract(tesseract_cmd)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine(tesseract_cmd=None):
+    """The shared OCR engine for tesseract_cmd (default: pytesseract's configured command)
+
+    The engine is built on first use and kept, so its loaded models are reused
+    by every caller; asking for a different command replaces it.
+    """
+    global _engine
+    tesseract_cmd = tesseract_cmd or pytesseract.pytesseract.tesseract_cmd
+    with _engine_lock:
+        if _engine is None or _engine.tesseract_cmd != tesseract_cmd:
+            if _engine is not None:
+                _engine.close()
+            _engine = create_engine(tesseract_cmd)
+            print(f"OCR engine: {_engine.name} ({tesseract_cmd})")
+        return _engine
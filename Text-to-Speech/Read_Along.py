@@ -0,0 +1,95 @@
+import threading
+
+# One tag update per display frame at most
+FRAME_MS = 16
+
+# How far ahead of the last highlighted word a boundary's text is searched for
+SEARCH_WINDOW = 200
+
+
+class WordHighlighter:
+    """Highlights the word being spoken in a Tk Text widget, driven by WordBoundary events
+
+    Boundaries arrive on the TTS loop thread and are only recorded there. A single
+    Tk after() callback per frame compares them with the playback position and
+    moves the tag, so however fast the events come in, the Tk event loop sees at
+    most one update per frame.
+    """
+
+    def __init__(self, widget, text, start_index='1.0', tag='read_along'):
+        self.widget = widget
+        self.text = text  # The text being read, as it appears from start_index on
+        self.start_index = start_index
+        self.tag = tag
+        self._words = []  # (sample offset, char start, char end) in speaking order
+        self._lock = threading.Lock()
+        self._search_from = 0
+        self._origin = None  # Absolute queue position of the utterance's first sample
+        self._next = 0
+        self._current = None
+        self._player = None
+        self._running = False
+
+    def set_origin(self, position):
+        """Record where the utterance starts in the playback queue (first write only)"""
+        if self._origin is None:
+            self._origin = position
+
+    def add_boundary(self, event, sample_rate):
+        """Record an Edge-style WordBoundary event (offset in 100 ns units); any thread"""
+        word = event.get("text", "")
+        if not word:
+            return
+        start = self.text.find(word, self._search_from, self._search_from + len(word) + SEARCH_WINDOW)
+        if start < 0:
+            return  # Normalized by the service (numbers, symbols); nothing to highlight
+        end = start + len(word)
+        self._search_from = end
+        with self._lock:
+            self._words.append((event["offset"] * sample_rate // 10_000_000, start, end))
+
+    def load_boundaries(self, events, sample_rate):
+        """Record a saved list of boundary events, e.g. for audio served from the cache"""
+        for event in events:
+            self.add_boundary(event, sample_rate)
+
+    def start(self, player):
+        """Follow player's playback position; call on the Tk thread"""
+        self._player = player
+        self._running = True
+        self.widget.tag_configure(self.tag, background='#ffe680', foreground='black')
+        self.widget.after(FRAME_MS, self._tick)
+
+    def stop(self):
+        """Stop highlighting; safe from any thread, the tag is cleared on the next frame"""
+        self._running = False
+
+    def _index(self, offset):
+        return f"{self.start_index} + {offset} chars"
+
+    def _tick(self):
+        try:
+            if not self._running or self._player.is_done():
+                if self._current is not None:
+                    self.widget.tag_remove(self.tag, self._index(self._current[1]), self._index(self._current[2]))
+                self._running = False
+                return
+
+            if self._origin is not None:
+                played = self._player.queue.played_position - self._origin
+                word = None
+                with self._lock:
+                    # Words arrive in order, so a cursor replaces any search
+                    while self._next < len(self._words) and self._words[self._next][0] <= played:
+                        word = self._words[self._next]
+                        self._next += 1
+                if word is not None and word != self._current:
+                    self.widget.tag_remove(self.tag, '1.0', 'end')
+                    self.widget.tag_add(self.tag, self._index(word[1]), self._index(word[2]))
+                    self.widget.see(self._index(word[1]))
+                    self._current = word
+        except Exception as e:
+            print(f"Error updating word highlight: {e}")
+            self._running = False
+            return
+        self.widget.after(FRAME_MS, self._tick)
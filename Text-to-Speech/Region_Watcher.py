@@ -0,0 +1,121 @@
+import threading
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from OCR_Cache import DEFAULT_TOLERANCE, fingerprint
+from Screen_Capture import grab_region
+
+# Seconds between captures while the region is changing, and the most it backs off to when static
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 1.0
+# Each static capture stretches the interval by this factor
+BACKOFF = 1.5
+# Thumbnail gray-level difference up to which a pixel counts as capture noise; the OCR
+# cache's, so a region that counts as unchanged is also one whose text it would reuse
+PIXEL_NOISE = DEFAULT_TOLERANCE
+# A frame has changed when this many thumbnail pixels moved beyond the noise (one
+# changed punctuation mark moves about one)...
+CHANGED_PIXELS = 1
+# ...or the whole region got this much brighter or darker on average (fades)
+MEAN_CHANGE = 4.0
+# Unchanged captures in a row before a changed region counts as settled
+STABLE_FRAMES = 2
+
+FrameDifference = namedtuple('FrameDifference', ['mean', 'changed_pixels'])
+
+
+def frame_difference(previous, current):
+    """Mean absolute difference of two gray thumbnails and how many pixels differ beyond noise"""
+    difference = cv2.absdiff(previous, current)
+    return FrameDifference(cv2.mean(difference)[0], int(np.count_nonzero(difference > PIXEL_NOISE)))
+
+
+def has_changed(previous, current):
+    """Whether two fingerprints show a different picture, rather than the same one with noise"""
+    if previous is None or previous.thumbnail.shape != current.thumbnail.shape:
+        return True
+    difference = frame_difference(previous.thumbnail, current.thumbnail)
+    return difference.changed_pixels >= CHANGED_PIXELS or difference.mean >= MEAN_CHANGE
+
+
+class RegionWatcher:
+    """Polls a screen region and reports it once it has changed and then held still
+
+    get_region returns the (left, top, width, height) to watch, or None for
+    nothing. on_settled(image, capture) is called on the watcher's thread with
+    the captured PIL image and its fingerprint each time the region settles on
+    a picture other than the one last reported, so a dialogue line that is
+    still typing out, or a flicker that returns to the same frame, is not
+    reported. Each poll costs a capture of the region and a thumbnail compare;
+    while nothing moves the polls back off to max_interval.
+    """
+
+    def __init__(self, get_region, on_settled, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 stable_frames=STABLE_FRAMES):
+        self.get_region = get_region
+        self.on_settled = on_settled
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.stable_frames = max(1, stable_frames)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start polling on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop polling; a report already in progress still completes"""
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        region = None
+        previous = None   # Fingerprint of the last capture
+        reported = None   # Fingerprint of the last capture handed to on_settled
+        pending = False   # Changed since the last report and not yet settled
+        stable = 0
+        interval = self.min_interval
+        while not self._stop.wait(interval):
+            current_region = self.get_region()
+            if not current_region or current_region[2] <= 0 or current_region[3] <= 0:
+                region = previous = reported = None
+                interval = self.max_interval
+                continue
+            if current_region != region:
+                # Moved or resized: whatever it shows now is new
+                region = current_region
+                previous = reported = None
+
+            try:
+                image = grab_region(*region)
+            except Exception as e:
+                print(f"Error capturing watched region: {e}")
+                interval = self.max_interval
+                continue
+            capture = fingerprint(image)
+            changed = has_changed(previous, capture)
+            previous = capture
+
+            if changed:
+                pending, stable = True, 0
+                interval = self.min_interval
+            elif pending:
+                stable += 1
+                if stable >= self.stable_frames:
+                    pending = False
+                    if has_changed(reported, capture):
+                        reported = capture
+                        try:
+                            self.on_settled(image, capture)
+                        except Exception as e:
+                            print(f"Error handling watched region: {e}")
+            else:
+                interval = min(interval * BACKOFF, self.max_interval)
@@ -0,0 +1,49 @@
+import mss
+import numpy as np
+from PIL import Image
+
+
+def virtual_screen():
+    """Bounding box of all monitors together: {'left', 'top', 'width', 'height'}"""
+    with mss.mss() as sct:
+        return dict(sct.monitors[0])
+
+
+def grab_region(left, top, width, height):
+    """RGB image of one rectangle of the screen, in absolute virtual-screen coordinates
+
+    Only the rectangle is captured and converted, however large the desktop is.
+    """
+    with mss.mss() as sct:
+        shot = sct.grab({'left': int(left), 'top': int(top), 'width': int(width), 'height': int(height)})
+    return Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
+
+
+class FrozenFrame:
+    """The whole virtual screen at one moment, kept as mss's BGRA buffer
+
+    For text that may vanish while the selection is drawn. Nothing is converted
+    up front; crop() converts just the selected rectangle to RGB.
+    """
+
+    def __init__(self):
+        with mss.mss() as sct:
+            self.geometry = dict(sct.monitors[0])
+            shot = sct.grab(self.geometry)
+        self.size = shot.size
+        # A view onto mss's buffer, not a copy
+        self._pixels = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def crop(self, left, top, right, bottom):
+        """RGB image of a rectangle given relative to the frame's top-left corner, clamped to the frame"""
+        width, height = self.size
+        left, top = max(0, int(left)), max(0, int(top))
+        right, bottom = min(width, int(right)), min(height, int(bottom))
+        if right <= left or bottom <= top:
+            raise ValueError("Calculated crop box has zero or negative size.")
+        region = self._pixels[top:bottom, left:right]
+        return Image.frombytes('RGB', (right - left, bottom - top), region.tobytes(), 'raw', 'BGRX')
+
+    def image(self):
+        """The whole frame as an RGB image (converts every pixel)"""
+        return self.crop(0, 0, *self.size)
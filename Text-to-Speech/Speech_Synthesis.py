@@ -0,0 +1,634 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import (FIRST_COMPLETED, CancelledError, Future, InvalidStateError, ThreadPoolExecutor,
+                                TimeoutError as FutureTimeoutError, wait)
+
+from Audio_Cache import AudioCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, normalize_text
+from Audio_Engine import decode_audio, time_stretch
+from Synthesis_Backends import LocalSynthesizer, create_backend
+
+# Default Edge TTS voice used by the main window
+DEFAULT_VOICE = "en-US-AriaNeural"
+
+# A sentence ends at . ! ? or an ellipsis (plus any closing quotes/brackets) followed by
+# whitespace and a capital letter or digit, or at a blank line between paragraphs.
+_SENTENCE_BREAK = re.compile(
+    r'(?<=[.!?…])(["\'”’)\]]*)\s+(?=["\'“‘(\[]?[A-Z0-9])|\n[ \t]*\n\s*'
+)
+_SOFT_BREAK = re.compile(r'[,;:]\s+|\s+')
+_ABBREVIATION = re.compile(r'\b(?:Mr|Mrs|Ms|Dr|Prof|St|Jr|Sr|vs|Fig|No)\.$')
+
+
+def iter_sentence_spans(text, max_chars=400):
+    """Yield (start, end) character offsets of the sentences in text"""
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        end = match.start() + len(match.group(1) or '')
+        if _ABBREVIATION.search(text, max(start, end - 6), end):
+            continue  # "Mr. Smith" is not a sentence break
+        yield from _split_long_span(text, start, end, max_chars)
+        start = match.end()
+    yield from _split_long_span(text, start, len(text), max_chars)
+
+
+def _split_long_span(text, start, end, max_chars):
+    """Break a run-on sentence at the last comma or space that fits in max_chars"""
+    # Trim surrounding whitespace so spans map exactly onto readable text
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+
+    while end - start > max_chars:
+        cut = None
+        for match in _SOFT_BREAK.finditer(text, start, start + max_chars):
+            cut = match
+        if cut is None or cut.start() <= start:
+            split_at, resume_at = start + max_chars, start + max_chars
+        else:
+            split_at, resume_at = cut.start() + (1 if text[cut.start()] in ',;:' else 0), cut.end()
+        yield start, split_at
+        start = resume_at
+
+    if end > start:
+        yield start, end
+
+
+def split_sentences(text, max_chars=400):
+    """Split text into sentences that are short enough to synthesize quickly"""
+    return [text[start:end] for start, end in iter_sentence_spans(text, max_chars)]
+
+
+# Shared audio cache, created on first use
+_audio_cache = None
+
+
+def configure_audio_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Create (or resize) the shared audio cache"""
+    global _audio_cache
+    if _audio_cache is None or _audio_cache.cache_dir != cache_dir:
+        _audio_cache = AudioCache(cache_dir, max_bytes)
+    else:
+        _audio_cache.max_bytes = max_bytes
+    return _audio_cache
+
+
+def get_audio_cache():
+    """Return the shared audio cache"""
+    return _audio_cache or configure_audio_cache()
+
+
+# Active synthesis backend ('edge', 'pyttsx3' or 'stub'), created on first use
+_backend = None
+
+
+def configure_backend(name='edge', **options):
+    """Select the synthesis backend used by every reader, export and cache lookup"""
+    global _backend
+    _backend = create_backend(name, **options)
+    print(f"Synthesis backend: {name}")
+    return _backend
+
+
+def get_backend():
+    """Return the active synthesis backend"""
+    return _backend or configure_backend()
+
+
+def make_cache_key(text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%", backend=None):
+    """Audio cache key for text as rendered by backend (default: the active one)"""
+    backend = backend or get_backend()
+    return get_audio_cache().make_key(text, backend.cache_voice(voice), rate, pitch, volume)
+
+
+class TTSService:
+    """One background thread owning the event loop used for every Edge TTS call"""
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        # cache key -> [shared Future, callers waiting on it], so duplicate requests share one synthesis
+        self._in_flight = {}
+
+    def start(self):
+        """Start the loop thread if it is not already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, name="tts-service", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        # Caps simultaneous websocket sessions so bursts of requests queue politely
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the service loop from any thread; returns a Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the service loop and block for its result"""
+        return self.submit(coro).result(timeout)
+
+    async def _synthesize_limited(self, backend, text, voice, rate, pitch, volume):
+        async with self._semaphore:
+            return await backend.synthesize(text, voice, rate, pitch, volume)
+
+    async def synthesize_async(self, text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+        """Coroutine form of synthesize() for code already running on the service loop"""
+        backend = get_backend()
+        cache = get_audio_cache()
+        key = make_cache_key(text, voice, rate, pitch, volume, backend)
+        # Cache files are read and written off the loop, which every reader shares
+        data = await asyncio.to_thread(cache.get, key)
+        if data is None:
+            data = await self._synthesize_limited(backend, text, voice, rate, pitch, volume)
+            await asyncio.to_thread(cache.put, key, data)
+        return data
+
+    def synthesize(self, text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+        """Return a Future of the encoded audio for text; cache hits complete immediately
+
+        Every caller gets its own Future. Cancelling it detaches only that caller;
+        the synthesis itself is cancelled once no caller is waiting for it.
+        """
+        backend = get_backend()
+        cache = get_audio_cache()
+        key = make_cache_key(text, voice, rate, pitch, volume, backend)
+        data = cache.get(key)
+        if data is not None:
+            future = Future()
+            future.set_result(data)
+            return future
+
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None and not entry[0].cancelled():
+                entry[1] += 1
+                return self._waiter(key, entry[0])
+
+        async def synthesize_and_store():
+            result = await self._synthesize_limited(backend, text, voice, rate, pitch, volume)
+            await asyncio.to_thread(cache.put, key, result)
+            return result
+
+        shared = self.submit(synthesize_and_store())
+        with self._lock:
+            self._in_flight[key] = [shared, 1]
+        shared.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        return self._waiter(key, shared)
+
+    def _waiter(self, key, shared):
+        """One caller's Future of the shared synthesis"""
+        waiter = Future()
+
+        def copy_result(done):
+            try:
+                if done.cancelled():
+                    waiter.cancel()
+                elif done.exception() is not None:
+                    waiter.set_exception(done.exception())
+                else:
+                    waiter.set_result(done.result())
+            except InvalidStateError:
+                pass  # This caller detached first
+
+        def detach(done):
+            if done.cancelled():
+                self._detach(key, shared)
+
+        waiter.add_done_callback(detach)
+        shared.add_done_callback(copy_result)
+        return waiter
+
+    def _detach(self, key, shared):
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is None or entry[0] is not shared:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._in_flight[key]
+        # Nobody wants the audio any more
+        shared.cancel()
+
+    def _forget_in_flight(self, key, future):
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._in_flight[key]
+
+    def stop(self):
+        """Stop the loop thread"""
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+# Shared service, started on first use
+_tts_service = TTSService()
+
+
+def get_tts_service():
+    """Return the shared TTS service"""
+    return _tts_service
+
+
+async def synthesize_mp3_async(text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """Return encoded audio for text, from the audio cache when possible (awaited on the service loop)"""
+    return await get_tts_service().synthesize_async(text, voice, rate, pitch, volume)
+
+
+def synthesize_mp3(text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """Blocking version of synthesize_mp3_async that can be called from any thread"""
+    return get_tts_service().synthesize(text, voice, rate, pitch, volume).result()
+
+
+# Speculative pre-synthesis of the opening sentences of newly loaded text (opt-in)
+_speculative_prefetch = False
+
+
+def set_speculative_prefetch(enabled):
+    """Turn speculative pre-synthesis on or off"""
+    global _speculative_prefetch
+    _speculative_prefetch = bool(enabled)
+
+
+def prefetch_sentences(text, voice=DEFAULT_VOICE, count=2, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """Synthesize the first sentences of text in the background so reading starts instantly
+
+    The audio lands in the cache, and a read that starts while synthesis is still
+    running joins the same request; rate, pitch and volume must match the reader's
+    for either to happen. Returns the futures (empty when disabled).
+    """
+    if not _speculative_prefetch or not text:
+        return []
+
+    def report_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Speculative pre-synthesis failed: {future.exception()}")
+
+    futures = []
+    # Only the head of the text matters; don't split a whole book for two sentences
+    for sentence in split_sentences(text[:4000])[:count]:
+        future = get_tts_service().synthesize(sentence, voice, rate, pitch, volume)
+        future.add_done_callback(report_error)
+        futures.append(future)
+    return futures
+
+
+class CancelToken:
+    """Cancels one read: silences its player and aborts its synthesis requests
+
+    cancel() only signals and never waits, so it is safe to call from the Tk thread.
+    Audio stops within one output block and tracked requests are cancelled at once.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._futures = set()
+        self._player = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def active(self):
+        """should_continue-style callback for readers and players"""
+        return not self._event.is_set()
+
+    def bind_player(self, player):
+        """Stop player when this token is cancelled"""
+        with self._lock:
+            self._player = player
+        if self.cancelled:
+            player.stop()
+        return player
+
+    def track(self, future):
+        """Cancel future along with the token; returns the future"""
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._untrack)
+        if self.cancelled:
+            future.cancel()
+        return future
+
+    def _untrack(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            player = self._player
+            futures = list(self._futures)
+        if player is not None:
+            player.stop()
+        for future in futures:
+            future.cancel()
+
+
+def wpm_to_edge_rate(words_per_minute, base_wpm=150):
+    """Map the pyttsx3-style words-per-minute speed onto an Edge prosody rate such as +20%"""
+    percent = int(round((words_per_minute / base_wpm - 1) * 100))
+    return f"{percent:+d}%"
+
+
+def _rate_factor(rate):
+    """Edge rate string -> tempo multiplier ("+50%" -> 1.5)"""
+    return 1 + int(rate.rstrip('%')) / 100
+
+
+# Rates each text has been synthesized at this session, so a speed change can be
+# served by stretching whichever version is already cached
+_rate_variants = {}
+_stretched = OrderedDict()  # exact cache key -> (stretched PCM, source rate), least recently used first
+_STRETCHED_ENTRIES = 64
+_stretch_lock = threading.Lock()
+
+
+def note_rate_variant(text, voice, rate, pitch, volume):
+    """Record that text is cached at rate, as a source for later time-stretching"""
+    group = make_cache_key(text, voice, '*', pitch, volume)
+    with _stretch_lock:
+        _rate_variants.setdefault(group, set()).add(rate)
+
+
+def stretch_cached(text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """(PCM, source rate) for text at rate, time-stretched from a recording cached at source rate
+
+    Returns None when the exact rate is cached (no stretching needed) or when no other
+    rate of the same text, voice, pitch and volume is cached either.
+    """
+    cache = get_audio_cache()
+    key = make_cache_key(text, voice, rate, pitch, volume)
+    if key in cache:
+        return None
+    with _stretch_lock:
+        if key in _stretched:
+            _stretched.move_to_end(key)
+            return _stretched[key]
+        candidates = set(_rate_variants.get(make_cache_key(text, voice, '*', pitch, volume), ()))
+    candidates.add("+0%")  # The default rate is the one most likely cached from earlier sessions
+    candidates.discard(rate)
+
+    for source_rate in sorted(candidates):
+        data = cache.get(make_cache_key(text, voice, source_rate, pitch, volume))
+        if data is None:
+            continue
+        pcm = time_stretch(decode_audio(data), _rate_factor(rate) / _rate_factor(source_rate))
+        with _stretch_lock:
+            _stretched[key] = (pcm, source_rate)
+            while len(_stretched) > _STRETCHED_ENTRIES:
+                _stretched.popitem(last=False)
+        return pcm, source_rate
+    return None
+
+
+def stretched_from_cache(text, voice=DEFAULT_VOICE, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """PCM for text at rate made by time-stretching a cached recording at another rate, or None"""
+    stretched = stretch_cached(text, voice, rate, pitch, volume)
+    return stretched[0] if stretched is not None else None
+
+
+def stretch_boundaries(events, source_rate, rate):
+    """WordBoundary events of a recording at source_rate, retimed for it stretched to rate"""
+    scale = _rate_factor(source_rate) / _rate_factor(rate)
+    return [dict(event, offset=int(event["offset"] * scale)) for event in events]
+
+
+def synthesize_pcm(text, voice=DEFAULT_VOICE, token=None, rate="+0%", pitch="+0Hz", volume="+0%"):
+    """Synthesize text (or fetch it from the cache) and return decoded mono float32 PCM
+
+    A speed change for text that is already cached at another rate is served by
+    stretching the cached audio locally instead of synthesizing it again.
+    """
+    pcm = stretched_from_cache(text, voice, rate, pitch, volume)
+    if pcm is not None:
+        return pcm
+    future = get_tts_service().synthesize(text, voice, rate, pitch, volume)
+    if token is not None:
+        token.track(future)
+    pcm = decode_audio(future.result())
+    note_rate_variant(text, voice, rate, pitch, volume)
+    return pcm
+
+
+class HedgedSynthesizer:
+    """text -> PCM through Edge TTS, racing the local voice once a deadline passes"""
+
+    def __init__(self, local, voice=DEFAULT_VOICE, deadline=1.5, token=None,
+                 rate="+0%", pitch="+0Hz", volume="+0%"):
+        self.local = local
+        self.voice = voice
+        self.deadline = deadline
+        self.token = token
+        self.rate = rate
+        self.pitch = pitch
+        self.volume = volume
+
+    def _track(self, future):
+        return self.token.track(future) if self.token is not None else future
+
+    def __call__(self, text):
+        started = time.perf_counter()
+        pcm = stretched_from_cache(text, self.voice, self.rate, self.pitch, self.volume)
+        if pcm is not None:
+            return pcm
+        primary = self._track(get_tts_service().synthesize(text, self.voice, self.rate, self.pitch, self.volume))
+        try:
+            pcm = decode_audio(primary.result(timeout=self.deadline))
+            note_rate_variant(text, self.voice, self.rate, self.pitch, self.volume)
+            return pcm
+        except FutureTimeoutError:
+            print(f"Edge TTS missed the {self.deadline:.1f}s deadline, racing the local voice")
+        except CancelledError:
+            raise
+        except Exception as e:
+            print(f"Edge TTS failed, using the local voice: {e}")
+            return self._track(self.local.synthesize(text)).result()
+
+        fallback = self._track(self.local.synthesize(text))
+        pending = {primary, fallback}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if self.token is not None and self.token.cancelled:
+                raise CancelledError()
+            for future in done:
+                if future.cancelled() or future.exception() is not None:
+                    error = 'cancelled' if future.cancelled() else future.exception()
+                    print(f"{'Edge TTS' if future is primary else 'Local voice'} failed: {error}")
+                    continue
+                # First good result wins; the slower path is cancelled
+                for loser in pending:
+                    loser.cancel()
+                winner = 'Edge TTS' if future is primary else 'local voice'
+                print(f"Hedged synthesis: {winner} answered after {time.perf_counter() - started:.2f}s")
+                return decode_audio(future.result()) if future is primary else future.result()
+        raise RuntimeError("Both Edge TTS and the local voice failed")
+
+
+class PipelinedReader:
+    """Synthesize upcoming sentences while the current one plays
+
+    Decoded sentences are kept (the most recent ones in memory, the rest in the audio
+    cache), so seek() can jump between sentences without new network requests.
+    Sentences are keyed by their normalized text, so a sentence that repeats in the
+    document (running headers, boilerplate) is synthesized and decoded once.
+    """
+
+    def __init__(self, synthesize, player, lookahead=2, keep_decoded=32):
+        self.synthesize = synthesize  # text -> PCM
+        self.player = player
+        self.lookahead = max(1, lookahead)
+        self.keep_decoded = keep_decoded
+        self._decoded = OrderedDict()  # sentence key -> PCM, least recently used first
+        self._written = deque()  # (index, end position) of sentences queued in the player
+        self._next_index = 0
+        self._seek_target = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self.reused = 0  # Sentences played from an earlier repeat instead of synthesized
+
+    def current_index(self):
+        """Index of the sentence being heard right now"""
+        with self._lock:
+            played = self.player.queue.played_position
+            for index, end in self._written:
+                if end > played:
+                    return index
+            return min(self._next_index, max(0, self._total - 1))
+
+    def seek(self, index):
+        """Continue reading from sentence index (clamped to the document)"""
+        with self._lock:
+            self._seek_target = max(0, min(index, self._total - 1))
+
+    def seek_relative(self, offset):
+        """Skip offset sentences forwards (positive) or backwards (negative)"""
+        self.seek(self.current_index() + offset)
+
+    def _take_seek(self):
+        with self._lock:
+            target, self._seek_target = self._seek_target, None
+            return target
+
+    def read(self, segments, should_continue=lambda: True, on_segment=None):
+        """Play every segment in order, honouring seeks, until the player drains
+
+        Returns False if should_continue() turned false.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.lookahead, thread_name_prefix="tts-lookahead")
+        futures = {}  # sentence key -> Future of PCM
+        keys = [normalize_text(segment) for segment in segments]
+        first_seen = {}
+        for index, key in enumerate(keys):
+            first_seen.setdefault(key, index)
+        self._total = len(segments)
+        interrupted = lambda: not should_continue() or self._seek_target is not None
+
+        try:
+            while True:
+                if not should_continue():
+                    return False
+
+                target = self._take_seek()
+                if target is not None:
+                    # Drop what is queued and restart from the target sentence
+                    with self._lock:
+                        self.player.clear()
+                        self._written.clear()
+                        self._next_index = target
+                    continue
+
+                index = self._next_index
+                # Don't run further ahead than the look-ahead allows; this also
+                # holds synthesis while playback is paused
+                if index >= len(segments) or self.player.pending_blocks() > self.lookahead:
+                    if index >= len(segments) and self.player.pending_blocks() == 0:
+                        return True
+                    time.sleep(0.02)
+                    continue
+
+                # Keep the window full: sentences being prepared plus audio queued in
+                # the player never exceed the look-ahead, so a stop wastes little work
+                ahead = index
+                while (ahead < len(segments) and
+                       ahead - index + self.player.pending_blocks() <= self.lookahead):
+                    if keys[ahead] not in self._decoded and keys[ahead] not in futures:
+                        futures[keys[ahead]] = executor.submit(self.synthesize, segments[ahead])
+                    ahead += 1
+
+                key = keys[index]
+                pcm = self._decoded.get(key)
+                if pcm is None:
+                    pcm = self._wait_for(futures[key], interrupted)
+                    if pcm is None:
+                        if self._was_cancelled(futures[key]):
+                            del futures[key]  # Retried unless we are stopping
+                        continue
+                    del futures[key]
+                    self._remember(key, pcm)
+                else:
+                    self._decoded.move_to_end(key)
+                    if first_seen[key] < index:
+                        self.reused += 1
+
+                # The player concatenates queued blocks, so the handoff is gapless
+                with self._lock:
+                    end = self.player.write(pcm)
+                    if end is not None:
+                        self._written.append((index, end))
+                    while self._written and self._written[0][1] <= self.player.queue.played_position:
+                        self._written.popleft()
+                    self._next_index = index + 1
+                if on_segment:
+                    on_segment(index, len(segments))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _remember(self, key, pcm):
+        self._decoded[key] = pcm
+        # Older sentences are dropped from memory; seeking back to them is a cache hit
+        while len(self._decoded) > self.keep_decoded:
+            self._decoded.popitem(last=False)
+
+    @staticmethod
+    def _was_cancelled(future):
+        if not future.done():
+            return False
+        return future.cancelled() or isinstance(future.exception(), CancelledError)
+
+    @staticmethod
+    def _wait_for(future, interrupted, poll_interval=0.02):
+        while True:
+            if interrupted():
+                return None
+            try:
+                return future.result(timeout=poll_interval)
+            except FutureTimeoutError:
+                continue
+            except CancelledError:
+                return None  # The synthesis request was cancelled by a stop
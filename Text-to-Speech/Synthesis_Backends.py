@@ -0,0 +1,216 @@
+import asyncio
+import os
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import edge_tts
+import numpy as np
+import pyttsx3
+
+from Audio_Engine import EDGE_SAMPLE_RATE, decode_wav, wav_header
+
+
+class SynthesisBackend:
+    """Turns text into encoded audio bytes; subclasses set name and audio_format"""
+
+    name = None
+    audio_format = 'mp3'  # 'mp3' or 'wav'
+
+    def cache_voice(self, voice):
+        """Voice component of the audio cache key; other backends must not share Edge entries"""
+        return f"{self.name}:{voice}"
+
+    async def stream(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        """Yield Edge-style chunks: {"type": "audio", "data": bytes} and WordBoundary events"""
+        yield {"type": "audio", "data": await self.synthesize(text, voice, rate, pitch, volume)}
+
+    async def synthesize(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        """Return the complete encoded audio for text"""
+        audio = bytearray()
+        async for chunk in self.stream(text, voice, rate, pitch, volume):
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+        return bytes(audio)
+
+
+class EdgeBackend(SynthesisBackend):
+    """Microsoft Edge online neural voices"""
+
+    name = 'edge'
+    audio_format = 'mp3'
+
+    def cache_voice(self, voice):
+        # Edge keys predate the other backends, so they stay unprefixed
+        return voice
+
+    async def stream(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, volume=volume)
+        async for chunk in communicate.stream():
+            yield chunk
+
+
+def _init_worker_thread():
+    # SAPI voices are COM objects, and a thread must enter a COM apartment before
+    # it creates one; elsewhere there is nothing to set up
+    try:
+        import comtypes
+    except ImportError:
+        return
+    comtypes.CoInitialize()
+
+
+class LocalSynthesizer:
+    """Offline pyttsx3 synthesis, rendered on its own worker thread
+
+    pyttsx3 engines are not thread-safe, so this one is created on and only ever
+    used from a single dedicated thread. pyttsx3.init() would hand back the
+    process-wide engine the window is driving, so a private Engine is built.
+    """
+
+    def __init__(self, voice_id=None, rate=None):
+        self.voice_id = voice_id
+        self.rate = rate
+        self._engine = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-local",
+                                            initializer=_init_worker_thread)
+
+    def configure(self, voice_id=None, rate=None):
+        """Use this SAPI voice id / words-per-minute rate for later requests"""
+        self.voice_id = voice_id
+        self.rate = rate
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = pyttsx3.Engine()
+        return self._engine
+
+    def _render(self, text):
+        engine = self._get_engine()
+        if self.voice_id:
+            engine.setProperty('voice', self.voice_id)
+        if self.rate:
+            engine.setProperty('rate', self.rate)
+
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _list_voices(self):
+        return self._get_engine().getProperty('voices')
+
+    def list_voices(self):
+        """Return a Future of the installed pyttsx3 voice objects"""
+        return self._executor.submit(self._list_voices)
+
+    def render(self, text):
+        """Return a Future of WAV bytes for text"""
+        return self._executor.submit(self._render, text)
+
+    def synthesize(self, text):
+        """Return a Future of mono float32 PCM for text"""
+        return self._executor.submit(lambda: decode_wav(self._render(text)))
+
+
+class Pyttsx3Backend(SynthesisBackend):
+    """Offline SAPI voices through pyttsx3; the Edge voice name is ignored"""
+
+    name = 'pyttsx3'
+    audio_format = 'wav'
+
+    def __init__(self, local=None):
+        self.local = local or LocalSynthesizer()
+
+    def cache_voice(self, voice):
+        return f"{self.name}:{self.local.voice_id}:{self.local.rate}"
+
+    async def synthesize(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        return await asyncio.wrap_future(self.local.render(text))
+
+
+class StubBackend(SynthesisBackend):
+    """Deterministic offline stand-in: one tone per word, with simulated network timing
+
+    latency is the delay before the first chunk; speed is how many seconds of audio
+    are produced per second of wall time. The same text always gives the same audio,
+    so reader, cache and export pipelines can be measured without a network.
+    """
+
+    name = 'stub'
+    audio_format = 'wav'
+
+    SECONDS_PER_CHAR = 0.06
+    WORD_GAP = 0.08
+    CHUNK_SECONDS = 0.25
+
+    def __init__(self, latency=0.3, speed=20.0, sample_rate=EDGE_SAMPLE_RATE):
+        self.latency = latency
+        self.speed = speed
+        self.sample_rate = sample_rate
+
+    def render(self, text):
+        """Return (int16 PCM, word boundaries) for text"""
+        segments = []
+        boundaries = []
+        position = 0
+        gap = np.zeros(int(self.WORD_GAP * self.sample_rate), dtype=np.float32)
+        for word in text.split():
+            # Pitch comes from the word itself, so output is stable across runs
+            frequency = 220 + zlib.crc32(word.encode('utf-8')) % 440
+            length = int(max(1, len(word)) * self.SECONDS_PER_CHAR * self.sample_rate)
+            t = np.arange(length, dtype=np.float32) / self.sample_rate
+            envelope = np.minimum(1.0, np.minimum(t, t[::-1]) * 50.0)  # 20 ms fades, no clicks
+            segments.append(0.2 * envelope * np.sin(2 * np.pi * frequency * t).astype(np.float32))
+            segments.append(gap)
+            boundaries.append({
+                "type": "WordBoundary",
+                "offset": position * 10_000_000 // self.sample_rate,  # 100 ns units, as Edge
+                "duration": length * 10_000_000 // self.sample_rate,
+                "text": word
+            })
+            position += length + gap.size
+
+        pcm = np.concatenate(segments) if segments else np.zeros(0, dtype=np.float32)
+        return (pcm * 32767).astype('<i2'), boundaries
+
+    async def stream(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        pcm, boundaries = self.render(text)
+        await asyncio.sleep(self.latency)
+        # The total length is known up front, so the header goes first and chunks stream
+        yield {"type": "audio", "data": wav_header(pcm.size, self.sample_rate)}
+
+        chunk_frames = int(self.CHUNK_SECONDS * self.sample_rate)
+        next_boundary = 0
+        for start in range(0, pcm.size, chunk_frames):
+            end = min(start + chunk_frames, pcm.size)
+            # Edge sends word boundaries ahead of the audio they describe
+            while (next_boundary < len(boundaries) and
+                   boundaries[next_boundary]["offset"] * self.sample_rate // 10_000_000 < end):
+                yield boundaries[next_boundary]
+                next_boundary += 1
+            yield {"type": "audio", "data": pcm[start:end].tobytes()}
+            if self.speed > 0:
+                await asyncio.sleep((end - start) / self.sample_rate / self.speed)
+
+
+BACKENDS = {
+    'edge': EdgeBackend,
+    'pyttsx3': Pyttsx3Backend,
+    'stub': StubBackend,
+}
+
+
+def create_backend(name, **options):
+    """Build the backend registered under name ('edge', 'pyttsx3' or 'stub')"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown synthesis backend: {name}")
+    return BACKENDS[name](**options)
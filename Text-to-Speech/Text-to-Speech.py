@@ -14,12 +14,11 @@ import traceback
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog, font, colorchooser
 import threading
+from concurrent.futures import CancelledError as FutureCancelledError
 import pyttsx3
 import keyboard
-from PIL import Image, ImageTk, ImageDraw, ImageEnhance, ImageFilter
+from PIL import Image, ImageTk, ImageDraw
 import pytesseract
-import mss
-import mss.tools
 import venv
 import site
 import json
@@ -28,28 +27,66 @@ import math
 import numpy as np
 import sounddevice as sd
 import wave
-import edge_tts
 import asyncio
 import pydub
 from pydub import AudioSegment
 import tempfile
 import queue
 import time
-import winsound
+import argparse
 
 # Add new imports for speech recognition
 import speech_recognition as sr
 from scipy.io import wavfile
-import re
 
 # Add new imports at the top of the file
-import docx
-import PyPDF2
 import io
 
 # Add new import for GamingSpeechWindow
 from Gaming_Speech import GamingSpeechWindow
 
+# In-process audio decoding and playback
+from Audio_Engine import StreamingMP3Decoder, StreamingWAVDecoder, StreamPlayer, get_playback_queue
+
+# Sentence splitting and pipelined synthesis
+from Speech_Synthesis import (PipelinedReader, split_sentences, synthesize_pcm,
+                              synthesize_mp3_async, configure_audio_cache, get_audio_cache,
+                              get_tts_service, prefetch_sentences, set_speculative_prefetch,
+                              LocalSynthesizer, HedgedSynthesizer, configure_backend, get_backend,
+                              make_cache_key, CancelToken, wpm_to_edge_rate, stretch_cached,
+                              stretch_boundaries, note_rate_variant)
+
+# Cached Edge and pyttsx3 voice lists
+from Voice_Catalog import get_voice_catalog
+
+# Read-along word highlighting
+from Read_Along import WordHighlighter
+
+# Document text extraction, shared with headless batch conversion
+from Document_Loader import read_text_file, read_pdf_file, read_word_file
+from Batch_Convert import BatchConverter, collect_documents, format_summary
+
+# Localhost TTS/OCR service mode
+from Local_Service import (LocalService, DEFAULT_PORT as DEFAULT_SERVICE_PORT, DEFAULT_MAX_QUEUE,
+                           DEFAULT_WORKERS as DEFAULT_SERVICE_WORKERS)
+from Audio_Engine import decode_audio
+from Audio_Export import MP3Exporter
+
+# Region-only and frozen-frame screen capture
+from Screen_Capture import FrozenFrame, grab_region, virtual_screen
+
+# NumPy/OpenCV OCR preprocessing
+from Image_Preprocessing import ENHANCED_PIPELINE, SELECTION_PIPELINE
+
+# Warm in-process Tesseract shared by every OCR call
+from OCR_Engine import create_engine, get_ocr_engine
+
+# Precompiled OCR, speech-to-text and pre-synthesis text cleanup
+from Text_Normalizer import clean_ocr_text, clean_transcript, normalize_for_speech
+
+# Time for the hidden selection overlay to leave the screen before the region is grabbed
+CAPTURE_DELAY_MS = 60
+
 # Default settings
 DEFAULT_SETTINGS = {
     'font_family': 'Arial',
@@ -58,7 +95,22 @@ DEFAULT_SETTINGS = {
     'font_weight': 'normal',
     'text_wrap': 'word',
     'text_color': '#000000',
-    'bg_color': '#FFFFFF'
+    'bg_color': '#FFFFFF',
+    'read_mode': 'pipelined',  # 'pipelined', 'streaming' or 'classic'
+    'audio_cache_mb': 200,
+    'export_concurrency': 4,  # Parallel Edge TTS requests when saving MP3
+    'speculative_prefetch': False,  # Pre-synthesize the first sentences of loaded text
+    'hedge_deadline_ms': 1500,  # Race the offline voice if Edge TTS is slower than this (0 = off)
+    'synthesis_backend': 'edge',  # 'edge', 'pyttsx3' or 'stub' (offline test tones)
+    'stub_latency_ms': 300,  # Simulated first-chunk delay of the stub backend
+    'stub_speed': 20.0,  # Seconds of stub audio produced per second
+    'speech_rate': 150,  # Words per minute; 150 is Edge's normal speed
+    'edge_pitch_hz': 0,  # Edge prosody pitch offset
+    'edge_volume_pct': 0,  # Edge prosody volume offset
+    'edge_voice': "en-US-AriaNeural",  # Edge TTS voice used for reading and export
+    'read_along': True,  # Highlight the spoken word while reading in streaming mode
+    'strip_headers_footers': False,  # Drop running page headers/footers when loading documents
+    'freeze_screen_capture': False  # Grab the whole screen when a selection starts, not just the region after
 }
 
 # Add version information at the top of the file, after imports
@@ -220,6 +272,9 @@ class ScreenTextSelector:
         self.file_menu.add_command(label="Load from Text...", command=self.load_from_text)
         self.file_menu.add_command(label="Load from PDF...", command=self.load_from_pdf)
         self.file_menu.add_command(label="Load from Word...", command=self.load_from_word)
+        self.strip_furniture_var = tk.BooleanVar(value=self.settings.get('strip_headers_footers', False))
+        self.file_menu.add_checkbutton(label="Strip Page Headers/Footers", variable=self.strip_furniture_var,
+                                       command=self.toggle_strip_headers_footers)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.on_close)
 
@@ -230,6 +285,31 @@ class ScreenTextSelector:
         self.voice_menu.add_separator()
         self.voice_menu.add_command(label="Voice Selection", command=self.show_voice_settings)
         self.voice_menu.add_command(label="Speed Settings", command=self.show_speed_settings)
+        self.voice_menu.add_separator()
+        self.read_mode_var = tk.StringVar(value=self.settings.get('read_mode', 'pipelined'))
+        self.read_mode_menu = tk.Menu(self.voice_menu, tearoff=0)
+        self.voice_menu.add_cascade(label="Reading Mode", menu=self.read_mode_menu)
+        self.read_mode_menu.add_radiobutton(label="Sentence Pipeline", value='pipelined',
+                                            variable=self.read_mode_var, command=self.set_read_mode)
+        self.read_mode_menu.add_radiobutton(label="Streaming", value='streaming',
+                                            variable=self.read_mode_var, command=self.set_read_mode)
+        self.read_mode_menu.add_radiobutton(label="Classic (synthesize, then play)", value='classic',
+                                            variable=self.read_mode_var, command=self.set_read_mode)
+        self.prefetch_var = tk.BooleanVar(value=self.settings.get('speculative_prefetch', False))
+        self.voice_menu.add_checkbutton(label="Pre-synthesize Loaded Text", variable=self.prefetch_var,
+                                        command=self.toggle_speculative_prefetch)
+        self.read_along_var = tk.BooleanVar(value=self.settings.get('read_along', True))
+        self.voice_menu.add_checkbutton(label="Highlight Words While Reading (Streaming)",
+                                        variable=self.read_along_var, command=self.toggle_read_along)
+        self.backend_var = tk.StringVar(value=self.settings.get('synthesis_backend', 'edge'))
+        self.backend_menu = tk.Menu(self.voice_menu, tearoff=0)
+        self.voice_menu.add_cascade(label="Synthesis Backend", menu=self.backend_menu)
+        self.backend_menu.add_radiobutton(label="Edge TTS (online)", value='edge',
+                                          variable=self.backend_var, command=self.set_synthesis_backend)
+        self.backend_menu.add_radiobutton(label="System Voice (offline)", value='pyttsx3',
+                                          variable=self.backend_var, command=self.set_synthesis_backend)
+        self.backend_menu.add_radiobutton(label="Test Tones (offline stub)", value='stub',
+                                          variable=self.backend_var, command=self.set_synthesis_backend)
 
         # Tools menu
         self.tools_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -238,7 +318,12 @@ class ScreenTextSelector:
         self.tools_menu.add_command(label="Speech to Text", command=self.start_speech_to_text)
         self.tools_menu.add_command(label="Audio File to Text", command=self.audio_file_to_text)
         self.tools_menu.add_command(label="Enhanced OCR", command=self.enhanced_ocr)
+        self.freeze_capture_var = tk.BooleanVar(value=self.settings.get('freeze_screen_capture', False))
+        self.tools_menu.add_checkbutton(label="Freeze Screen During Selection", variable=self.freeze_capture_var,
+                                        command=self.toggle_freeze_capture)
         self.tools_menu.add_command(label="Gaming Speech", command=self.show_gaming_speech)
+        self.tools_menu.add_separator()
+        self.tools_menu.add_command(label="Audio Cache...", command=self.show_audio_cache)
 
         # About menu
         self.about_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -290,7 +375,7 @@ class ScreenTextSelector:
                                  "2. Placed in the 'Tesseract-OCR' folder next to this application")
 
         # Initialize text-to-speech engine *after* setting up default attributes
-        self.current_rate = 150  # Default speed
+        self.current_rate = self.settings.get('speech_rate', 150)  # Saved speed
         self.current_voice_id = None  # Default voice ID
         self.engine = None
         self.voices = []
@@ -303,7 +388,8 @@ class ScreenTextSelector:
         self.start_y = None
         self.current_x = None
         self.current_y = None
-        self.screenshot = None # This will be a PIL Image
+        self.screenshot = None # FrozenFrame of the whole screen, only when freezing the screen
+        self.selection_image = None # PIL Image of the selected region
         self.virtual_screen_geo = None # Store combined geometry {left, top, width, height}
         self.top_level = None
         self.canvas = None
@@ -315,6 +401,19 @@ class ScreenTextSelector:
         # Initialize Edge TTS (don't initialize here, create when needed)
         self.edge_tts_communicate = None
         
+        # Synthesized audio is cached under temp/audio_cache
+        configure_audio_cache(max_bytes=self.settings['audio_cache_mb'] * 1024 * 1024)
+        set_speculative_prefetch(self.settings['speculative_prefetch'])
+        
+        # Offline pyttsx3 voice used when Edge TTS is slow or unreachable
+        self.local_synth = LocalSynthesizer()
+        self.configure_synthesis_backend()
+
+        # Refresh stale voice lists in the background; the cached lists serve meanwhile
+        get_voice_catalog().refresh_in_background(
+            lambda: self.local_synth.list_voices().result(),
+            on_done=lambda: self.root.after(0, self.update_voice_dropdown))
+        
         # Audio recording variables
         self.is_recording = False
         self.audio_queue = queue.Queue()
@@ -322,8 +421,9 @@ class ScreenTextSelector:
 
         # Add audio playback control
         self.audio_thread = None
-        self.is_playing = False
-        self.audio_process = None
+        self.read_token = None  # CancelToken of the read in progress
+        self.pipelined_reader = None  # Sentence reader in progress, for seeking
+        self.stream_player = None
 
         # Create UI
         self.create_ui()
@@ -336,7 +436,10 @@ class ScreenTextSelector:
             keyboard.add_hotkey('ctrl+shift+s', self.start_selection)
             keyboard.add_hotkey('ctrl+shift+x', self.stop_speech)
             keyboard.add_hotkey('ctrl+shift+r', self.start_reading)
-            print("Hotkeys registered (Ctrl+Shift+S, Ctrl+Shift+X, Ctrl+Shift+R)")
+            keyboard.add_hotkey('ctrl+shift+p', self.toggle_pause)
+            keyboard.add_hotkey('ctrl+shift+n', self.next_sentence)
+            keyboard.add_hotkey('ctrl+shift+b', self.previous_sentence)
+            print("Hotkeys registered (Ctrl+Shift+S, Ctrl+Shift+X, Ctrl+Shift+R, Ctrl+Shift+P, Ctrl+Shift+N, Ctrl+Shift+B)")
         except Exception as e:
              messagebox.showerror("Hotkey Error", f"Could not register hotkeys. Administrator rights might be needed.\nError: {e}")
              print(f"Error registering hotkeys: {e}")
@@ -427,37 +530,15 @@ class ScreenTextSelector:
 
         try:
             self.engine = pyttsx3.init()
-            self.voices = self.engine.getProperty('voices')
-            self.voice_descriptions = {}  # Reset descriptions
-            
-            # Create friendly descriptions for each voice
-            for i, voice in enumerate(self.voices):
-                gender = "Male" if "male" in voice.name.lower() or "david" in voice.name.lower() else "Female"
-                lang = "English"  # Default, can be enhanced
-                if "en-" in voice.id.lower():
-                    lang = "English"
-                elif "es-" in voice.id.lower():
-                    lang = "Spanish"
-                # Add more language detection as needed
-                
-                self.voice_descriptions[voice.id] = f"{gender} {lang} Voice - {voice.name}"
+            # Voices come from the catalog; the engine is only asked on the very first run
+            catalog = get_voice_catalog()
+            if not catalog.voices('pyttsx3'):
+                catalog.set_pyttsx3_voices(self.engine.getProperty('voices'))
+            self.load_catalog_voices()
 
             # Apply rate (using pre-set default or previously stored value)
             self.engine.setProperty('rate', self.current_rate)
 
-            # Determine and apply voice if not set
-            if not self.current_voice_id and self.voices:
-                # Try to find a female English voice first
-                preferred_voice = None
-                for voice in self.voices:
-                    if "female" in voice.name.lower() and "en-" in voice.id.lower():
-                        preferred_voice = voice
-                        break
-                
-                # Fallback to first available voice
-                self.current_voice_id = preferred_voice.id if preferred_voice else self.voices[0].id
-                self.engine.setProperty('voice', self.current_voice_id)
-
             print(f"TTS Engine initialized with {len(self.voices)} voices available")
 
         except Exception as e:
@@ -515,7 +596,8 @@ class ScreenTextSelector:
                  "2. Click and drag to select text\n"
                  "3. Release to capture text\n"
                  "4. Ctrl+Shift+R: Start Reading\n"
-                 "5. Ctrl+Shift+X: Stop Reading",
+                 "5. Ctrl+Shift+X: Stop Reading\n"
+                 "6. Ctrl+Shift+P: Pause/Resume, Ctrl+Shift+B/N: Previous/Next Sentence",
             justify=tk.LEFT,
             font=("Arial", 9),
             wraplength=window_width - 40
@@ -626,40 +708,32 @@ class ScreenTextSelector:
             self.tesseract_status.set("Tesseract not found or not working! OCR will fail.")
             print("Warning: Tesseract OCR engine not found or failing.")
 
+    def load_catalog_voices(self):
+        """Take the offline voices and their descriptions from the voice catalog"""
+        catalog = get_voice_catalog()
+        self.voices = catalog.voices('pyttsx3')
+        self.voice_descriptions = {voice.id: voice.description for voice in self.voices}
+
+        # A voice that was uninstalled since the catalog was written falls back to the default
+        if self.current_voice_id and catalog.get(self.current_voice_id) is None:
+            self.current_voice_id = None
+
+        # Determine and apply voice if not set
+        if not self.current_voice_id and self.voices:
+            # Try to find a female English voice first
+            preferred = catalog.voices('pyttsx3', 'en', 'Female')
+            self.current_voice_id = (preferred or self.voices)[0].id
+            self.engine.setProperty('voice', self.current_voice_id)
+
     def update_voice_dropdown(self):
         """Update voice descriptions and current voice"""
-        if not self.engine or not self.voices:
+        if not self.engine:
             self.status_var.set("TTS Engine Error. Cannot update voices.")
             print("TTS engine not available for voice update")
             return
 
         try:
-            # Create friendly descriptions for each voice
-            self.voice_descriptions = {}
-            for voice in self.voices:
-                gender = "Male" if "male" in voice.name.lower() or "david" in voice.name.lower() else "Female"
-                lang = "English"  # Default, can be enhanced
-                if "en-" in voice.id.lower():
-                    lang = "English"
-                elif "es-" in voice.id.lower():
-                    lang = "Spanish"
-                # Add more language detection as needed
-                
-                self.voice_descriptions[voice.id] = f"{gender} {lang} Voice - {voice.name}"
-
-            # Determine and apply voice if not set
-            if not self.current_voice_id and self.voices:
-                # Try to find a female English voice first
-                preferred_voice = None
-                for voice in self.voices:
-                    if "female" in voice.name.lower() and "en-" in voice.id.lower():
-                        preferred_voice = voice
-                        break
-                
-                # Fallback to first available voice
-                self.current_voice_id = preferred_voice.id if preferred_voice else self.voices[0].id
-                self.engine.setProperty('voice', self.current_voice_id)
-
+            self.load_catalog_voices()
             print(f"Voice descriptions updated with {len(self.voices)} voices available")
 
         except Exception as e:
@@ -721,33 +795,32 @@ class ScreenTextSelector:
             if not text:
                 text = "This is a test of the current voice settings."
             
-            # Create new Communicate instance with text
-            communicate = edge_tts.Communicate(text, "en-US-AriaNeural")
+            # Synthesize (or fetch from the audio cache) and decode in memory
+            pcm = self.make_synthesizer()(text)
             
-            # Create temporary directory for audio files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_mp3 = os.path.join(temp_dir, "temp_audio.mp3")
-                temp_wav = os.path.join(temp_dir, "temp_audio.wav")
+            # Play through the in-process output stream
+            self.stop_speech()
+            try:
+                player = StreamPlayer()
+                self.stream_player = player
+                player.start()
+                player.write(pcm)
+                player.finish()
+                self.status_var.set("Playing test audio...")
                 
-                # Save and convert audio
-                asyncio.run(communicate.save(temp_mp3))
-                audio = AudioSegment.from_mp3(temp_mp3)
-                audio.export(temp_wav, format="wav")
+                # Wait for the audio to finish playing
+                while not player.is_done():
+                    time.sleep(0.05)
+                    self.root.update()  # Keep the UI responsive
                 
-                # Play the audio file using winsound
-                try:
-                    winsound.PlaySound(temp_wav, winsound.SND_FILENAME | winsound.SND_ASYNC)
-                    self.status_var.set("Playing test audio...")
-                    
-                    # Wait for the audio to finish playing
-                    while winsound.PlaySound(None, winsound.SND_PURGE) == 0:
-                        time.sleep(0.1)
-                        self.root.update()  # Keep the UI responsive
-                    
-                    self.status_var.set("Test complete")
-                except Exception as e:
-                    self.status_var.set(f"Error playing audio: {str(e)}")
-                    raise
+                self.status_var.set("Test complete")
+            except Exception as e:
+                self.status_var.set(f"Error playing audio: {str(e)}")
+                raise
+            finally:
+                player.stop()
+                if self.stream_player is player:
+                    self.stream_player = None
                 
         except Exception as e:
             self.status_var.set(f"Error testing voice: {str(e)}")
@@ -773,25 +846,21 @@ class ScreenTextSelector:
 
 
     def _initiate_capture_overlay(self):
-        """ Takes screenshot of ALL monitors and creates overlay window covering them"""
+        """Creates an overlay window covering ALL monitors
+
+        The screen is normally grabbed only once the selection is drawn, and only
+        the selected rectangle. With "Freeze Screen During Selection" the whole
+        virtual screen is grabbed now and kept as a BGRA buffer until cropped.
+        """
         try:
-            # Use MSS to get virtual screen geometry and capture it
-            with mss.mss() as sct:
+            if self.freeze_capture_var.get():
+                self.screenshot = FrozenFrame()
+                self.virtual_screen_geo = self.screenshot.geometry
+                print(f"Virtual screenshot taken: {self.screenshot.size}")
+            else:
                 # Monitor 0 provides the bounding box for the entire virtual screen
-                self.virtual_screen_geo = sct.monitors[0]
-                print(f"Virtual screen geometry: {self.virtual_screen_geo}")
-
-                # Grab the entire virtual screen
-                sct_img = sct.grab(self.virtual_screen_geo)
-
-                # Convert the MSS BGRA image to a PIL Image (RGB)
-                self.screenshot = Image.frombytes("RGB", sct_img.size, sct_img.rgb)
-                # Alternative if the above fails (less efficient):
-                # mss.tools.to_png(sct_img.rgb, sct_img.size, output='screenshot.png')
-                # self.screenshot = Image.open('screenshot.png')
-                # os.remove('screenshot.png') # Clean up temp file
-
-            print(f"Virtual screenshot taken: {self.screenshot.size}")
+                self.virtual_screen_geo = virtual_screen()
+            print(f"Virtual screen geometry: {self.virtual_screen_geo}")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture screen using MSS: {str(e)}")
@@ -882,19 +951,41 @@ class ScreenTextSelector:
         width = right - left
         height = bottom - top
 
-        # Clean up selection UI *before* processing
-        self._end_selection_mode()
-
         # Process the selected region if it's large enough
         if width > 5 and height > 5:
-             # Add a small delay before processing, allows UI cleanup
-             self.root.after(50, lambda l=left, t=top, r=right, b=bottom: self.process_selection(l, t, r, b))
+            # Hide the overlay so it is not captured, but keep the main window down until the grab
+            self.selection_mode = False
+            self.top_level.withdraw()
+            self.root.after(CAPTURE_DELAY_MS,
+                            lambda l=left, t=top, r=right, b=bottom: self._capture_selection(l, t, r, b))
         else:
+            # Clean up selection UI
+            self._end_selection_mode()
             messagebox.showinfo("Selection Too Small", "The selected area is too small. Please try again.")
             print("Selection too small, cancelled.")
             self.status_var.set("Selection too small. Ready.")
 
 
+    def _capture_selection(self, left, top, right, bottom):
+        """Grab the selected rectangle (virtual-screen coordinates), then clean up and process it"""
+        try:
+            if self.screenshot is not None:
+                self.selection_image = self.screenshot.crop(left, top, right, bottom)
+            else:
+                geo = self.virtual_screen_geo
+                left, top = max(0, int(left)), max(0, int(top))
+                right, bottom = min(geo['width'], int(right)), min(geo['height'], int(bottom))
+                if right <= left or bottom <= top:
+                    raise ValueError("Calculated crop box has zero or negative size.")
+                self.selection_image = grab_region(geo['left'] + left, geo['top'] + top, right - left, bottom - top)
+        except Exception as e:
+            print(f"Screen capture error (MSS): {e}")
+            self.selection_image = None
+        # Clean up selection UI *before* processing
+        self._end_selection_mode()
+        # Add a small delay before processing, allows UI cleanup
+        self.root.after(50, lambda l=left, t=top, r=right, b=bottom: self.process_selection(l, t, r, b))
+
     def cancel_selection(self, event=None):
         """Cancel the selection process"""
         print("Selection cancelled by user (ESC).")
@@ -932,7 +1023,7 @@ class ScreenTextSelector:
 
     def process_selection(self, left, top, right, bottom):
         """Process the selected region of the screen using virtual coords"""
-        if not self.screenshot:
+        if self.selection_image is None:
             messagebox.showerror("Error", "No screenshot available to process.")
             print("Error: process_selection called without a screenshot.")
             self.status_var.set("Error: No screenshot data. Ready.")
@@ -947,17 +1038,8 @@ class ScreenTextSelector:
             if not pytesseract.pytesseract.tesseract_cmd or not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
                 raise pytesseract.TesseractNotFoundError("Tesseract executable not found")
 
-            # Crop the full virtual screenshot using the calculated coordinates
-            img_width, img_height = self.screenshot.size
-            safe_left = max(0, int(left))
-            safe_top = max(0, int(top))
-            safe_right = min(img_width, int(right))
-            safe_bottom = min(img_height, int(bottom))
-
-            if safe_right <= safe_left or safe_bottom <= safe_top:
-                raise ValueError("Calculated crop box has zero or negative size.")
-
-            selection = self.screenshot.crop((safe_left, safe_top, safe_right, safe_bottom))
+            # The region was grabbed (or cropped from the frozen frame) when the selection ended
+            selection = self.selection_image
             print(f"Cropped image size: {selection.size}")
 
             # Preprocess image to improve OCR
@@ -965,33 +1047,19 @@ class ScreenTextSelector:
 
             # Perform OCR with custom configuration for better text recognition
             custom_config = '--oem 3 --psm 6'
-            text = pytesseract.image_to_string(preprocessed_selection, config=custom_config)
+            text = get_ocr_engine().image_to_string(preprocessed_selection, config=custom_config)
             text = text.strip()
 
             # Enhanced text processing
             if text:
-                # Split into lines and process each line
-                lines = text.split('\n')
-                processed_lines = []
-                for line in lines:
-                    # Remove common OCR artifacts and normalize spacing
-                    cleaned_line = line.strip()
-                    if cleaned_line:
-                        # Remove any non-printable characters
-                        cleaned_line = ''.join(char for char in cleaned_line if char.isprintable())
-                        # Normalize multiple spaces
-                        cleaned_line = ' '.join(cleaned_line.split())
-                        # Skip lines that look like debug output or system messages
-                        if not any(x in cleaned_line.lower() for x in ['debug:', 'error:', 'warning:', 'exception:']):
-                            processed_lines.append(cleaned_line)
-
-                # Join processed lines with proper spacing
-                processed_text = '\n'.join(processed_lines)
+                # Printable characters, single spaces, no debug/system message lines
+                processed_text = clean_ocr_text(text)
                 
                 # Update text area with processed text
                 if processed_text:
                     self.text_area.delete(1.0, tk.END)
                     self.text_area.insert(tk.END, processed_text)
+                    self.prefetch_speech(processed_text)
                     self.status_var.set("Text captured successfully. Ready to read.")
                 else:
                     self.status_var.set("No valid text found after processing.")
@@ -1015,6 +1083,7 @@ class ScreenTextSelector:
         finally:
             # Clear the screenshot and geometry from memory
             self.screenshot = None
+            self.selection_image = None
             self.virtual_screen_geo = None
             
             # Ensure the main window is restored and focused
@@ -1027,27 +1096,11 @@ class ScreenTextSelector:
                     print(f"Error restoring window: {e}")
 
     def preprocess_image(self, image):
-        """Preprocess image to improve OCR results"""
+        """Preprocess image to improve OCR results; returns a grayscale NumPy array"""
         try:
-            # Ensure image is in RGB mode first
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Convert to grayscale
-            image = image.convert('L')
-            
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.5)  # Reduced from 2.0 to prevent over-enhancement
-            
-            # Apply threshold to make text more distinct
-            image = image.point(lambda x: 0 if x < 128 else 255, '1')
-            
-            # Apply slight blur to reduce noise
-            image = image.convert('L')  # Convert back to grayscale after threshold
-            image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
-            
-            return image
+            # Grayscale, contrast 1.5 (2.0 over-enhanced), threshold at 128, slight blur
+            # against noise, all on one array
+            return SELECTION_PIPELINE.run(image)
         except Exception as e:
             print(f"Error during image preprocessing: {e}")
             # Return original image if preprocessing fails
@@ -1081,6 +1134,7 @@ class ScreenTextSelector:
                 text = self.recognizer.recognize_google(audio)
                 self.text_area.delete(1.0, tk.END)
                 self.text_area.insert(tk.END, text)
+                self.prefetch_speech(text)
                 self.status_var.set("Audio file converted to text successfully")
                 
         except Exception as e:
@@ -1102,20 +1156,18 @@ class ScreenTextSelector:
             return
             
         try:
-            # Enhanced preprocessing
-            img = self.screenshot.convert('L')  # Convert to grayscale
-            img = ImageEnhance.Contrast(img).enhance(2.0)  # Increase contrast
-            img = img.filter(ImageFilter.SHARPEN)  # Sharpen image
-            img = img.filter(ImageFilter.MedianFilter(size=3))  # Reduce noise
+            # Enhanced preprocessing: grayscale, contrast 2.0, sharpen, median denoise
+            img = ENHANCED_PIPELINE.run(self.screenshot.image())
             
             # Perform OCR with custom configuration
             custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?@#$%&*()[]{}:;"\''
-            text = pytesseract.image_to_string(img, config=custom_config)
+            text = get_ocr_engine().image_to_string(img, config=custom_config)
             text = text.strip()
 
             if text:
                 self.text_area.delete(1.0, tk.END)
                 self.text_area.insert(tk.END, text)
+                self.prefetch_speech(text)
                 self.status_var.set("Enhanced OCR completed successfully")
             else:
                 self.status_var.set("No text found in selection")
@@ -1123,121 +1175,373 @@ class ScreenTextSelector:
         except Exception as e:
             self.status_var.set(f"Error during enhanced OCR: {str(e)}")
             
-    async def read_text_with_edge_tts(self, text):
-        """Read text using Edge TTS"""
+    async def read_text_with_edge_tts(self, text, token=None):
+        """Read text using Edge TTS; cancelling token stops it"""
+        token = token or CancelToken()
+        player = None
         try:
-            # Create new Communicate instance with text
-            communicate = edge_tts.Communicate(text, "en-US-AriaNeural")
-            
-            # Create temporary directory for audio files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_mp3 = os.path.join(temp_dir, "temp_audio.mp3")
-                temp_wav = os.path.join(temp_dir, "temp_audio.wav")
-                
-                # Save and convert audio
-                await communicate.save(temp_mp3)
-                audio = AudioSegment.from_mp3(temp_mp3)
-                audio.export(temp_wav, format="wav")
-                
-                # Play the audio file using winsound
-                winsound.PlaySound(temp_wav, winsound.SND_FILENAME | winsound.SND_ASYNC)
-                
-                # Wait for the audio to finish playing
-                while winsound.PlaySound(None, winsound.SND_PURGE) == 0:
-                    await asyncio.sleep(0.1)
-                
-                # Small delay to ensure cleanup
-                await asyncio.sleep(0.1)
+            # Synthesize (or fetch from the audio cache), then decode in memory off the
+            # service loop so other syntheses keep going meanwhile
+            mp3_data = await synthesize_mp3_async(text, self.settings['edge_voice'])
+            pcm = await asyncio.to_thread(decode_audio, mp3_data)
+            
+            # Play through the in-process output stream
+            player = token.bind_player(StreamPlayer())
+            self.stream_player = player
+            player.start()
+            player.write(pcm)
+            player.finish()
+            
+            # Wait for the audio to finish playing
+            while token.active() and not player.is_done():
+                await asyncio.sleep(0.05)
                 
         except Exception as e:
             self.status_var.set(f"Error with Edge TTS: {str(e)}")
             print(f"Edge TTS Error: {e}")
+        finally:
+            self._finish_read(token, player)
             
     def start_reading(self):
         """Start reading the current text using Edge TTS"""
         # Stop any existing playback
         self.stop_speech()
         
-        text = self.text_area.get(1.0, tk.END).strip()
+        raw_text = self.text_area.get(1.0, tk.END)
+        text = raw_text.strip()
         if not text:
             self.status_var.set("No text to read")
             return
             
         self.status_var.set("Preparing to read text...")
         
-        # Start audio playback in a separate thread
-        self.audio_thread = threading.Thread(target=self._play_audio_thread, args=(text,))
+        # Pipelined and streaming modes start playback before the whole text is synthesized
+        read_mode = self.read_mode_var.get()
+        options = {}
+        if read_mode == 'pipelined':
+            target = self._pipelined_audio_thread
+        elif read_mode == 'streaming':
+            target = self._stream_audio_thread
+            # Only the streaming path sees Edge's word boundaries
+            if self.read_along_var.get():
+                leading = len(raw_text) - len(raw_text.lstrip())
+                options['highlighter'] = WordHighlighter(self.text_area, text, f"1.0 + {leading} chars")
+        else:
+            target = self._play_audio_thread
+        
+        # Start audio playback in a separate thread; the token lets stop_speech cancel it.
+        # The highlighter keeps the text as displayed; the voice gets the tidied text.
+        self.read_token = CancelToken()
+        self.audio_thread = threading.Thread(target=target, args=(normalize_for_speech(text), self.read_token),
+                                             kwargs=options)
         self.audio_thread.daemon = True
         self.audio_thread.start()
         
-    def _play_audio_thread(self, text):
+    def prosody(self):
+        """Edge (rate, pitch, volume) strings for the current speed, pitch and volume settings"""
+        return (wpm_to_edge_rate(self.current_rate),
+                f"{int(self.settings['edge_pitch_hz']):+d}Hz",
+                f"{int(self.settings['edge_volume_pct']):+d}%")
+
+    def make_synthesizer(self, token=None):
+        """Return a text -> PCM function, hedged with the offline voice when enabled"""
+        # Follow the voice and speed chosen for the pyttsx3 engine
+        self.local_synth.configure(self.current_voice_id, self.current_rate)
+        voice = self.settings['edge_voice']
+        rate, pitch, volume = self.prosody()
+        deadline_ms = self.settings.get('hedge_deadline_ms', 0)
+        # Only the online backend has a network to hedge against
+        if deadline_ms <= 0 or get_backend().name != 'edge':
+            return lambda text: synthesize_pcm(text, voice, token, rate, pitch, volume)
+        return HedgedSynthesizer(self.local_synth, voice, deadline=deadline_ms / 1000.0, token=token,
+                                 rate=rate, pitch=pitch, volume=volume)
+
+    def _finish_read(self, token, player):
+        """Release a finished read's player unless a newer read has taken over"""
+        if player is not None:
+            player.stop()
+        if self.stream_player is player:
+            self.stream_player = None
+        if self.read_token is token:
+            self.read_token = None
+            self.pipelined_reader = None
+
+    def _report_read_error(self, token, where, e):
+        """Show a read error, unless it is just the fallout of a stop request"""
+        if token.cancelled or isinstance(e, FutureCancelledError):
+            return
+        error_msg = f"Error reading text: {str(e)}"
+        print(f"Error in {where}: {e}")
+        self.root.after(0, lambda: [
+            self.status_var.set(error_msg),
+            messagebox.showerror("Text-to-Speech Error", error_msg)
+        ])
+
+    def _play_audio_thread(self, text, token):
         """Handle audio playback in a separate thread"""
+        player = None
         try:
-            self.is_playing = True
+            # Update status in main thread
+            self.root.after(0, lambda: self.status_var.set("Generating speech..."))
             
-            # Create temporary directory for audio files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_mp3 = os.path.join(temp_dir, "temp_audio.mp3")
-                temp_wav = os.path.join(temp_dir, "temp_audio.wav")
-                
-                # Create new Communicate instance with text
-                communicate = edge_tts.Communicate(text, "en-US-AriaNeural")
-                
+            # Synthesize (or fetch from the audio cache) and decode in memory
+            pcm = self.make_synthesizer(token)(text)
+            
+            if token.active():  # Check if we should still play
                 # Update status in main thread
-                self.root.after(0, lambda: self.status_var.set("Generating speech..."))
+                self.root.after(0, lambda: self.status_var.set("Playing audio..."))
                 
-                # Save audio synchronously
-                asyncio.run(communicate.save(temp_mp3))
+                player = token.bind_player(StreamPlayer())
+                self.stream_player = player
+                player.start()
+                player.write(pcm)
+                player.finish()
                 
-                # Convert to WAV format
-                audio = AudioSegment.from_mp3(temp_mp3)
-                audio.export(temp_wav, format="wav")
+                # Wait for playback to complete or stop signal; if we're still
+                # playing afterwards, playback completed naturally
+                if player.wait(token.active) and token.active():
+                    self.root.after(0, lambda: self.status_var.set("Reading complete"))
                 
-                # Update status in main thread
+        except Exception as e:
+            self._report_read_error(token, "_play_audio_thread", e)
+        finally:
+            self._finish_read(token, player)
+            
+    def set_read_mode(self):
+        """Switch the reading mode and remember the choice"""
+        self.settings['read_mode'] = self.read_mode_var.get()
+        self.save_settings()
+        self.status_var.set(f"Reading mode set to {self.read_mode_var.get()}")
+
+    def toggle_speculative_prefetch(self):
+        """Toggle speculative pre-synthesis and remember the choice"""
+        enabled = self.prefetch_var.get()
+        self.settings['speculative_prefetch'] = enabled
+        self.save_settings()
+        set_speculative_prefetch(enabled)
+        self.status_var.set(f"Pre-synthesis of loaded text {'enabled' if enabled else 'disabled'}")
+
+    def toggle_strip_headers_footers(self):
+        """Toggle removal of running page headers/footers from loaded documents"""
+        enabled = self.strip_furniture_var.get()
+        self.settings['strip_headers_footers'] = enabled
+        self.save_settings()
+        self.status_var.set(f"Page header/footer stripping {'enabled' if enabled else 'disabled'}")
+
+    def toggle_freeze_capture(self):
+        """Toggle grabbing the whole screen when a selection starts and remember the choice"""
+        enabled = self.freeze_capture_var.get()
+        self.settings['freeze_screen_capture'] = enabled
+        self.save_settings()
+        self.status_var.set(f"Screen freezing during selection {'enabled' if enabled else 'disabled'}")
+
+    def toggle_read_along(self):
+        """Toggle read-along word highlighting and remember the choice"""
+        enabled = self.read_along_var.get()
+        self.settings['read_along'] = enabled
+        self.save_settings()
+        self.status_var.set(f"Word highlighting {'enabled' if enabled else 'disabled'}")
+
+    def configure_synthesis_backend(self):
+        """Create the synthesis backend named in the settings"""
+        name = self.settings.get('synthesis_backend', 'edge')
+        try:
+            if name == 'pyttsx3':
+                configure_backend(name, local=self.local_synth)
+            elif name == 'stub':
+                configure_backend(name, latency=self.settings['stub_latency_ms'] / 1000.0,
+                                  speed=self.settings['stub_speed'])
+            else:
+                configure_backend(name)
+        except Exception as e:
+            print(f"Error configuring synthesis backend '{name}', using Edge TTS: {e}")
+            configure_backend('edge')
+
+    def set_synthesis_backend(self):
+        """Switch the synthesis backend and remember the choice"""
+        self.settings['synthesis_backend'] = self.backend_var.get()
+        self.save_settings()
+        self.configure_synthesis_backend()
+        self.status_var.set(f"Synthesis backend set to {self.backend_var.get()}")
+
+    def prefetch_speech(self, text):
+        """Start synthesizing the opening sentences of text that was just loaded"""
+        # Only the sentence pipeline reads sentence-sized cache entries
+        if self.read_mode_var.get() == 'pipelined':
+            rate, pitch, volume = self.prosody()
+            prefetch_sentences(normalize_for_speech(text), self.settings['edge_voice'], rate=rate, pitch=pitch,
+                               volume=volume)
+
+    async def _stream_edge_tts(self, text, player, token, highlighter=None):
+        """Feed synthesized audio chunks to the player as they arrive
+
+        Word boundaries go to the highlighter and are cached as the audio entry's
+        sidecar, so a cached read highlights the same way.
+        """
+        backend = get_backend()
+        cache = get_audio_cache()
+        voice = self.settings['edge_voice']
+        rate, pitch, volume = self.prosody()
+        cache_key = make_cache_key(text, voice, rate, pitch, volume, backend)
+        # Disk reads, decoding and cache writes run on worker threads so other
+        # synthesis, prefetch and export work on the shared loop keeps going
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is None:
+            # A new speed for text that is cached at another speed is stretched locally
+            stretched = await asyncio.to_thread(stretch_cached, text, voice, rate, pitch, volume)
+            if stretched is not None:
+                pcm, source_rate = stretched
+                end = player.write(pcm)
+                if highlighter is not None and end is not None:
+                    highlighter.set_origin(end - len(pcm))
+                    # The source recording's word timings, stretched along with its audio
+                    source_key = make_cache_key(text, voice, source_rate, pitch, volume, backend)
+                    words = await asyncio.to_thread(cache.get_sidecar, source_key)
+                    if words is not None:
+                        highlighter.load_boundaries(stretch_boundaries(json.loads(words), source_rate, rate),
+                                                    player.sample_rate)
                 self.root.after(0, lambda: self.status_var.set("Playing audio..."))
+                return
+        if cached is not None:
+            pcm = await asyncio.to_thread(decode_audio, cached)
+            end = player.write(pcm)
+            if highlighter is not None and end is not None:
+                highlighter.set_origin(end - len(pcm))
+                words = await asyncio.to_thread(cache.get_sidecar, cache_key)
+                if words is not None:
+                    highlighter.load_boundaries(json.loads(words), player.sample_rate)
+            self.root.after(0, lambda: self.status_var.set("Playing audio..."))
+            return
+        
+        decoder = StreamingWAVDecoder() if backend.audio_format == 'wav' else StreamingMP3Decoder()
+        mp3_data = bytearray()
+        boundaries = []
+        first_chunk = True
+        
+        async for chunk in backend.stream(text, voice, rate, pitch, volume):
+            if token.cancelled:
+                return
+            if chunk["type"] == "WordBoundary":
+                boundaries.append({key: chunk[key] for key in ("offset", "duration", "text")})
+                if highlighter is not None:
+                    highlighter.add_boundary(chunk, player.sample_rate)
+                continue
+            if chunk["type"] != "audio":
+                continue
+            mp3_data.extend(chunk["data"])
+            pcm = await asyncio.to_thread(decoder.feed, chunk["data"])
+            if len(pcm):
+                end = player.write(pcm)
+                if highlighter is not None and end is not None:
+                    highlighter.set_origin(end - len(pcm))
+                if first_chunk:
+                    first_chunk = False
+                    self.root.after(0, lambda: self.status_var.set("Playing audio..."))
+        
+        player.write(await asyncio.to_thread(decoder.flush))
+        
+        # Only complete streams are cached; the word timings live and die with their audio
+        words = json.dumps(boundaries).encode('utf-8') if boundaries else None
+        await asyncio.to_thread(cache.put, cache_key, bytes(mp3_data), words)
+        note_rate_variant(text, voice, rate, pitch, volume)
+
+    def _stream_audio_thread(self, text, token, highlighter=None):
+        """Handle streaming synthesis and playback in a separate thread"""
+        player = None
+        try:
+            self.root.after(0, lambda: self.status_var.set("Generating speech..."))
+            
+            # Make sure the output stream is running so the first decoded block plays immediately
+            player = token.bind_player(StreamPlayer())
+            self.stream_player = player
+            player.start()
+            if highlighter is not None:
+                self.root.after(0, lambda: highlighter.start(player))
+            
+            # Runs on the shared TTS loop; cancelling the token aborts the request mid-stream
+            token.track(get_tts_service().submit(self._stream_edge_tts(text, player, token, highlighter))).result()
+            player.finish()
+            
+            # Wait for the buffered audio to drain or a stop request
+            if player.wait(token.active):
+                self.root.after(0, lambda: self.status_var.set("Reading complete"))
                 
-                if self.is_playing:  # Check if we should still play
-                    # Play the audio file using subprocess for better control
-                    self.audio_process = subprocess.Popen(
-                        ['powershell', '-c', f'(New-Object Media.SoundPlayer "{temp_wav}").PlaySync()'],
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    # Wait for playback to complete or stop signal
-                    while self.is_playing and self.audio_process.poll() is None:
-                        time.sleep(0.1)
+        except Exception as e:
+            self._report_read_error(token, "_stream_audio_thread", e)
+        finally:
+            self._finish_read(token, player)
+
+    def _pipelined_audio_thread(self, text, token):
+        """Read text sentence by sentence, synthesizing ahead of playback"""
+        player = None
+        try:
+            sentences = split_sentences(text)
+            self.root.after(0, lambda: self.status_var.set("Generating speech..."))
+            
+            player = token.bind_player(StreamPlayer())
+            self.stream_player = player
+            player.start()
+            
+            def on_segment(index, total):
+                self.root.after(0, lambda: self.status_var.set(f"Reading sentence {index + 1} of {total}..."))
+            
+            reader = PipelinedReader(self.make_synthesizer(token), player, lookahead=2)
+            self.pipelined_reader = reader
+            if reader.read(sentences, token.active, on_segment):
+                if reader.reused:
+                    print(f"Reused audio for {reader.reused} repeated sentences")
+                player.finish()
+                if player.wait(token.active):
+                    self.root.after(0, lambda: self.status_var.set("Reading complete"))
                     
-                    # If we're still playing, it means playback completed naturally
-                    if self.is_playing:
-                        self.root.after(0, lambda: self.status_var.set("Reading complete"))
-                
         except Exception as e:
-            error_msg = f"Error reading text: {str(e)}"
-            print(f"Error in _play_audio_thread: {e}")
-            # Update status in main thread
-            self.root.after(0, lambda: [
-                self.status_var.set(error_msg),
-                messagebox.showerror("Text-to-Speech Error", error_msg)
-            ])
+            self._report_read_error(token, "_pipelined_audio_thread", e)
         finally:
-            self.is_playing = False
-            if self.audio_process and self.audio_process.poll() is None:
-                self.audio_process.terminate()
-                self.audio_process = None
-            
+            self._finish_read(token, player)
+
+    def toggle_pause(self):
+        """Pause or resume the current read without losing its position"""
+        player = self.stream_player
+        if not player:
+            self.status_var.set("Nothing is playing")
+            return
+        # Pausing keeps the decoded audio queued; resuming needs no new synthesis
+        if player.is_paused():
+            player.resume()
+            self.status_var.set("Reading resumed")
+        else:
+            player.pause()
+            self.status_var.set("Reading paused")
+
+    def next_sentence(self):
+        """Skip to the next sentence of the current read"""
+        self._seek_sentence(1)
+
+    def previous_sentence(self):
+        """Go back to the previous sentence of the current read"""
+        self._seek_sentence(-1)
+
+    def _seek_sentence(self, offset):
+        reader = self.pipelined_reader
+        if not reader:
+            self.status_var.set("Sentence skipping needs the Sentence Pipeline reading mode")
+            return
+        reader.seek_relative(offset)
+        if self.stream_player and self.stream_player.is_paused():
+            self.stream_player.resume()
+
     def stop_speech(self):
         """Stop current speech"""
         try:
-            self.is_playing = False
-            
-            # Terminate the audio process if it's running
-            if self.audio_process and self.audio_process.poll() is None:
-                self.audio_process.terminate()
-                self.audio_process = None
-            
-            # Wait for the audio thread to finish
-            if self.audio_thread and self.audio_thread.is_alive():
-                self.audio_thread.join(timeout=1.0)
+            # Flush the output buffer and cancel in-flight synthesis; this only signals,
+            # so the UI never waits on the audio thread, which winds down on its own
+            if self.read_token:
+                self.read_token.cancel()
+                self.read_token = None
+            self.pipelined_reader = None
+            if self.stream_player:
+                self.stream_player.stop()
+                self.stream_player = None
             
             # Update status
             self.status_var.set("Speech stopped")
@@ -1270,6 +1574,12 @@ class ScreenTextSelector:
                     print(f"Error during TTS engine cleanup: {e}")
                 self.engine = None
 
+            print("Stopping TTS service...")
+            get_tts_service().stop()
+
+            print("Closing audio output...")
+            get_playback_queue().close()
+
             if self.root:
                 print("Destroying main window.")
                 self.root.destroy()
@@ -1327,7 +1637,7 @@ class ScreenTextSelector:
         # Create a new window for voice settings
         voice_window = tk.Toplevel(self.root)
         voice_window.title("Voice Selection")
-        voice_window.geometry("400x200")
+        voice_window.geometry("450x260")
         voice_window.transient(self.root)  # Make it float above main window
 
         # Voice selection frame
@@ -1358,6 +1668,35 @@ class ScreenTextSelector:
         if current_display in voice_options:
             voice_combo.set(current_display)
 
+        # Online (Edge TTS) voice, filtered by locale from the catalog index
+        catalog = get_voice_catalog()
+        edge_frame = tk.LabelFrame(voice_window, text="Online Voice (Edge TTS)", padx=10, pady=10)
+        edge_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        current_edge = catalog.get(self.settings['edge_voice'])
+        locale_var = tk.StringVar(value=current_edge.locale if current_edge else "en-US")
+        tk.Label(edge_frame, text="Locale:").pack(side=tk.LEFT)
+        locale_combo = ttk.Combobox(edge_frame, textvariable=locale_var, values=catalog.locales('edge'),
+                                    state='readonly', width=8)
+        locale_combo.pack(side=tk.LEFT, padx=5)
+        edge_combo = ttk.Combobox(edge_frame, state='readonly')
+        edge_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        edge_id_map = {}
+
+        def show_locale_voices(event=None):
+            edge_id_map.clear()
+            for voice in catalog.voices('edge', locale_var.get()):
+                edge_id_map[voice.description] = voice.id
+            edge_combo['values'] = list(edge_id_map)
+            current = catalog.get(self.settings['edge_voice'])
+            if current and current.description in edge_id_map:
+                edge_combo.set(current.description)
+            elif edge_id_map:
+                edge_combo.current(0)
+
+        locale_combo.bind('<<ComboboxSelected>>', show_locale_voices)
+        show_locale_voices()
+
         def apply_voice():
             selected_display = voice_combo.get()
             if selected_display and selected_display in voice_id_map:
@@ -1366,6 +1705,11 @@ class ScreenTextSelector:
                     self.current_voice_id = new_voice_id
                     self.engine.setProperty('voice', self.current_voice_id)
                     self.status_var.set(f"Voice set to {selected_display}")
+            new_edge_voice = edge_id_map.get(edge_combo.get())
+            if new_edge_voice and new_edge_voice != self.settings['edge_voice']:
+                self.settings['edge_voice'] = new_edge_voice
+                self.save_settings()
+                self.status_var.set(f"Online voice set to {new_edge_voice}")
             voice_window.destroy()
 
         # Buttons
@@ -1384,7 +1728,7 @@ class ScreenTextSelector:
         # Create a new window for speed settings
         speed_window = tk.Toplevel(self.root)
         speed_window.title("Speed Settings")
-        speed_window.geometry("400x150")
+        speed_window.geometry("400x330")
         speed_window.transient(self.root)  # Make it float above main window
 
         # Speed settings frame
@@ -1402,12 +1746,29 @@ class ScreenTextSelector:
         )
         speed_scale.pack(fill=tk.X, padx=5, pady=5)
 
+        # Pitch and volume only apply to the Edge TTS voices
+        prosody_frame = tk.LabelFrame(speed_window, text="Edge Voice", padx=10, pady=5)
+        prosody_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        pitch_var = tk.IntVar(value=self.settings['edge_pitch_hz'])
+        tk.Scale(prosody_frame, from_=-50, to=50, orient=tk.HORIZONTAL, variable=pitch_var,
+                 label="Pitch (Hz)").pack(fill=tk.X, padx=5)
+        volume_var = tk.IntVar(value=self.settings['edge_volume_pct'])
+        tk.Scale(prosody_frame, from_=-50, to=50, orient=tk.HORIZONTAL, variable=volume_var,
+                 label="Volume (%)").pack(fill=tk.X, padx=5)
+
         def apply_speed():
             new_speed = speed_var.get()
             if new_speed != self.current_rate:
                 self.current_rate = new_speed
                 self.engine.setProperty('rate', self.current_rate)
-                self.status_var.set(f"Speech speed set to {self.current_rate}")
+            # Edge reads pick these up on the next read; a speed change alone is served
+            # by stretching already-cached audio rather than synthesizing it again
+            self.settings['speech_rate'] = self.current_rate
+            self.settings['edge_pitch_hz'] = pitch_var.get()
+            self.settings['edge_volume_pct'] = volume_var.get()
+            self.save_settings()
+            self.status_var.set(f"Speech speed set to {self.current_rate}")
             speed_window.destroy()
 
         # Buttons
@@ -1593,16 +1954,21 @@ class ScreenTextSelector:
 
     def save_as_mp3(self):
         """Save the current text as an MP3 file using Edge TTS"""
-        text = self.text_area.get(1.0, tk.END).strip()
+        text = normalize_for_speech(self.text_area.get(1.0, tk.END))
         if not text:
             messagebox.showinfo("No Text", "There is no text to convert to speech.")
             return
 
         try:
             # Get the file path from the user
+            # The offline backends produce WAV rather than MP3
+            if get_backend().audio_format == 'wav':
+                extension, file_type = ".wav", ("WAV files", "*.wav")
+            else:
+                extension, file_type = ".mp3", ("MP3 files", "*.mp3")
             file_path = filedialog.asksaveasfilename(
-                defaultextension=".mp3",
-                filetypes=[("MP3 files", "*.mp3"), ("All files", "*.*")],
+                defaultextension=extension,
+                filetypes=[file_type, ("All files", "*.*")],
                 title="Save as MP3"
             )
             
@@ -1616,7 +1982,7 @@ class ScreenTextSelector:
             # Create a progress window
             progress_window = tk.Toplevel(self.root)
             progress_window.title("Converting to MP3")
-            progress_window.geometry("300x100")
+            progress_window.geometry("300x130")
             progress_window.transient(self.root)
             
             # Center the progress window
@@ -1629,18 +1995,37 @@ class ScreenTextSelector:
             progress_label = tk.Label(progress_window, text="Converting text to speech...\nThis may take a moment.")
             progress_label.pack(pady=10)
             
-            # Add progress bar
-            progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
-            progress_bar.pack(fill=tk.X, padx=20, pady=10)
-            progress_bar.start()
+            # Add progress bar; it advances as each chunk is written
+            progress_bar = ttk.Progressbar(progress_window, mode='determinate')
+            progress_bar.pack(fill=tk.X, padx=20, pady=5)
+
+            rate, pitch, volume = self.prosody()
+            exporter = MP3Exporter(self.settings['edge_voice'], concurrency=self.settings['export_concurrency'],
+                                   rate=rate, pitch=pitch, volume=volume)
+            tk.Button(progress_window, text="Cancel", command=exporter.cancel).pack(pady=5)
+            progress_window.protocol("WM_DELETE_WINDOW", exporter.cancel)
+
+            # Chunks finished by an earlier, interrupted export to this file are reused
+            done, total = exporter.pending_chunks(text, file_path)
+            if done:
+                progress_label.config(text=f"Resuming previous export...\n{done} of {total} chunks already done")
+
+            def update_progress(done, total):
+                def apply():
+                    if progress_window.winfo_exists():
+                        progress_bar.config(maximum=total, value=done)
+                        progress_label.config(text=f"Converting text to speech...\nChunk {done} of {total}")
+                self.root.after(0, apply)
 
             def convert_to_mp3():
                 try:
-                    # Create new Communicate instance with text
-                    communicate = edge_tts.Communicate(text, "en-US-AriaNeural")
-                    
-                    # Save directly to MP3
-                    asyncio.run(communicate.save(file_path))
+                    # Long documents are split into chunks synthesized in parallel
+                    if exporter.export(text, file_path, update_progress) is None:
+                        self.root.after(0, lambda: [
+                            progress_window.destroy(),
+                            self.status_var.set("MP3 export cancelled - save to the same file again to resume")
+                        ])
+                        return
                     
                     # Update UI in main thread
                     self.root.after(0, lambda: [
@@ -1654,7 +2039,8 @@ class ScreenTextSelector:
                     self.root.after(0, lambda: [
                         progress_window.destroy(),
                         self.status_var.set("Error converting to MP3"),
-                        messagebox.showerror("Error", f"Could not convert text to MP3: {str(e)}")
+                        messagebox.showerror("Error", f"Could not convert text to MP3: {str(e)}\n\n"
+                                                      "Finished parts were kept; save to the same file again to resume.")
                     ])
 
             # Start conversion in a separate thread
@@ -1726,6 +2112,8 @@ class ScreenTextSelector:
             "• Ctrl+Shift+S: Start selection\n"
             "• Ctrl+Shift+R: Start reading\n"
             "• Ctrl+Shift+X: Stop reading\n"
+            "• Ctrl+Shift+P: Pause/resume reading\n"
+            "• Ctrl+Shift+B / Ctrl+Shift+N: Previous/next sentence\n"
             "• Ctrl+Shift+G: Toggle auto-hide\n\n"
             "Voice Options:\n"
             "• Multiple Microsoft Edge TTS voices\n"
@@ -1949,67 +2337,15 @@ class ScreenTextSelector:
                                     continue
                             
                             if text:
-                                # Enhanced text cleanup
-                                text = text.strip()
-                                
-                                # Fix common speech recognition mistakes
-                                replacements = {
-                                    'FORMATTING': 'formatting',
-                                    'FORMAT': 'formatting',
-                                    'PATTERNS': 'patterns',
-                                    'PATTERN': 'pattern',
-                                    'FIX': 'fix',
-                                    'FIXED': 'fixed',
-                                    'DECIMAL': 'decimal',
-                                    'DECIMALS': 'decimals',
-                                    'NUMBERS': 'numbers',
-                                    'NUMBER': 'number',
-                                    'TIME': 'time',
-                                    'FORMAT': 'format',
-                                    'RANGES': 'ranges',
-                                    'RANGE': 'range',
-                                    'INSTEAD': 'instead',
-                                    'OF': 'of',
-                                    'DEGREES': '',
-                                    'DEGREE': '',
-                                    'DEG': '',
-                                    'TO': 'to',
-                                    'E.G.': 'e.g.',
-                                    'EG': 'e.g.',
-                                    'EXAMPLE': 'example',
-                                    'EXAMPLES': 'examples'
-                                }
-                                
-                                for wrong, right in replacements.items():
-                                    text = text.replace(wrong, right)
-                                    text = text.replace(wrong.lower(), right)
-                                
-                                # Fix spacing around punctuation
-                                text = re.sub(r'\s+([.,!?;:])', r'\1', text)  # Remove spaces before punctuation
-                                text = re.sub(r'([.,!?;:])([^\s])', r'\1 \2', text)  # Add space after punctuation
-                                
-                                # Fix specific formatting patterns
-                                text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)  # Fix decimal numbers
-                                text = re.sub(r'(\d+)\s*:\s*(\d+)', r'\1:\2', text)  # Fix time format
-                                text = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1-\2', text)  # Fix number ranges
-                                
-                                # Fix example formatting
-                                text = re.sub(r'e\s*\.\s*g\s*\.', 'e.g.', text, flags=re.IGNORECASE)
-                                text = re.sub(r'for\s+example', 'e.g.', text, flags=re.IGNORECASE)
-                                
-                                # Remove any remaining degree symbols
-                                text = text.replace('°', '')
-                                text = text.replace('degrees', '')
-                                
-                                # Fix common formatting issues
-                                text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-                                text = re.sub(r'([.!?])\s+([A-Z])', r'\1\n\2', text)  # Add newlines after sentences
+                                # Fix common speech recognition mistakes, punctuation and sentence breaks
+                                text = clean_transcript(text)
                                 
                                 # Update UI in main thread
                                 self.root.after(0, lambda: [
                                     progress_window.destroy(),
                                     self.text_area.delete(1.0, tk.END),
                                     self.text_area.insert(tk.END, text),
+                                    self.prefetch_speech(text),
                                     self.status_var.set(f"MP3 converted to text successfully"),
                                     messagebox.showinfo("Success", "MP3 successfully converted to text")
                                 ])
@@ -2080,28 +2416,18 @@ class ScreenTextSelector:
             progress_bar.pack(fill=tk.X, padx=20, pady=10)
             progress_bar.start()
 
+            strip_furniture = self.strip_furniture_var.get()
+
             def load_text():
                 try:
-                    # Try different encodings
-                    encodings = ['utf-8', 'utf-16', 'ascii', 'latin-1']
-                    text = None
-                    
-                    for encoding in encodings:
-                        try:
-                            with open(file_path, 'r', encoding=encoding) as file:
-                                text = file.read()
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    
-                    if text is None:
-                        raise Exception("Could not read file with any supported encoding")
+                    text = read_text_file(file_path, strip_furniture)
                     
                     # Update UI in main thread
                     self.root.after(0, lambda: [
                         progress_window.destroy(),
                         self.text_area.delete(1.0, tk.END),
                         self.text_area.insert(tk.END, text),
+                        self.prefetch_speech(text),
                         self.status_var.set(f"Text loaded from: {os.path.basename(file_path)}")
                     ])
                     
@@ -2158,29 +2484,18 @@ class ScreenTextSelector:
             progress_bar.pack(fill=tk.X, padx=20, pady=10)
             progress_bar.start()
 
+            strip_furniture = self.strip_furniture_var.get()
+
             def load_pdf():
                 try:
-                    text = ""
-                    with open(file_path, 'rb') as file:
-                        # Create PDF reader object
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        
-                        # Get number of pages
-                        num_pages = len(pdf_reader.pages)
-                        
-                        # Extract text from each page
-                        for page_num in range(num_pages):
-                            page = pdf_reader.pages[page_num]
-                            text += page.extract_text() + "\n\n"
-                    
-                    if not text.strip():
-                        raise Exception("No text could be extracted from the PDF")
+                    text = read_pdf_file(file_path, strip_furniture)
                     
                     # Update UI in main thread
                     self.root.after(0, lambda: [
                         progress_window.destroy(),
                         self.text_area.delete(1.0, tk.END),
                         self.text_area.insert(tk.END, text),
+                        self.prefetch_speech(text),
                         self.status_var.set(f"PDF loaded from: {os.path.basename(file_path)}")
                     ])
                     
@@ -2237,24 +2552,18 @@ class ScreenTextSelector:
             progress_bar.pack(fill=tk.X, padx=20, pady=10)
             progress_bar.start()
 
+            strip_furniture = self.strip_furniture_var.get()
+
             def load_word():
                 try:
-                    # Open the Word document
-                    doc = docx.Document(file_path)
-                    
-                    # Extract text from paragraphs
-                    text = ""
-                    for para in doc.paragraphs:
-                        text += para.text + "\n"
-                    
-                    if not text.strip():
-                        raise Exception("No text could be extracted from the Word document")
+                    text = read_word_file(file_path, strip_furniture)
                     
                     # Update UI in main thread
                     self.root.after(0, lambda: [
                         progress_window.destroy(),
                         self.text_area.delete(1.0, tk.END),
                         self.text_area.insert(tk.END, text),
+                        self.prefetch_speech(text),
                         self.status_var.set(f"Word document loaded from: {os.path.basename(file_path)}")
                     ])
                     
@@ -2276,7 +2585,22 @@ class ScreenTextSelector:
 
     def show_gaming_speech(self):
         """Show the gaming speech window"""
-        GamingSpeechWindow(self.root)
+        GamingSpeechWindow(self.root, self)
+
+    def show_audio_cache(self):
+        """Show audio cache statistics and offer to clear it"""
+        cache = get_audio_cache()
+        stats = cache.stats()
+        message = (
+            f"Entries: {stats['entries']}\n"
+            f"Size: {stats['bytes'] / 1048576:.1f} MB of {stats['max_bytes'] / 1048576:.0f} MB\n"
+            f"Hits: {stats['hits']}   Misses: {stats['misses']}   "
+            f"Hit rate: {stats['hit_rate']:.0%}\n\n"
+            "Clear the audio cache?"
+        )
+        if messagebox.askyesno("Audio Cache", message):
+            cache.clear()
+            self.status_var.set("Audio cache cleared")
 
 class SpeechToTextWindow:
     def __init__(self, parent):
@@ -2865,19 +3189,19 @@ def test_tesseract(tesseract_cmd_path):
         print(f"Test Tesseract: Path '{tesseract_cmd_path}' does not exist.")
         return False
     try:
-        original_cmd = pytesseract.pytesseract.tesseract_cmd
-        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd_path
-        version = pytesseract.get_tesseract_version()
-        pytesseract.pytesseract.tesseract_cmd = original_cmd # Restore original
-        print(f"Test Tesseract: Found version {version} at {tesseract_cmd_path}")
+        # A throwaway engine, so testing a path never replaces the one live OCR is using;
+        # the in-process engine reports its version without spawning tesseract
+        engine = create_engine(tesseract_cmd_path)
+        try:
+            print(f"Test Tesseract: Found version {engine.version()} ({engine.name}) at {tesseract_cmd_path}")
+        finally:
+            engine.close()
         return True
     except pytesseract.TesseractNotFoundError:
         print(f"Test Tesseract: TesseractNotFoundError for path '{tesseract_cmd_path}'.")
-        pytesseract.pytesseract.tesseract_cmd = original_cmd # Restore original
         return False
     except Exception as e:
         print(f"Test Tesseract: Error checking version at '{tesseract_cmd_path}': {e}")
-        pytesseract.pytesseract.tesseract_cmd = original_cmd # Restore original
         return False
 
 def find_tesseract():
@@ -2896,6 +3220,105 @@ def find_tesseract():
     except (subprocess.CalledProcessError, FileNotFoundError):
         return None
 
+def setup_headless(backend=None):
+    """Load the saved settings and configure the audio cache and backend without the GUI"""
+    # The GUI's saved voice, speed and backend are the defaults for headless runs too
+    settings = DEFAULT_SETTINGS.copy()
+    try:
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading settings, using defaults: {e}")
+
+    configure_audio_cache(max_bytes=settings['audio_cache_mb'] * 1024 * 1024)
+    backend = backend or settings['synthesis_backend']
+    if backend == 'stub':
+        configure_backend(backend, latency=settings['stub_latency_ms'] / 1000.0, speed=settings['stub_speed'])
+    else:
+        configure_backend(backend)
+    return settings
+
+def batch_main(argv):
+    """Headless entry point: convert documents to audio files without opening the GUI"""
+    parser = argparse.ArgumentParser(
+        prog="Text-to-Speech.py --batch",
+        description="Convert .txt, .pdf and .docx files to audio without the GUI")
+    parser.add_argument('sources', nargs='+', help="Directories or glob patterns of documents")
+    parser.add_argument('--output', help="Directory for the audio files (default: next to each document)")
+    parser.add_argument('--recursive', action='store_true', help="Include subdirectories")
+    parser.add_argument('--voice', help="Edge TTS voice (default: the saved voice)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes extracting document text (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help="Synthesis requests in flight across all documents")
+    parser.add_argument('--backend', choices=['edge', 'pyttsx3', 'stub'], default=None,
+                        help="Synthesis backend (default: the saved backend)")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="Convert documents even when their audio is newer than the source")
+    parser.add_argument('--strip-headers', action='store_true', default=None,
+                        help="Drop running page headers/footers (default: the saved setting)")
+    args = parser.parse_args(argv)
+    settings = setup_headless(args.backend)
+
+    documents = collect_documents(args.sources, args.recursive)
+    if not documents:
+        print("No .txt, .pdf or .docx files found")
+        return 1
+    print(f"Converting {len(documents)} documents")
+
+    converter = BatchConverter(
+        voice=args.voice or settings['edge_voice'],
+        workers=args.workers,
+        concurrency=args.concurrency or settings['export_concurrency'],
+        rate=wpm_to_edge_rate(settings['speech_rate']),
+        pitch=f"{int(settings['edge_pitch_hz']):+d}Hz",
+        volume=f"{int(settings['edge_volume_pct']):+d}%",
+        output_dir=args.output,
+        overwrite=args.overwrite,
+        strip_furniture=args.strip_headers or settings['strip_headers_footers'])
+    try:
+        results = converter.convert(documents)
+    finally:
+        get_tts_service().stop()
+    print(format_summary(results))
+    return 1 if results['failed'] else 0
+
+def serve_main(argv):
+    """Service entry point: keep the engines warm and serve TTS/OCR requests on localhost"""
+    parser = argparse.ArgumentParser(
+        prog="Text-to-Speech.py --serve",
+        description="Serve text-to-speech and OCR to other local tools over HTTP")
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVICE_PORT)
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Requests admitted at once; further requests get 503")
+    parser.add_argument('--workers', type=int, default=DEFAULT_SERVICE_WORKERS,
+                        help="Requests processed in parallel")
+    parser.add_argument('--backend', choices=['edge', 'pyttsx3', 'stub'], default=None,
+                        help="Synthesis backend (default: the saved backend)")
+    args = parser.parse_args(argv)
+    settings = setup_headless(args.backend)
+
+    tesseract_cmd = find_tesseract()
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        get_ocr_engine(tesseract_cmd).warm_up()
+    else:
+        print("Warning: Tesseract not found; OCR requests will fail")
+
+    # Warm the synthesis loop before the first request arrives
+    get_tts_service().start()
+    service = LocalService(port=args.port, max_queue=args.max_queue, workers=args.workers,
+                           voice=settings['edge_voice'])
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("Service stopped")
+    finally:
+        get_tts_service().stop()
+    return 0
+
 def main():
     """Main entry point with error handling"""
     try:
@@ -2924,6 +3347,12 @@ if __name__ == '__main__':
         print("Starting application...")
         if ensure_virtual_environment():
             # If we're already in the virtual environment, run the main application
+            if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+                setup_portable_environment()
+                sys.exit(batch_main(sys.argv[2:]))
+            if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+                setup_portable_environment()
+                sys.exit(serve_main(sys.argv[2:]))
             main()
     except Exception as e:
         print(f"Error in virtual environment setup: {e}")
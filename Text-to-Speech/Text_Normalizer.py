@@ -0,0 +1,224 @@
+import re
+import sys
+import time
+
+# Every pattern is compiled once at import. Each normalizer makes a fixed number of
+# passes over the text, however many replacement rules there are.
+
+# Lines the OCR picked up from consoles and log windows rather than real content.
+# The leading character set lets the engine skip ahead instead of trying every
+# case-insensitive alternative at every position.
+_DIAGNOSTIC_LINE = re.compile(r'^[^\n]*?[DdEeWw](?i:ebug|rror|arning|xception):[^\n]*', re.MULTILINE)
+
+
+def _non_printable_class():
+    """Character class of the Basic Multilingual Plane's non-printable, non-space characters
+
+    Whitespace is left out: the space-collapsing patterns turn tabs, form feeds and
+    no-break spaces into plain spaces instead of deleting them and joining words.
+    """
+    ranges = []
+    start = None
+    for code in range(0x10001):
+        char = chr(code) if code < 0x10000 else 'a'
+        wanted = not char.isprintable() and not char.isspace()
+        if wanted and start is None:
+            start = code
+        elif not wanted and start is not None:
+            ranges.append(f"\\u{start:04x}-\\u{code - 1:04x}" if code - 1 > start else f"\\u{start:04x}")
+            start = None
+    return '[' + ''.join(ranges) + ']+'
+
+
+_NON_PRINTABLE = re.compile(_non_printable_class())
+# Whitespace within a line that is not already a single space: runs, tabs, no-break spaces
+_INLINE_SPACE = re.compile(r' [^\S\n]+|[^\S \n][^\S\n]*')
+# The same including line breaks
+_ANY_SPACE = re.compile(r' \s+|[^\S ]\s*')
+# Line breaks with the spaces and blank lines around them
+_LINE_BREAKS = re.compile(r' ?\n[\n ]*')
+
+# Speech recognition mistakes, matched as whole words in their upper- or lower-case form
+STT_REPLACEMENTS = {
+    'FORMATTING': 'formatting',
+    'PATTERNS': 'patterns',
+    'PATTERN': 'pattern',
+    'FIX': 'fix',
+    'FIXED': 'fixed',
+    'DECIMAL': 'decimal',
+    'DECIMALS': 'decimals',
+    'NUMBERS': 'numbers',
+    'NUMBER': 'number',
+    'TIME': 'time',
+    'FORMAT': 'format',
+    'RANGES': 'ranges',
+    'RANGE': 'range',
+    'INSTEAD': 'instead',
+    'OF': 'of',
+    'DEGREES': '',
+    'DEGREE': '',
+    'DEG': '',
+    'TO': 'to',
+    'E.G.': 'e.g.',
+    'EG': 'e.g.',
+    'EXAMPLE': 'example',
+    'EXAMPLES': 'examples',
+}
+
+
+def _trie_pattern(words):
+    """Regex source matching any of words, factored into a trie so each position is
+    tested against one character set instead of every alternative in turn"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None  # End of a word
+
+    def build(node):
+        ends = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def compile_replacements(replacements):
+    """One trie-shaped alternation for a whole replacement table
+
+    Returns (pattern, lookup) for pattern.sub(lambda m: lookup[m.group(0)], text).
+    Both the given and the lower-case spelling of each key are matched, as whole
+    words; spellings that already equal their replacement are left out so they
+    cost nothing.
+    """
+    lookup = {}
+    for wrong, right in replacements.items():
+        for spelling in (wrong, wrong.lower()):
+            if spelling != right:
+                lookup[spelling] = right
+    # Keys such as "E.G." end in punctuation, which \b cannot follow into a space
+    return re.compile(r'\b' + _trie_pattern(lookup) + r'(?:(?<=\.)|\b)'), lookup
+
+
+_STT_WORDS, _STT_LOOKUP = compile_replacements(STT_REPLACEMENTS)
+
+# The transcript passes below run after whitespace is collapsed to single spaces and
+# replace with templates rather than Python callbacks. Each pattern starts with a
+# rare character class, so the engine skips ahead to candidates.
+_STT_PUNCTUATION = '.,!?;:'
+_STT_EXAMPLE = re.compile(r'\b(?:[Ee] ?\. ?[Gg] ?\.|[Ff][Oo][Rr] [Ee][Xx][Aa][Mm][Pp][Ll][Ee]\b)')
+# Missing space after punctuation; decimal points and clock colons ("3.5", "10:30") are left alone
+_STT_SPACE_AFTER = re.compile(r'([.,!?;:])(?=[^\s.,!?;:])(?<!\d[.:](?=\d))')
+# "3 . 5", "10 : 30", "1 - 5"
+_STT_NUMBER_SPACE = re.compile(r'(\d) ?([.:\-]) ?(?=\d)')
+_STT_SENTENCE_END = re.compile(r'([.!?]) (?=[A-Z])')
+
+# Words hyphenated across a line break in OCR'd or PDF text
+_HYPHENATED_BREAK = re.compile(r'(?<=\w)- ?\n ?(?=[a-z])')
+# Three or more line breaks are one paragraph break
+_EXTRA_NEWLINES = re.compile(r'\n ?\n(?: ?\n)+')
+
+
+def clean_ocr_text(text):
+    """Normalize OCR output: printable characters only, single spaces, no diagnostic or blank lines"""
+    text = _INLINE_SPACE.sub(' ', text)
+    text = _NON_PRINTABLE.sub('', text)
+    text = _DIAGNOSTIC_LINE.sub('', text)
+    return _LINE_BREAKS.sub('\n', text).strip()
+
+
+def clean_transcript(text):
+    """Normalize speech recognition output: fix common mistakes, punctuation spacing and sentence breaks"""
+    text = _STT_WORDS.sub(lambda match: _STT_LOOKUP[match.group(0)], text.replace('°', ''))
+    text = _ANY_SPACE.sub(' ', text)
+    for mark in _STT_PUNCTUATION:
+        # A plain replace finds " ," far faster than a pattern that must start at every space
+        text = text.replace(' ' + mark, mark)
+    text = _STT_SPACE_AFTER.sub(r'\1 ', text)
+    text = _STT_NUMBER_SPACE.sub(r'\1\2', text)
+    text = _STT_EXAMPLE.sub('e.g.', text)
+    return _STT_SENTENCE_END.sub('\\1\n', text).strip()
+
+
+def normalize_for_speech(text):
+    """Tidy text before synthesis: join words hyphenated across lines, drop control
+    characters, collapse spaces and extra blank lines (paragraph breaks are kept)"""
+    text = _INLINE_SPACE.sub(' ', text)
+    text = _NON_PRINTABLE.sub('', text)
+    text = _HYPHENATED_BREAK.sub('', text)
+    return _EXTRA_NEWLINES.sub('\n\n', text).strip()
+
+
+def _legacy_clean_ocr_text(text):
+    """The per-character cleanup previously inlined in process_selection, kept for the benchmark"""
+    processed_lines = []
+    for line in text.strip().split('\n'):
+        cleaned_line = line.strip()
+        if cleaned_line:
+            cleaned_line = ''.join(char for char in cleaned_line if char.isprintable())
+            cleaned_line = ' '.join(cleaned_line.split())
+            if not any(x in cleaned_line.lower() for x in ['debug:', 'error:', 'warning:', 'exception:']):
+                processed_lines.append(cleaned_line)
+    return '\n'.join(processed_lines)
+
+
+def _legacy_clean_transcript(text):
+    """The sequential cleanup previously inlined in load_from_mp3, kept for the benchmark"""
+    text = text.strip()
+    for wrong, right in STT_REPLACEMENTS.items():
+        text = text.replace(wrong, right)
+        text = text.replace(wrong.lower(), right)
+    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    text = re.sub(r'([.,!?;:])([^\s])', r'\1 \2', text)
+    text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)
+    text = re.sub(r'(\d+)\s*:\s*(\d+)', r'\1:\2', text)
+    text = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1-\2', text)
+    text = re.sub(r'e\s*\.\s*g\s*\.', 'e.g.', text, flags=re.IGNORECASE)
+    text = re.sub(r'for\s+example', 'e.g.', text, flags=re.IGNORECASE)
+    text = text.replace('°', '')
+    text = text.replace('degrees', '')
+    text = re.sub(r'\s+', ' ', text)
+    return re.sub(r'([.!?])\s+([A-Z])', r'\1\n\2', text)
+
+
+def benchmark(size_mb=4, repeats=3):
+    """Time the normalizers (and the code they replaced) on synthetic input of about size_mb"""
+    ocr_sample = ("The  quick\tbrown fox\x0c jumps over the lazy dog.\n"
+                  "DEBUG: frame 1234 rendered in 16 ms\n"
+                  "  Chapter 3 - Results of the 2nd   experiment\u00a0(see Fig. 4)\n\n")
+    stt_sample = ("the FORMAT of the NUMBERS is 3 . 5 and 10 : 30 , for example the RANGE 1 - 5 "
+                  "instead of 20 DEGREES . E.G. this is a TIME example . Next sentence starts here ")
+    speech_sample = "Hyphen-\nated words and   extra   spaces\t\there.\n\n\n\nNew paragraph.\x07 "
+    cases = [
+        ("clean_ocr_text", clean_ocr_text, _legacy_clean_ocr_text, ocr_sample),
+        ("clean_transcript", clean_transcript, _legacy_clean_transcript, stt_sample),
+        ("normalize_for_speech", normalize_for_speech, None, speech_sample),
+    ]
+    for name, function, legacy, sample in cases:
+        text = sample * max(1, int(size_mb * 1024 * 1024 / len(sample)))
+        timings = []
+        for candidate in (function, legacy):
+            if candidate is None:
+                continue
+            best = float('inf')
+            for _ in range(repeats):
+                started = time.perf_counter()
+                candidate(text)
+                best = min(best, time.perf_counter() - started)
+            timings.append(best)
+        line = f"{name:22s} {len(text) / 1048576:5.1f} MB  {timings[0] * 1000:8.1f} ms  " \
+               f"{len(text) / timings[0] / 1048576:7.1f} MB/s"
+        if len(timings) > 1:
+            line += f"  {timings[1] / timings[0]:.1f}x the speed of the previous code ({timings[1] * 1000:.1f} ms)"
+        print(line)
+
+
+if __name__ == '__main__':
+    # python Text_Normalizer.py [size in MB]
+    benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 4)
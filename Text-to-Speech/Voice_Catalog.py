@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+import edge_tts
+
+# Catalog lives next to text_settings.json
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'voice_catalog.json')
+DEFAULT_TTL = 7 * 24 * 3600  # Voice lists change rarely; refresh weekly
+
+# Used when the catalog has never been fetched and the network is unavailable
+FALLBACK_EDGE_VOICES = [
+    ("en-US-AriaNeural", "en-US", "Female"),
+    ("en-US-GuyNeural", "en-US", "Male"),
+    ("en-GB-RyanNeural", "en-GB", "Male"),
+    ("en-GB-SoniaNeural", "en-GB", "Female"),
+]
+
+# SAPI voices rarely report a gender, so fall back to the well-known Windows voice names
+_MALE_NAMES = {'david', 'mark', 'george', 'james', 'richard', 'ravi', 'sean', 'pablo', 'raul', 'paul', 'stefan'}
+_FEMALE_NAMES = {'zira', 'hazel', 'susan', 'heera', 'catherine', 'linda', 'helena', 'sabina', 'hortense',
+                 'julie', 'hedda', 'katja', 'elsa', 'haruka', 'huihui', 'heami', 'irina', 'maria'}
+# "en-US" is preferred over "en_US", which also matches the "MS_EN" in SAPI token names
+_LOCALE = re.compile(r'(?<![a-z])([a-z]{2})-([a-z]{2})(?![a-z])', re.IGNORECASE)
+_LOCALE_UNDERSCORE = re.compile(r'(?<![a-z])([a-z]{2})_([a-z]{2})(?![a-z])', re.IGNORECASE)
+_LANGUAGE_NAMES = {
+    'en': "English", 'es': "Spanish", 'fr': "French", 'de': "German", 'it': "Italian",
+    'pt': "Portuguese", 'ja': "Japanese", 'zh': "Chinese", 'ko': "Korean", 'ru': "Russian",
+    'nl': "Dutch", 'pl': "Polish", 'sv': "Swedish", 'hi': "Hindi", 'ar': "Arabic",
+}
+
+Voice = namedtuple('Voice', ['backend', 'id', 'name', 'locale', 'gender', 'description'])
+
+
+def language_name(locale):
+    """Language name for a locale ("en-GB" -> English); unknown languages show the locale itself"""
+    if not locale:
+        return "Unknown"
+    return _LANGUAGE_NAMES.get(locale.split('-')[0].lower(), locale)
+
+
+def sapi_voice_info(voice_id, name, languages=None, gender=None):
+    """Locale and gender for a pyttsx3 voice, from its metadata or its registry id and name"""
+    locale = None
+    for language in languages or []:
+        if isinstance(language, bytes):
+            language = language.decode('utf-8', 'ignore')
+        match = _LOCALE.search(str(language)) or _LOCALE_UNDERSCORE.search(str(language))
+        if match:
+            locale = match.group(0)
+            break
+    if locale is None:
+        match = _LOCALE.search(voice_id) or _LOCALE.search(name) or _LOCALE_UNDERSCORE.search(voice_id)
+        locale = match.group(0) if match else None
+    if locale:
+        locale = f"{locale[:2].lower()}-{locale[3:].upper()}"
+
+    if gender:
+        gender = str(gender).capitalize()
+    else:
+        words = set(re.findall(r'[a-z]+', name.lower()))
+        if 'female' in words or words & _FEMALE_NAMES:
+            gender = "Female"
+        elif 'male' in words or words & _MALE_NAMES:
+            gender = "Male"
+        else:
+            gender = "Unknown"
+    return locale, gender
+
+
+def edge_voice(short_name, locale, gender):
+    """Catalog entry for an Edge neural voice"""
+    person = short_name.split('-')[-1].replace('Neural', '')
+    description = f"{gender} {language_name(locale)} ({locale}) - {person}"
+    return Voice('edge', short_name, short_name, locale, gender, description)
+
+
+def pyttsx3_voice(voice_id, name, languages=None, gender=None):
+    """Catalog entry for an offline SAPI voice"""
+    locale, gender = sapi_voice_info(voice_id, name, languages, gender)
+    description = f"{gender} {language_name(locale)} Voice - {name}"
+    return Voice('pyttsx3', voice_id, name, locale, gender, description)
+
+
+class VoiceCatalog:
+    """Edge and pyttsx3 voices, enumerated once and persisted with a time-to-live
+
+    Lookups are served from an in-memory index by backend, locale (or bare
+    language) and gender. Stale lists are refreshed on a background thread while
+    the old list keeps serving.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._voices = {'edge': [], 'pyttsx3': []}
+        self._fetched = {'edge': 0, 'pyttsx3': 0}  # Epoch seconds of each backend's last enumeration
+        self._index = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for backend in self._voices:
+                entry = data.get(backend, {})
+                self._voices[backend] = [Voice(backend, *fields) for fields in entry.get('voices', [])]
+                self._fetched[backend] = entry.get('fetched', 0)
+            print(f"Voice catalog: {len(self._voices['edge'])} Edge and "
+                  f"{len(self._voices['pyttsx3'])} offline voices from {self.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading voice catalog: {e}")
+        if not self._voices['edge']:
+            self._voices['edge'] = [edge_voice(*fields) for fields in FALLBACK_EDGE_VOICES]
+        self._build_index()
+
+    def _save(self):
+        with self._lock:
+            data = {backend: {'fetched': self._fetched[backend],
+                              'voices': [list(voice[1:]) for voice in voices]}
+                    for backend, voices in self._voices.items()}
+        try:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving voice catalog: {e}")
+
+    def _build_index(self):
+        """Index every voice under each (backend, locale or language, gender) combination"""
+        index = {}
+        by_id = {}
+        for backend, voices in self._voices.items():
+            for voice in voices:
+                by_id[voice.id] = voice
+                places = {None}
+                if voice.locale:
+                    places.update({voice.locale.lower(), voice.locale.split('-')[0].lower()})
+                for backend_key in (None, backend):
+                    for place in places:
+                        for gender in (None, voice.gender.lower()):
+                            index.setdefault((backend_key, place, gender), []).append(voice)
+        with self._lock:
+            self._index = index
+            self._by_id = by_id
+
+    def voices(self, backend=None, locale=None, gender=None):
+        """Voices matching every given filter; locale may be "en-GB" or just "en" """
+        key = (backend, locale.lower() if locale else None, gender.lower() if gender else None)
+        with self._lock:
+            return list(self._index.get(key, ()))
+
+    def get(self, voice_id):
+        """Catalog entry for a voice id, or None"""
+        with self._lock:
+            return self._by_id.get(voice_id)
+
+    def locales(self, backend=None):
+        """Sorted locales offered by backend"""
+        with self._lock:
+            return sorted({voice.locale for name, voices in self._voices.items()
+                           if backend in (None, name) for voice in voices if voice.locale})
+
+    def is_stale(self, backend):
+        return time.time() - self._fetched.get(backend, 0) > self.ttl
+
+    def set_voices(self, backend, voices):
+        """Replace one backend's voices, re-index and persist"""
+        with self._lock:
+            self._voices[backend] = list(voices)
+            self._fetched[backend] = time.time()
+        self._build_index()
+        self._save()
+
+    def set_pyttsx3_voices(self, engine_voices):
+        """Record voices as returned by pyttsx3's getProperty('voices')"""
+        self.set_voices('pyttsx3', [pyttsx3_voice(voice.id, voice.name, getattr(voice, 'languages', None),
+                                                  getattr(voice, 'gender', None))
+                                    for voice in engine_voices])
+
+    def fetch_edge_voices(self):
+        """Download the Edge voice list (blocking)"""
+        voices = asyncio.run(edge_tts.list_voices())
+        self.set_voices('edge', [edge_voice(voice['ShortName'], voice['Locale'], voice['Gender'])
+                                 for voice in voices])
+
+    def refresh(self, list_pyttsx3_voices=None, force=False):
+        """Re-enumerate whichever backends are stale (blocking)
+
+        list_pyttsx3_voices() must return pyttsx3 voice objects; pyttsx3 engines are
+        not thread-safe, so the caller supplies one that runs on the engine's thread.
+        """
+        if force or self.is_stale('edge'):
+            try:
+                self.fetch_edge_voices()
+            except Exception as e:
+                print(f"Error refreshing Edge voices: {e}")
+        if list_pyttsx3_voices is not None and (force or self.is_stale('pyttsx3')):
+            try:
+                self.set_pyttsx3_voices(list_pyttsx3_voices())
+            except Exception as e:
+                print(f"Error refreshing offline voices: {e}")
+
+    def refresh_in_background(self, list_pyttsx3_voices=None, on_done=None, force=False):
+        """Run refresh() on a daemon thread if anything is stale; on_done() is called afterwards"""
+        if not force and not self.is_stale('edge') and (list_pyttsx3_voices is None or not self.is_stale('pyttsx3')):
+            return
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def run():
+            self.refresh(list_pyttsx3_voices, force)
+            if on_done:
+                on_done()
+
+        self._refresh_thread = threading.Thread(target=run, daemon=True)
+        self._refresh_thread.start()
+
+
+# Shared catalog, created on first use
+_catalog = None
+
+
+def get_voice_catalog():
+    """Return the shared voice catalog"""
+    global _catalog
+    if _catalog is None:
+        _catalog = VoiceCatalog()
+    return _catalog
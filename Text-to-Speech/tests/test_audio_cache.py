@@ -0,0 +1,41 @@
+import os
+
+from Audio_Cache import AudioCache
+
+
+def test_sidecar_is_stored_with_its_audio(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    cache.put('a' * 64, b"audio", b'[{"offset": 0}]')
+    assert cache.get('a' * 64) == b"audio"
+    assert cache.get_sidecar('a' * 64) == b'[{"offset": 0}]'
+    assert cache.stats()['entries'] == 1 and cache.stats()['bytes'] == 5 + 15
+
+
+def test_sidecar_is_evicted_with_its_audio(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=30)
+    cache.put('a' * 64, b"x" * 10, b"y" * 10)
+    cache.put('b' * 64, b"x" * 10, b"y" * 10)
+    assert 'a' * 64 not in cache
+    assert cache.get_sidecar('a' * 64) is None
+    assert not os.path.exists(cache._sidecar_path('a' * 64))
+    assert cache.get_sidecar('b' * 64) == b"y" * 10
+
+
+def test_storing_audio_alone_drops_a_stale_sidecar(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    cache.put('a' * 64, b"old", b"old timings")
+    cache.put('a' * 64, b"new")
+    assert cache.get_sidecar('a' * 64) is None
+
+
+def test_reloaded_index_counts_sidecars_and_drops_orphans(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    cache.put('a' * 64, b"audio", b"timings")
+    orphan = cache._sidecar_path('b' * 64)
+    os.makedirs(os.path.dirname(orphan), exist_ok=True)
+    with open(orphan, 'wb') as f:
+        f.write(b"left over")
+    reloaded = AudioCache(str(tmp_path))
+    assert reloaded.stats()['entries'] == 1 and reloaded.stats()['bytes'] == 5 + 7
+    assert reloaded.get_sidecar('a' * 64) == b"timings"
+    assert not os.path.exists(orphan)
@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+import pytest
+
+from Audio_Engine import PlaybackQueue, StreamPlayer
+
+
+@pytest.fixture
+def queue():
+    """A playback queue with its feeder running but no device; play() stands in for the callback"""
+    queue = PlaybackQueue(capacity_seconds=1)
+    queue._running = True
+    feeder = threading.Thread(target=queue._feed_loop, daemon=True)
+    feeder.start()
+    yield queue
+    queue.close()
+    feeder.join(1)
+
+
+def wait_until_buffered(queue, position):
+    """Let the feeder copy queued audio into the ring up to position"""
+    for _ in range(100):
+        with queue._cond:
+            if queue._written >= position:
+                return
+            queue._cond.wait(0.01)
+    raise AssertionError("feeder did not buffer the audio")
+
+
+def play(queue, samples):
+    out = np.zeros((queue.blocksize, 1), dtype=np.float32)
+    for _ in range(0, samples, queue.blocksize):
+        queue._callback(out, queue.blocksize, None, None)
+
+
+def block(samples):
+    return np.ones(samples, dtype=np.float32)
+
+
+def test_enqueue_returns_end_positions(queue):
+    assert queue.enqueue(block(480)) == 480
+    assert queue.enqueue(block(960)) == 1440
+
+
+def test_wait_for_returns_once_played(queue):
+    end = queue.enqueue(block(960))
+    assert not queue.wait_for(end, 0.01)
+    wait_until_buffered(queue, end)
+    play(queue, 960)
+    assert queue.wait_for(end, 0.01)
+
+
+def test_wait_for_returns_when_the_generation_is_flushed(queue):
+    generation, end = queue.enqueue_tracked(block(4800))
+    queue.flush()
+    queue.enqueue(block(48000))  # Someone else's audio reaches past the flushed end
+    assert queue.wait_for(end, 0.5, generation)
+
+
+def test_player_drains(queue):
+    player = StreamPlayer(queue)
+    player.write(block(960))
+    player.finish()
+    assert player.pending_blocks() == 1 and not player.is_done()
+    wait_until_buffered(queue, 960)
+    play(queue, 960)
+    assert player.pending_blocks() == 0 and player.is_done()
+
+
+def test_flush_by_another_player_releases_waiters(queue):
+    player = StreamPlayer(queue)
+    player.write(block(4800))
+    player.finish()
+    other = StreamPlayer(queue)
+    other.clear()  # e.g. a seek, flushing the shared queue
+    other.write(block(48000))
+    assert player.pending_blocks() == 0
+    assert player.is_done()
+    polls = []
+    assert player.wait(lambda: polls.append(1) or len(polls) < 100)
+    assert len(polls) <= 1
+    assert other.pending_blocks() == 1
+
+
+def test_stopped_player_is_done_and_silent(queue):
+    player = StreamPlayer(queue)
+    player.write(block(4800))
+    player.stop()
+    assert player.is_done()
+    assert player.write(block(480)) is None
+    assert queue._queued == queue._read
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+import Speech_Synthesis
+from Audio_Cache import AudioCache
+from Audio_Export import MIN_SHARED_SENTENCE_CHARS, MP3Exporter, split_export_chunks
+from Synthesis_Backends import SynthesisBackend
+
+
+def sentences(count, first=0, length=60):
+    return [f"Sentence {i:02d} " + "x" * (length - 13) + "." for i in range(first, first + count)]
+
+
+def test_chunks_stay_under_the_limit_and_keep_every_sentence():
+    text = " ".join(sentences(50))
+    chunks = split_export_chunks(text, max_chars=300)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_chunks_prefer_paragraph_breaks_once_half_full():
+    first, second = " ".join(sentences(3)), " ".join(sentences(3, first=3))
+    chunks = split_export_chunks(first + "\n\n" + second, max_chars=300)
+    assert chunks == [first, second]
+
+
+def test_repeated_sentences_get_chunks_of_their_own():
+    repeat = "This running header repeats on every page."
+    assert len(repeat) >= MIN_SHARED_SENTENCE_CHARS
+    text = f"{repeat} First body. {repeat} Second body."
+    assert split_export_chunks(text) == [repeat, "First body.", repeat, "Second body."]
+    assert split_export_chunks(text, share_repeats=False) == [text]
+
+
+def test_short_repeats_are_not_split_out():
+    text = "Yes. Something else entirely. Yes."
+    assert split_export_chunks(text) == [text]
+
+
+class CountingBackend(SynthesisBackend):
+    name = 'counting'
+
+    def __init__(self):
+        self.requests = []
+
+    async def synthesize(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        self.requests.append(text)
+        return f"[{text}]".encode('utf-8')
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    backend = CountingBackend()
+    monkeypatch.setattr(Speech_Synthesis, '_backend', backend)
+    monkeypatch.setattr(Speech_Synthesis, '_audio_cache', AudioCache(str(tmp_path / 'cache')))
+    return backend
+
+
+def test_export_writes_chunks_in_order(backend, tmp_path):
+    text = " ".join(sentences(20))
+    path = str(tmp_path / 'out.mp3')
+    assert MP3Exporter(chunk_chars=300).export(text, path) == path
+    chunks = split_export_chunks(text, 300)
+    with open(path, 'rb') as f:
+        assert f.read() == b"".join(f"[{chunk}]".encode('utf-8') for chunk in chunks)
+    assert not os.path.exists(MP3Exporter.work_dir_for(path))
+
+
+def test_reexport_is_served_from_the_audio_cache(backend, tmp_path):
+    text = " ".join(sentences(20))
+    MP3Exporter(chunk_chars=300).export(text, str(tmp_path / 'first.mp3'))
+    requests = len(backend.requests)
+    MP3Exporter(chunk_chars=300).export(text, str(tmp_path / 'second.mp3'))
+    assert len(backend.requests) == requests
+
+
+def test_resume_ignores_chunks_that_were_never_completed(backend, tmp_path):
+    text = " ".join(sentences(20))
+    path = str(tmp_path / 'out.mp3')
+    exporter = MP3Exporter(chunk_chars=300)
+    exporter.backend = backend
+    chunks = split_export_chunks(text, 300)
+    work_dir = MP3Exporter.work_dir_for(path)
+    os.makedirs(work_dir)
+    # One finished chunk, and one interrupted mid-write
+    with open(os.path.join(work_dir, exporter._chunk_name(chunks[0])), 'wb') as f:
+        f.write(f"[{chunks[0]}]".encode('utf-8'))
+    with open(os.path.join(work_dir, exporter._chunk_name(chunks[1]) + '.tmp'), 'wb') as f:
+        f.write(b"[trunc")
+    assert exporter.pending_chunks(text, path) == (1, len(chunks))
+    exporter.export(text, path)
+    assert chunks[0] not in backend.requests and chunks[1] in backend.requests
@@ -0,0 +1,24 @@
+from Document_Loader import strip_page_furniture
+
+
+def page(number, body):
+    return f"ACME Annual Report\n{body}\nPage {number} of 5"
+
+
+def test_running_headers_and_page_numbers_are_removed():
+    pages = [page(n, f"Body line one of page {n}.\nBody line two.\nBody line three.") for n in range(1, 6)]
+    stripped = strip_page_furniture(pages)
+    assert stripped[0] == "Body line one of page 1.\nBody line two.\nBody line three."
+    assert all("ACME" not in text and "Page" not in text for text in stripped)
+
+
+def test_repeated_body_lines_are_kept():
+    body = "Intro.\nThe same sentence in the middle.\nMore.\nStill more.\nEnd."
+    pages = [body] * 4
+    stripped = strip_page_furniture(pages)
+    assert all("The same sentence in the middle." in text for text in stripped)
+
+
+def test_few_pages_are_left_alone():
+    pages = [page(1, "a\nb\nc"), page(2, "d\ne\nf")]
+    assert strip_page_furniture(pages) == pages
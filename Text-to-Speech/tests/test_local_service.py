@@ -0,0 +1,36 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from Local_Service import LocalService
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = LocalService(port=0)
+    thread = threading.Thread(target=service.serve_forever, daemon=True)
+    thread.start()
+    while service._server is None:
+        time.sleep(0.01)
+    yield service
+    service.shutdown()
+    thread.join(5)
+
+
+def post(service, path, body):
+    connection = http.client.HTTPConnection(*service._server.server_address[:2], timeout=5)
+    try:
+        connection.request('POST', path, body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"text"', b'{"text": 5}', b'{"text": "  "}', b'not json'])
+def test_malformed_tts_requests_are_rejected(service, body):
+    status, reply = post(service, '/tts', body)
+    assert status == 400 and reply['error']
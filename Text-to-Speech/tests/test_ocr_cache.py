@@ -0,0 +1,71 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from OCR_Cache import OCRCache, fingerprint
+
+
+def capture(text, noise=0, seed=0):
+    image = Image.new('RGB', (600, 90), (40, 40, 60))
+    ImageDraw.Draw(image).text((10, 30), text, fill=(250, 250, 250))
+    if noise:
+        pixels = np.asarray(image).astype(np.int16)
+        pixels += np.random.default_rng(seed).integers(-noise, noise + 1, pixels.shape, dtype=np.int16)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image
+
+
+def test_identical_captures_share_a_key():
+    assert fingerprint(capture("Hello there")).key == fingerprint(capture("Hello there")).key
+
+
+def test_noisy_capture_hits_within_tolerance():
+    cache = OCRCache()
+    cache.put(fingerprint(capture("Hello there")), "Hello there")
+    assert cache.get(fingerprint(capture("Hello there", noise=4))) == "Hello there"
+    assert cache.hits == 1
+
+
+def test_changed_text_misses():
+    cache = OCRCache()
+    cache.put(fingerprint(capture("Level 12 unlocked.")), "Level 12 unlocked.")
+    assert cache.get(fingerprint(capture("Level 13 unlocked."))) is None
+    assert cache.get(fingerprint(capture("Level 12 unlocked!"))) is None
+    assert cache.misses == 2
+
+
+def test_zero_tolerance_needs_an_exact_match():
+    cache = OCRCache(tolerance=0)
+    cache.put(fingerprint(capture("Hello there")), "Hello there")
+    assert cache.get(fingerprint(capture("Hello there"))) == "Hello there"
+    assert cache.get(fingerprint(capture("Hello there", noise=40))) is None
+
+
+def test_shared_key_beyond_tolerance_misses():
+    # 64 and 90 fall in the same quantized bucket but are 26 gray levels apart
+    dark, lighter = (fingerprint(Image.new('L', (600, 90), level)) for level in (64, 90))
+    assert dark.key == lighter.key
+    cache = OCRCache()
+    cache.put(dark, "Level 12 unlocked.")
+    assert cache.get(lighter) is None
+    exact = OCRCache(tolerance=0)
+    exact.put(dark, "Level 12 unlocked.")
+    assert exact.get(fingerprint(Image.new('L', (600, 90), 65))) is None
+    assert exact.get(dark) == "Level 12 unlocked."
+
+
+def test_namespaces_are_separate():
+    cache = OCRCache()
+    cache.put(fingerprint(capture("Hi")), "Hi", namespace='whitelist')
+    assert cache.get(fingerprint(capture("Hi")), namespace='other') is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = OCRCache(max_entries=2, tolerance=0)
+    first, second, third = (fingerprint(capture(text)) for text in ("one", "two", "three"))
+    cache.put(first, "one")
+    cache.put(second, "two")
+    cache.get(first)  # Now the most recently used
+    cache.put(third, "three")
+    assert len(cache) == 2
+    assert cache.get(second) is None
+    assert cache.get(first) == "one" and cache.get(third) == "three"
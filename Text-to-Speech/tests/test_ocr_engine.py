@@ -0,0 +1,119 @@
+import subprocess
+
+import numpy as np
+import pytest
+import pytesseract
+from PIL import Image
+
+import OCR_Engine
+from OCR_Engine import OCREngine, PersistentTesseract, SubprocessTesseract, _pixel_buffer, parse_config
+
+# The gaming window's whitelist, with quotes, a backslash and a space in the value
+GAMING_CONFIG = (r'--oem 3 --psm 6 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+                 r'0123456789.,!?@#$%^&*()[]{}<>-_=+;:\'\" "')
+
+
+def tesseract_arguments(config, monkeypatch):
+    """The arguments pytesseract would start tesseract.exe with for config"""
+    started = []
+
+    class Started(Exception):
+        pass
+
+    def popen(arguments, **kwargs):
+        started.append(arguments)
+        raise Started()
+
+    monkeypatch.setattr(pytesseract.pytesseract.subprocess, 'Popen', popen)
+    with pytest.raises(Started):
+        pytesseract.pytesseract.run_tesseract('in.png', 'out', 'txt', None, config)
+    return started[0][3:]
+
+
+def command_line_variables(arguments):
+    return {arguments[i + 1].partition('=')[0]: arguments[i + 1].partition('=')[2]
+            for i in range(len(arguments) - 1) if arguments[i] == '-c'}
+
+
+def test_defaults():
+    assert parse_config('') == (3, 3, 'eng', ())
+    assert parse_config('--oem 1 --psm 7 -l deu') == (1, 7, 'deu', ())
+
+
+def test_variables_are_sorted_and_unknown_options_skipped():
+    assert parse_config('--dpi 300 -c b=2 -c a=1 --psm 6') == (3, 6, 'eng', (('a', '1'), ('b', '2')))
+
+
+def test_quoted_values_keep_spaces():
+    assert dict(parse_config('-c name="two words"')[3]) == {'name': 'two words'}
+
+
+def test_gaming_whitelist_keeps_every_character():
+    whitelist = dict(parse_config(GAMING_CONFIG)[3])['tessedit_char_whitelist']
+    for character in 'Zz9.,!?@#$%^&*()[]{}<>-_=+;:\'" ':
+        assert character in whitelist
+
+
+@pytest.mark.parametrize('config', [
+    GAMING_CONFIG,
+    '--oem 3 --psm 6',
+    '-l eng -c preserve_interword_spaces=1 -c tessedit_char_blacklist="|~"',
+])
+def test_api_and_subprocess_engines_get_the_same_variables(config, monkeypatch):
+    arguments = tesseract_arguments(config, monkeypatch)
+    assert dict(parse_config(config)[3]) == command_line_variables(arguments)
+
+
+def test_engine_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        OCREngine()
+
+
+def test_contiguous_arrays_are_passed_without_a_copy():
+    gray = np.zeros((10, 20), dtype=np.uint8)
+    pixels, width, height, channels, _ = _pixel_buffer(gray)
+    assert pixels is gray and (width, height, channels) == (20, 10, 1)
+
+
+def test_subprocess_engine_runs_its_own_command(monkeypatch):
+    runs = []
+
+    def run(arguments, input=None, **kwargs):
+        runs.append(arguments)
+        return subprocess.CompletedProcess(arguments, 0, b"Hello\n", b"")
+
+    monkeypatch.setattr(OCR_Engine.subprocess, 'run', run)
+    monkeypatch.setattr(pytesseract.pytesseract, 'tesseract_cmd', 'tesseract')
+    engine = SubprocessTesseract('/opt/other/tesseract')
+    assert engine.image_to_string(Image.new('L', (8, 8)), GAMING_CONFIG) == "Hello\n"
+    assert pytesseract.pytesseract.tesseract_cmd == 'tesseract'
+    assert runs[0][:3] == ['/opt/other/tesseract', 'stdin', 'stdout']
+    assert runs[0][3:] == tesseract_arguments(GAMING_CONFIG, monkeypatch)
+
+
+class FakeApiTesseract(PersistentTesseract):
+    """Pool bookkeeping without the C library"""
+
+    def __init__(self):
+        self.destroyed = []
+        super().__init__('libtesseract-fake')
+
+    @staticmethod
+    def _load(library_path):
+        return None
+
+    def _create(self, key):
+        return object()
+
+    def _destroy(self, handle):
+        self.destroyed.append(handle)
+
+
+def test_close_destroys_handles_that_are_checked_out():
+    engine = FakeApiTesseract()
+    engine.warm_up()
+    borrowed = engine._acquire((3, 'deu', ()))
+    engine.close()
+    assert len(engine.destroyed) == 1
+    engine._release((3, 'deu', ()), borrowed)
+    assert engine.destroyed[-1] is borrowed and engine._count == 0 and engine._idle == []
@@ -0,0 +1,79 @@
+import threading
+
+from PIL import Image, ImageDraw
+
+import Region_Watcher
+from OCR_Cache import fingerprint
+from Region_Watcher import RegionWatcher, has_changed
+
+
+def capture(text, brightness=40):
+    image = Image.new('RGB', (600, 90), (brightness, brightness, brightness + 20))
+    ImageDraw.Draw(image).text((10, 30), text, fill=(250, 250, 250))
+    return image
+
+
+def test_has_changed():
+    same = fingerprint(capture("Hello world!"))
+    assert has_changed(None, same)
+    assert not has_changed(same, fingerprint(capture("Hello world!")))
+    assert has_changed(same, fingerprint(capture("Hello world?")))
+    # A fade changes every pixel a little
+    assert has_changed(same, fingerprint(capture("Hello world!", brightness=50)))
+
+
+def test_reports_each_line_once_it_has_settled(monkeypatch):
+    frames = ["First line."] * 4 + ["S", "Seco", "Second line."] + ["Second line."] * 4 + ["First line."] * 30
+    polls = []
+    lock = threading.Lock()
+
+    def grab_region(*region):
+        with lock:
+            polls.append(region)
+            return capture(frames[min(len(polls), len(frames)) - 1])
+
+    monkeypatch.setattr(Region_Watcher, 'grab_region', grab_region)
+    reported = []
+    done = threading.Event()
+
+    def on_settled(image, settled):
+        reported.append(frames[min(len(polls), len(frames)) - 1])
+        if len(reported) == 3:
+            done.set()
+
+    watcher = RegionWatcher(lambda: (0, 0, 600, 90), on_settled, min_interval=0.001, max_interval=0.005)
+    watcher.start()
+    try:
+        assert done.wait(5)
+    finally:
+        watcher.stop()
+    # The typing frames were never reported
+    assert reported == ["First line.", "Second line.", "First line."]
+
+
+def test_polls_back_off_while_static(monkeypatch):
+    monkeypatch.setattr(Region_Watcher, 'grab_region', lambda *region: capture("Static"))
+    watcher = RegionWatcher(lambda: (0, 0, 600, 90), lambda image, settled: None,
+                            min_interval=0.001, max_interval=0.05)
+    intervals = []
+    original_wait = watcher._stop.wait
+
+    def wait(interval):
+        intervals.append(interval)
+        return len(intervals) > 30 or original_wait(0)
+
+    watcher._stop.wait = wait
+    watcher._run()
+    assert intervals[0] == 0.001
+    assert intervals[-1] == 0.05
+    assert intervals == sorted(intervals)
+
+
+def test_nothing_is_captured_without_a_region(monkeypatch):
+    captured = []
+    monkeypatch.setattr(Region_Watcher, 'grab_region', lambda *region: captured.append(region))
+    watcher = RegionWatcher(lambda: None, lambda image, settled: None, min_interval=0.001)
+    waits = []
+    watcher._stop.wait = lambda interval: waits.append(interval) or len(waits) > 5
+    watcher._run()
+    assert captured == []
@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import CancelledError
+
+import pytest
+
+import Speech_Synthesis
+from Audio_Cache import AudioCache
+from Speech_Synthesis import TTSService, iter_sentence_spans, split_sentences, stretch_boundaries
+from Synthesis_Backends import SynthesisBackend
+
+
+class SlowBackend(SynthesisBackend):
+    """Counts requests and answers after a delay, so callers can join or cancel them"""
+
+    name = 'slow'
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.requests = []
+
+    async def synthesize(self, text, voice, rate="+0%", pitch="+0Hz", volume="+0%"):
+        self.requests.append((text, rate))
+        await asyncio.sleep(self.delay)
+        return f"{text}@{rate}".encode('utf-8')
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    backend = SlowBackend()
+    monkeypatch.setattr(Speech_Synthesis, '_backend', backend)
+    monkeypatch.setattr(Speech_Synthesis, '_audio_cache', AudioCache(str(tmp_path)))
+    return backend
+
+
+@pytest.fixture
+def service():
+    service = TTSService()
+    yield service
+    service.stop()
+
+
+def test_split_sentences():
+    text = "Mr. Smith went home. It rained!\n\nNew paragraph? Yes."
+    assert split_sentences(text) == ["Mr. Smith went home.", "It rained!", "New paragraph?", "Yes."]
+
+
+def test_split_sentences_breaks_long_sentences_at_commas():
+    text = "one, " * 30 + "end."
+    sentences = split_sentences(text, max_chars=40)
+    assert all(len(sentence) <= 40 for sentence in sentences)
+    assert " ".join(sentences).replace("  ", " ") == text
+
+
+def test_sentence_spans_index_the_original_text():
+    text = "  First one.   Second one.  "
+    assert [text[start:end] for start, end in iter_sentence_spans(text)] == ["First one.", "Second one."]
+
+
+def test_duplicate_requests_share_one_synthesis(backend, service):
+    first = service.synthesize("hello")
+    second = service.synthesize("hello")
+    assert first is not second
+    assert first.result(5) == second.result(5) == b"hello@+0%"
+    assert len(backend.requests) == 1
+    # Now cached
+    assert service.synthesize("hello").result(0) == b"hello@+0%"
+
+
+def test_cancelling_one_caller_leaves_the_others_running(backend, service):
+    reader = service.synthesize("shared")
+    prefetch = service.synthesize("shared")
+    reader.cancel()
+    assert reader.cancelled()
+    assert prefetch.result(5) == b"shared@+0%"
+
+
+def test_synthesis_is_cancelled_when_its_last_caller_detaches(backend, service):
+    future = service.synthesize("nobody")
+    future.cancel()
+    with pytest.raises(CancelledError):
+        future.result(1)
+    assert service._in_flight == {}
+
+
+def test_prefetch_uses_the_given_prosody(backend, monkeypatch):
+    monkeypatch.setattr(Speech_Synthesis, '_speculative_prefetch', True)
+    futures = Speech_Synthesis.prefetch_sentences("One. Two. Three.", rate="+20%")
+    assert [future.result(5) for future in futures] == [b"One.@+20%", b"Two.@+20%"]
+
+
+def test_stretch_boundaries_follow_the_tempo():
+    events = [{"offset": 1000, "duration": 10, "text": "a"}, {"offset": 3000, "duration": 10, "text": "b"}]
+    faster = stretch_boundaries(events, "+0%", "+100%")
+    assert [event["offset"] for event in faster] == [500, 1500]
+    assert faster[0]["text"] == "a" and events[0]["offset"] == 1000
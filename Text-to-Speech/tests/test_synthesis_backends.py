@@ -0,0 +1,25 @@
+import threading
+
+import pyttsx3
+
+from Synthesis_Backends import LocalSynthesizer
+
+
+class FakeEngine:
+    def __init__(self, *args, **kwargs):
+        self.thread = threading.current_thread()
+
+    def getProperty(self, name):
+        return ['voice']
+
+
+def test_local_synthesizer_builds_a_private_engine_on_its_thread(monkeypatch):
+    def shared_engine(*args, **kwargs):
+        raise AssertionError("pyttsx3.init() returns the window's engine")
+
+    monkeypatch.setattr(pyttsx3, 'init', shared_engine)
+    monkeypatch.setattr(pyttsx3, 'Engine', FakeEngine)
+    local = LocalSynthesizer()
+    assert local.list_voices().result(5) == ['voice']
+    assert local._engine.thread is not threading.current_thread()
+    assert local._engine.thread.name.startswith('tts-local')
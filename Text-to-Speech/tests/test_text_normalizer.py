@@ -0,0 +1,44 @@
+import pytest
+
+from Text_Normalizer import clean_ocr_text, clean_transcript, compile_replacements, normalize_for_speech
+
+
+def test_clean_ocr_text_collapses_spaces_and_blank_lines():
+    assert clean_ocr_text("Hello   world \n\n\n  Next\tline  ") == "Hello world\nNext line"
+
+
+def test_clean_ocr_text_drops_control_characters_and_diagnostics():
+    text = "Warning: Invalid resolution 0 dpi\nFirst\x07 line\nDebug: junk\nSecond"
+    assert clean_ocr_text(text) == "First line\nSecond"
+
+
+def test_clean_ocr_text_keeps_non_latin_text():
+    assert clean_ocr_text("Grüße, 東京") == "Grüße, 東京"
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("it is 3 . 5 percent , right", "it is 3.5 percent, right"),
+    ("meet at 10 : 30 ok", "meet at 10:30 ok"),
+    ("pages 1 - 5", "pages 1-5"),
+    ("for example this", "e.g. this"),
+    ("E . G . that", "e.g. that"),
+])
+def test_clean_transcript_fixes_punctuation_and_numbers(spoken, expected):
+    assert clean_transcript(spoken) == expected
+
+
+def test_clean_transcript_breaks_sentences_and_fixes_words():
+    assert clean_transcript("the NUMBER is 5.It works") == "the number is 5.\nIt works"
+
+
+def test_normalize_for_speech_joins_hyphenated_words_and_keeps_paragraphs():
+    text = "a hyphen-\nated  word\x00\n\n\n\nNext paragraph"
+    assert normalize_for_speech(text) == "a hyphenated word\n\nNext paragraph"
+
+
+def test_compile_replacements_matches_whole_words_only():
+    pattern, lookup = compile_replacements({'CAT': 'cat', 'E.G.': 'e.g.'})
+    replace = lambda text: pattern.sub(lambda match: lookup[match.group(0)], text)
+    assert replace("CAT and cat and CATALOG, E.G. here") == "cat and cat and CATALOG, e.g. here"
+    # Spellings that already equal their replacement are not in the table
+    assert 'cat' not in lookup